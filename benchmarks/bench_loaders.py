@@ -0,0 +1,69 @@
+"""
+Compare the input loaders on large synthetic processes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_loaders --size 20000
+"""
+
+import argparse
+import json
+import time
+
+import yaml
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from mermaid_mint.parser import JSON, MSGPACK, YAML, Parser, load_data
+from mermaid_mint.serializer import dumps_snapshot, loads_snapshot
+from .synthetic import chain_process
+
+
+def time_call(function, repeat: int) -> float:
+    """Return the best wall-clock time of several calls."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arguments.add_argument('--size', type=int, default=10000, help='number of tasks in the process')
+    arguments.add_argument('--repeat', type=int, default=3)
+    args = arguments.parse_args()
+
+    data = chain_process(args.size)
+    yaml_text = yaml.safe_dump(data, sort_keys=False)
+    json_text = json.dumps(data)
+
+    loaders = [('yaml SafeLoader (pure Python)', lambda: yaml.load(yaml_text, Loader=yaml.SafeLoader))]
+    if hasattr(yaml, 'CSafeLoader'):
+        loaders.append(('yaml CSafeLoader (libyaml)', lambda: yaml.load(yaml_text, Loader=yaml.CSafeLoader)))
+    loaders.append(('mermaid_mint yaml', lambda: load_data(yaml_text, YAML)))
+    loaders.append(('mermaid_mint json', lambda: load_data(json_text, JSON)))
+    if msgpack is not None:
+        packed = msgpack.packb(data)
+        loaders.append(('mermaid_mint msgpack', lambda: load_data(packed, MSGPACK)))
+
+    # These build the Process as well as loading the data
+    parser = Parser()
+    snapshot = dumps_snapshot(parser.parse_data(data))
+    loaders.append(('mermaid_mint yaml to Process', lambda: parser.parse_string(yaml_text, YAML)))
+    loaders.append(('mermaid_mint snapshot to Process', lambda: loads_snapshot(snapshot)))
+
+    print(f"Loading a process with {args.size} tasks ({len(yaml_text) / 1e6:.1f} MB of YAML)")
+    baseline = None
+    for name, loader in loaders:
+        seconds = time_call(loader, args.repeat)
+        baseline = baseline or seconds
+        print(f"  {name:32} {seconds * 1000:10.1f} ms  {baseline / seconds:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Measure the memory used per step by a parsed Process, with and without slots.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory --size 100000
+
+Three figures are reported for a chain where every task has one
+operation, each in bytes per step:
+
+- objects: the steps, their operations and the process's step table,
+  with the strings they hold already allocated in the loaded data;
+- with strings: the same when the loaded data is built inside the
+  measurement and then dropped, so the step IDs, names and descriptions
+  the process keeps are counted too;
+- with edge index: also building the outgoing and incoming edge index,
+  as the first out_edges or in_edges call does.
+
+Each is measured for the slotted step classes and again, in a child
+interpreter, with slots turned off so the classes are plain dataclasses.
+Results on CPython 3.11 (slotted / plain): objects ~238 / ~318, with
+strings ~439 / ~519 and with the edge index ~876 / ~956. Before Python
+3.10 the step classes are never slotted and both columns match.
+"""
+
+import argparse
+import dataclasses
+import gc
+import json
+import subprocess
+import sys
+import tracemalloc
+
+from .synthetic import chain_process
+
+
+def _traced(build) -> int:
+    """Call build() and return the bytes still allocated by what it returned."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return used
+
+
+def bytes_per_step(size: int) -> dict:
+    """Return the traced memory of a parsed chain process divided by its step count, by what is counted."""
+    # Imported here so --no-slots can take effect before the step classes are defined
+    from mermaid_mint.parser import Parser
+    parser = Parser()
+    data = chain_process(size)
+    steps = len(parser.parse_data(data))
+
+    def with_index():
+        process = parser.parse_data(chain_process(size))
+        process.out_edges(process.start.step_id)
+        return process
+
+    used = {
+        'objects': _traced(lambda: parser.parse_data(data)),
+        'with strings': _traced(lambda: parser.parse_data(chain_process(size))),
+        'with edge index': _traced(with_index),
+    }
+    return {name: total / steps for name, total in used.items()}
+
+
+def _disable_slots():
+    """Make dataclass ignore slots=True, so the step classes are defined as plain dataclasses."""
+    original = dataclasses.dataclass
+
+    def dataclass(cls=None, **options):
+        options.pop('slots', None)
+        return original(**options) if cls is None else original(cls, **options)
+
+    dataclasses.dataclass = dataclass
+
+
+def unslotted_bytes_per_step(size: int) -> dict:
+    """Return bytes_per_step for plain dataclasses, measured in a child interpreter."""
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_memory', '--size', str(size),
+                             '--no-slots'], check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arguments.add_argument('--size', type=int, default=100000, help='number of tasks in the process')
+    arguments.add_argument('--no-slots', action='store_true',
+                           help='measure only plain dataclasses and print the figures as JSON '
+                                '(used by the child interpreter)')
+    args = arguments.parse_args()
+
+    if args.no_slots:
+        _disable_slots()
+        print(json.dumps(bytes_per_step(args.size)))
+        return
+
+    slotted = bytes_per_step(args.size)
+    plain = unslotted_bytes_per_step(args.size)
+    print(f"Bytes per step for a chain of {args.size} tasks")
+    print(f"{'':>16}  {'slotted':>8}  {'plain':>8}  saved")
+    for name, per_step in slotted.items():
+        print(f"{name:>16}  {per_step:>8.0f}  {plain[name]:>8.0f}  {1 - per_step / plain[name]:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Benchmark parsing, connecting and rendering synthetic processes of 10^2 to 10^6 steps.
+
+Run from the repository root:
+
+    python -m benchmarks.run                      # compare against benchmarks/baseline.json
+    python -m benchmarks.run --max-size 1000000   # include the largest processes
+    python -m benchmarks.run --save-baseline      # record a new baseline
+
+Each process is timed in three phases: parse (loading the serialized
+definition), connect (building the Process graph from the loaded data)
+and render (streaming the Mermaid diagram). Peak traced memory is taken
+from a separate run of connect and render, since tracing slows them down.
+Timings depend on the machine, so record the baseline on the machine that
+runs the comparison. The run exits with status 1 if any phase regressed.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from mermaid_mint.parser import JSON, YAML, Parser, load_data
+from mermaid_mint.visitors import MermaidVisitor
+from .synthetic import GENERATORS
+
+BASELINE = Path(__file__).with_name('baseline.json')
+PHASES = ('parse', 'connect', 'render')
+
+# Time differences below this are treated as noise, in seconds
+NOISE_FLOOR = 0.005
+
+
+class NullStream:
+    """A text stream that counts and discards what is written to it."""
+
+    def __init__(self):
+        self.characters = 0
+
+    def write(self, text):
+        self.characters += len(text)
+
+
+def serialize(data, input_format: str) -> str:
+    """Serialize process data in the format the parse phase will load."""
+    if input_format == YAML:
+        import yaml
+        return yaml.safe_dump(data, sort_keys=False)
+    return json.dumps(data)
+
+
+def best_time(function, repeat: int):
+    """Return (best seconds, last result) over several calls."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def peak_memory(data) -> int:
+    """Return the peak traced memory of connecting and rendering a process."""
+    gc.collect()
+    tracemalloc.start()
+    process = Parser().parse_data(data)
+    MermaidVisitor().visit_process_to(process, NullStream())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def measure(generator: str, size: int, input_format: str = JSON) -> dict:
+    """Time each phase for one synthetic process and record its peak memory."""
+    data = GENERATORS[generator](size)
+    text = serialize(data, input_format)
+    repeat = max(1, min(5, 100000 // size))
+    parser = Parser()
+    visitor = MermaidVisitor()
+
+    parse, loaded = best_time(lambda: load_data(text, input_format), repeat)
+    connect, process = best_time(lambda: parser.parse_data(loaded), repeat)
+    render, _ = best_time(lambda: visitor.visit_process_to(process, NullStream()), repeat)
+    return {
+        'steps': len(process),
+        'parse': parse,
+        'connect': connect,
+        'render': render,
+        'peak_bytes': peak_memory(loaded),
+    }
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float = 0.5,
+                     memory_tolerance: float = 0.1) -> list:
+    """
+    Compare results with a baseline and describe each regression.
+
+    A phase regresses if it is slower than the baseline by more than
+    tolerance (a fraction) and by more than the noise floor; peak memory
+    regresses if it grows by more than memory_tolerance.
+    """
+    regressions = []
+    for key, result in results.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        for phase in PHASES:
+            limit = max(expected[phase] * (1 + tolerance), expected[phase] + NOISE_FLOOR)
+            if result[phase] > limit:
+                regressions.append(f"{key} {phase}: {result[phase] * 1000:.1f} ms, "
+                                   f"baseline {expected[phase] * 1000:.1f} ms")
+        if result['peak_bytes'] > expected['peak_bytes'] * (1 + memory_tolerance):
+            regressions.append(f"{key} peak memory: {result['peak_bytes'] / 1e6:.1f} MB, "
+                               f"baseline {expected['peak_bytes'] / 1e6:.1f} MB")
+    return regressions
+
+
+def main(argv=None) -> int:
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arguments.add_argument('--max-size', type=int, default=10000,
+                           help='largest process size, in steps (default: %(default)s)')
+    arguments.add_argument('--generators', nargs='+', choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    arguments.add_argument('--format', choices=[JSON, YAML], default=JSON,
+                           help='serialization loaded in the parse phase (default: %(default)s)')
+    arguments.add_argument('--baseline', type=Path, default=BASELINE)
+    arguments.add_argument('--save-baseline', action='store_true',
+                           help='write the results as the new baseline instead of comparing')
+    arguments.add_argument('--tolerance', type=float, default=0.5,
+                           help='allowed slowdown of a phase, as a fraction (default: %(default)s)')
+    arguments.add_argument('--memory-tolerance', type=float, default=0.1,
+                           help='allowed growth of peak memory, as a fraction (default: %(default)s)')
+    args = arguments.parse_args(argv)
+
+    sizes = [10 ** power for power in range(2, 7) if 10 ** power <= args.max_size]
+    print(f"{'process':>16} {'steps':>9} {'parse ms':>10} {'connect ms':>11} {'render ms':>10} {'peak MB':>8}")
+    results = {}
+    for generator in args.generators:
+        for size in sizes:
+            key = f"{generator}/{size}/{args.format}"
+            result = results[key] = measure(generator, size, args.format)
+            print(f"{generator + '/' + str(size):>16} {result['steps']:>9} {result['parse'] * 1000:>10.1f} "
+                  f"{result['connect'] * 1000:>11.1f} {result['render'] * 1000:>10.1f} "
+                  f"{result['peak_bytes'] / 1e6:>8.1f}")
+
+    if args.save_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+    regressions = find_regressions(results, json.loads(args.baseline.read_text()),
+                                   args.tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regressions against the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Generators for synthetic process definitions of any size.
+
+Each generator returns process data in the shape the parser loads from
+YAML, with roughly `size` steps, and is deterministic so results can be
+compared between runs.
+"""
+
+
+def _resources(count: int, step_type: str, prefix: str):
+    return [{'step_id': f"{prefix}_{index}", 'type': step_type, 'name': f"{step_type} {index}"}
+            for index in range(count)]
+
+
+def _process(kind: str, size: int, steps: list, resources: list) -> dict:
+    """Assemble process data, keeping only the resources some operation uses."""
+    used = set()
+    for step in steps:
+        used.update(operation['target'] for operation in step.get('operations', ()))
+        if isinstance(step.get('test'), dict):
+            used.add(step['test']['target'])
+    steps.extend(resource for resource in resources if resource['step_id'] in used)
+    return {
+        'process': {'process_id': f"{kind}_{size}", 'name': f"Synthetic {kind} of {size} steps"},
+        'steps': steps,
+    }
+
+
+def chain_process(size: int) -> dict:
+    """A long chain of tasks, each updating one of a handful of databases."""
+    databases = _resources(10, 'Database', 'db')
+    steps = [{'step_id': 'start', 'type': 'Start', 'name': 'Begin', 'successor': 'task_0'}]
+    for index in range(size):
+        successor = f"task_{index + 1}" if index + 1 < size else 'end'
+        steps.append({
+            'step_id': f"task_{index}",
+            'type': 'Task',
+            'name': f"Task number {index}",
+            'operations': [{
+                'type': 'Update',
+                'target': databases[index % len(databases)]['step_id'],
+                'description': f"Record result of task {index}",
+            }],
+            'successor': successor,
+        })
+    steps.append({'step_id': 'end', 'type': 'End', 'name': 'Finished'})
+    return _process('chain', size, steps, databases)
+
+
+def decision_tree_process(size: int) -> dict:
+    """
+    A wide binary tree of decisions.
+
+    Decision i branches to decisions 2i+1 and 2i+2; branches past the last
+    decision lead to a task and then an End. Every third decision tests a
+    database with a Query.
+    """
+    decisions = max(1, size // 3)
+    databases = _resources(5, 'Database', 'db')
+    steps = [{'step_id': 'start', 'type': 'Start', 'name': 'Begin', 'successor': 'decision_0'}]
+    leaves = []
+    for index in range(decisions):
+        branches = {}
+        for branch, child in (('yes', 2 * index + 1), ('no', 2 * index + 2)):
+            if child < decisions:
+                branches[branch] = f"decision_{child}"
+            else:
+                leaf = f"leaf_{index}_{branch}"
+                leaves.append(leaf)
+                branches[branch] = leaf
+        test = f"condition_{index} holds"
+        if index % 3 == 0:
+            test = {'type': 'Query', 'target': databases[index % len(databases)]['step_id'],
+                    'description': f"Look up condition {index}"}
+        steps.append({'step_id': f"decision_{index}", 'type': 'Decision',
+                      'name': f"Decision {index}", 'test': test, **branches})
+    for leaf in leaves:
+        steps.append({'step_id': leaf, 'type': 'Task', 'name': f"Handle {leaf}", 'successor': f"end_{leaf}"})
+        steps.append({'step_id': f"end_{leaf}", 'type': 'End', 'name': f"Finished {leaf}"})
+    return _process('tree', size, steps, databases)
+
+
+def fan_in_process(size: int) -> dict:
+    """A chain of tasks that each query and update several shared databases and documents."""
+    resources = _resources(5, 'Database', 'db') + _resources(3, 'Document', 'doc')
+    steps = [{'step_id': 'start', 'type': 'Start', 'name': 'Begin', 'successor': 'task_0'}]
+    for index in range(size):
+        operations = []
+        for offset in range(4):
+            resource = resources[(index + offset * 3) % len(resources)]
+            operations.append({
+                'type': 'Query' if offset % 2 == 0 else 'Update',
+                'target': resource['step_id'],
+                'description': f"Operation {offset} of task {index}",
+            })
+        successor = f"task_{index + 1}" if index + 1 < size else 'end'
+        steps.append({'step_id': f"task_{index}", 'type': 'Task', 'name': f"Task {index}",
+                      'operations': operations, 'successor': successor})
+    steps.append({'step_id': 'end', 'type': 'End', 'name': 'Finished'})
+    return _process('fan_in', size, steps, resources)
+
+
+GENERATORS = {
+    'chain': chain_process,
+    'tree': decision_tree_process,
+    'fan_in': fan_in_process,
+}
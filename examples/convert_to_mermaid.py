@@ -12,33 +12,33 @@ def yaml_to_mermaid(yaml_file_path: str, output_file_path: str = None) -> str:
     """
     Convert a YAML process definition to a Mermaid diagram.
     
+    The diagram is streamed straight to the output file rather than being
+    built up in memory first.
+    
     Args:
         yaml_file_path: Path to the YAML file to convert
         output_file_path: Optional path for output .mmd file. If not provided,
                          uses the same name as input file with .mmd extension
     
     Returns:
-        The generated Mermaid diagram as a string
+        The path of the generated Mermaid diagram
     """
     # Parse the YAML file
     parser = Parser()
     process = parser.parse_file(yaml_file_path)
     
-    # Generate Mermaid diagram
-    visitor = MermaidVisitor()
-    mermaid_diagram = visitor.visit_process(process)
-    
     # Determine output file path
     if output_file_path is None:
         yaml_path = Path(yaml_file_path)
         output_file_path = yaml_path.with_suffix('.mmd')
     
-    # Write to file
+    # Generate the Mermaid diagram directly into the file
+    visitor = MermaidVisitor()
     with open(output_file_path, 'w') as f:
-        f.write(mermaid_diagram)
+        visitor.visit_process_to(process, f)
     
     print(f"Converted {yaml_file_path} to {output_file_path}")
-    return mermaid_diagram
+    return str(output_file_path)
 
 
 def main():
@@ -58,4 +58,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,3 +1,28 @@
-"""Mermaid Mint - A Python project following TDD principles."""
+"""
+Mermaid Mint - A Python project following TDD principles.
+
+The main classes can be imported from the package itself. They are loaded
+on first use, so importing mermaid_mint alone costs almost nothing.
+"""
 
 __version__ = "0.1.0"
+
+_LAZY_EXPORTS = {
+    'Parser': 'parser',
+    'MermaidVisitor': 'visitors',
+    'Process': 'steps',
+}
+
+
+def __getattr__(name):
+    """Import the main classes on first access."""
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(f".{_LAZY_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
@@ -0,0 +1,315 @@
+"""
+Reachability, path and dominance questions over a Process.
+
+Every algorithm here is iterative, so processes of any depth stay within
+the recursion limit, and works over the control edges (successor, yes and
+no) unless other edge kinds are asked for. Path enumeration is a lazy
+generator holding only the current path, and takes limits on the number
+and length of the paths it yields, so a process with a combinatorial
+number of paths can still be explored a few at a time.
+"""
+
+import heapq
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .steps import Process, Decision, End, Edge, YES, NO
+from .validation import CONTROL_EDGES
+
+
+def _root(process: Process, source: Optional[str]) -> str:
+    """Return source, defaulting to the Start step, and check that it exists."""
+    if source is None:
+        if process.start is None:
+            raise ValueError(f"Process {process.process_id} has no Start step")
+        return process.start.step_id
+    if source not in process:
+        raise KeyError(source)
+    return source
+
+
+def _neighbours(process: Process, step_id: str, kinds) -> Iterator[str]:
+    for edge in process.out_edges(step_id):
+        if edge.kind in kinds and edge.target in process:
+            yield edge.target
+
+
+def _is_end(process: Process) -> Callable[[str], bool]:
+    return lambda step_id: isinstance(process[step_id], End)
+
+
+def bfs(process: Process, source: str = None, kinds: Iterable[str] = CONTROL_EDGES) -> Iterator[str]:
+    """Generate the IDs of the steps reachable from source (by default the Start) breadth first."""
+    source = _root(process, source)
+    kinds = tuple(kinds)
+    visited = {source}
+    queue = deque([source])
+    while queue:
+        step_id = queue.popleft()
+        yield step_id
+        for neighbour in _neighbours(process, step_id, kinds):
+            if neighbour not in visited:
+                visited.add(neighbour)
+                queue.append(neighbour)
+
+
+def dfs(process: Process, source: str = None, kinds: Iterable[str] = CONTROL_EDGES) -> Iterator[str]:
+    """Generate the IDs of the steps reachable from source in depth-first preorder, edges in order."""
+    source = _root(process, source)
+    kinds = tuple(kinds)
+    visited = {source}
+    yield source
+    stack = [_neighbours(process, source, kinds)]
+    while stack:
+        for neighbour in stack[-1]:
+            if neighbour not in visited:
+                visited.add(neighbour)
+                yield neighbour
+                stack.append(_neighbours(process, neighbour, kinds))
+                break
+        else:
+            stack.pop()
+
+
+def postorder(process: Process, source: str = None, kinds: Iterable[str] = CONTROL_EDGES) -> List[str]:
+    """Return the IDs of the steps reachable from source in depth-first postorder."""
+    source = _root(process, source)
+    kinds = tuple(kinds)
+    visited = {source}
+    order = []
+    stack = [(source, _neighbours(process, source, kinds))]
+    while stack:
+        step_id, neighbours = stack[-1]
+        for neighbour in neighbours:
+            if neighbour not in visited:
+                visited.add(neighbour)
+                stack.append((neighbour, _neighbours(process, neighbour, kinds)))
+                break
+        else:
+            stack.pop()
+            order.append(step_id)
+    return order
+
+
+def distances(process: Process, source: str = None, kinds: Iterable[str] = CONTROL_EDGES) -> Dict[str, int]:
+    """Return the number of edges on the shortest path from source to every step reachable from it."""
+    source = _root(process, source)
+    kinds = tuple(kinds)
+    hops = {source: 0}
+    queue = deque([source])
+    while queue:
+        step_id = queue.popleft()
+        for neighbour in _neighbours(process, step_id, kinds):
+            if neighbour not in hops:
+                hops[neighbour] = hops[step_id] + 1
+                queue.append(neighbour)
+    return hops
+
+
+def shortest_path(process: Process, source: str = None, target: str = None,
+                  weight: Callable[[Edge], float] = None,
+                  kinds: Iterable[str] = CONTROL_EDGES) -> Optional[Tuple[str, ...]]:
+    """
+    Return the step IDs on a shortest path from source to target, or None if there is none.
+
+    source defaults to the Start step and target to the nearest End step.
+    Without weight every edge counts as one and a breadth-first search is
+    used; with weight(edge) giving a non-negative cost, Dijkstra's algorithm.
+    """
+    source = _root(process, source)
+    if target is not None and target not in process:
+        raise KeyError(target)
+    is_target = _is_end(process) if target is None else target.__eq__
+    kinds = tuple(kinds)
+    parents = {source: None}
+    found = None
+    if weight is None:
+        queue = deque([source])
+        while queue and found is None:
+            step_id = queue.popleft()
+            if is_target(step_id):
+                found = step_id
+                break
+            for neighbour in _neighbours(process, step_id, kinds):
+                if neighbour not in parents:
+                    parents[neighbour] = step_id
+                    queue.append(neighbour)
+    else:
+        costs = {source: 0.0}
+        done = set()
+        # (cost, tie breaker, step ID), so step IDs are never compared
+        heap = [(0.0, 0, source)]
+        pushed = 1
+        while heap:
+            cost, _, step_id = heapq.heappop(heap)
+            if step_id in done:
+                continue
+            done.add(step_id)
+            if is_target(step_id):
+                found = step_id
+                break
+            for edge in process.out_edges(step_id):
+                if edge.kind not in kinds or edge.target not in process or edge.target in done:
+                    continue
+                candidate = cost + weight(edge)
+                if candidate < costs.get(edge.target, float('inf')):
+                    costs[edge.target] = candidate
+                    parents[edge.target] = step_id
+                    heapq.heappush(heap, (candidate, pushed, edge.target))
+                    pushed += 1
+    if found is None:
+        return None
+    path = []
+    while found is not None:
+        path.append(found)
+        found = parents[found]
+    return tuple(reversed(path))
+
+
+def paths(process: Process, source: str = None, target: str = None, max_paths: int = None,
+          max_length: int = None, kinds: Iterable[str] = CONTROL_EDGES) -> Iterator[Tuple[str, ...]]:
+    """
+    Lazily generate the distinct simple paths from source to target, as tuples of step IDs.
+
+    source defaults to the Start step and target to every End step. A path
+    never visits a step twice, so loops are followed at most once around.
+    Paths come in depth-first order, following edges in order (successor,
+    then yes before no). At most max_paths paths are generated, and paths
+    longer than max_length steps are not followed. Only the current path
+    is held in memory, however many paths there are.
+    """
+    source = _root(process, source)
+    if target is not None and target not in process:
+        raise KeyError(target)
+    is_target = _is_end(process) if target is None else target.__eq__
+    kinds = tuple(kinds)
+    if max_paths is not None and max_paths <= 0:
+        return
+    if is_target(source):
+        yield (source,)
+        return
+    path = [source]
+    on_path = {source}
+    stack = [_neighbours(process, source, kinds)]
+    produced = 0
+    while stack:
+        for neighbour in stack[-1]:
+            length = len(path) + 1
+            if neighbour in on_path or (max_length is not None and length > max_length):
+                continue
+            if is_target(neighbour):
+                yield tuple(path) + (neighbour,)
+                produced += 1
+                if produced == max_paths:
+                    return
+                continue
+            if length == max_length:
+                # Too long to reach a target through this step
+                continue
+            path.append(neighbour)
+            on_path.add(neighbour)
+            stack.append(_neighbours(process, neighbour, kinds))
+            break
+        else:
+            stack.pop()
+            on_path.discard(path.pop())
+
+
+def dominators(process: Process, source: str = None,
+               kinds: Iterable[str] = CONTROL_EDGES) -> Dict[str, Optional[str]]:
+    """
+    Return the immediate dominator of every step reachable from source, with source mapped to None.
+
+    A step d dominates s when every path from source to s passes through d.
+    Uses the iterative algorithm of Cooper, Harvey and Kennedy over the
+    reverse postorder, which converges in a few passes on process graphs.
+    """
+    source = _root(process, source)
+    kinds = tuple(kinds)
+    order = postorder(process, source, kinds)
+    order.reverse()
+    rank = {step_id: number for number, step_id in enumerate(order)}
+    predecessors = {step_id: [edge.source for edge in process.in_edges(step_id)
+                              if edge.kind in kinds and edge.source in rank]
+                    for step_id in order}
+    idom = {source: source}
+
+    def intersect(first, second):
+        while first != second:
+            while rank[first] > rank[second]:
+                first = idom[first]
+            while rank[second] > rank[first]:
+                second = idom[second]
+        return first
+
+    changed = True
+    while changed:
+        changed = False
+        for step_id in order[1:]:
+            new = None
+            for predecessor in predecessors[step_id]:
+                if predecessor in idom:
+                    new = predecessor if new is None else intersect(predecessor, new)
+            if idom.get(step_id) != new:
+                idom[step_id] = new
+                changed = True
+    idom[source] = None
+    return idom
+
+
+def dominated_by(idom: Dict[str, Optional[str]], step_id: str) -> List[str]:
+    """Return the dominators of a step, nearest first, from the result of dominators()."""
+    chain = []
+    step_id = idom.get(step_id)
+    while step_id is not None:
+        chain.append(step_id)
+        step_id = idom[step_id]
+    return chain
+
+
+def gating_decisions(process: Process, step_id: str, source: str = None,
+                     idom: Dict[str, Optional[str]] = None) -> List[Tuple[str, str]]:
+    """
+    Return (decision ID, 'yes' or 'no') for every Decision that gates a step, nearest first.
+
+    A Decision gates a step if every path from source to the step passes
+    through it and the step can only be reached through one of its branches
+    (without coming back through the Decision). The branch returned is the
+    answer needed to reach the step. Pass idom from dominators() to answer
+    many questions about one process without recomputing it.
+    """
+    if step_id not in process:
+        raise KeyError(step_id)
+    if idom is None:
+        idom = dominators(process, source)
+    if step_id not in idom:
+        return []
+    gates = []
+    for dominator in dominated_by(idom, step_id):
+        decision = process[dominator]
+        if not isinstance(decision, Decision):
+            continue
+        reaching = [answer for answer, branch in ((YES, decision.yes), (NO, decision.no))
+                    if branch is not None
+                    and _reaches(process, branch.step_id, step_id, avoiding=dominator)]
+        if len(reaching) == 1:
+            gates.append((dominator, reaching[0]))
+    return gates
+
+
+def _reaches(process: Process, source: str, target: str, avoiding: str) -> bool:
+    """Return True if target can be reached from source along control edges without passing avoiding."""
+    if source == target:
+        return True
+    if source == avoiding or source not in process:
+        return False
+    visited = {source, avoiding}
+    queue = deque([source])
+    while queue:
+        for neighbour in _neighbours(process, queue.popleft(), CONTROL_EDGES):
+            if neighbour == target:
+                return True
+            if neighbour not in visited:
+                visited.add(neighbour)
+                queue.append(neighbour)
+    return False
@@ -0,0 +1,350 @@
+"""Batch conversion of many process files to Mermaid diagrams."""
+
+import glob
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .cache import ConversionCache, cache_key
+from .chunking import ChunkedMermaidVisitor
+from .manifest import ManifestLoader, is_fragment, is_manifest, manifest_dependencies
+from .parser import FORMATS_BY_SUFFIX, Parser, input_format_for, load_data
+from .serializer import SNAPSHOT_SUFFIX, loads_snapshot
+from .validation import Problem, validate
+from .visitors import VISITORS, MermaidVisitor, get_visitor, visit_to_files, visitor_class
+
+PROCESS_FILE_SUFFIXES = tuple(FORMATS_BY_SUFFIX) + (SNAPSHOT_SUFFIX,)
+OUTPUT_SUFFIX = '.mmd'
+DEFAULT_FORMATS = (MermaidVisitor.format_name,)
+
+# Problem kinds for files that could not be loaded at all, and for
+# fragments that no manifest being checked includes
+UNREADABLE = 'unreadable'
+UNUSED_FRAGMENT = 'unused-fragment'
+
+# One warm parser, manifest loader and visitor per interpreter (each pool
+# worker gets its own); the loader keeps fragments cached between files
+_parser = Parser()
+_manifests = ManifestLoader(_parser)
+_visitor = MermaidVisitor()
+
+
+@dataclass
+class ConversionResult:
+    """Outcome of converting a single process file."""
+    source: str
+    output: str
+    error: Optional[str] = None
+    seconds: float = 0.0
+    cached: bool = False
+    skipped: bool = False
+    dependencies: Tuple[str, ...] = ()
+
+    @property
+    def ok(self) -> bool:
+        """True if the conversion succeeded or the file was skipped as a fragment."""
+        return self.error is None
+
+
+@dataclass
+class CheckResult:
+    """Problems found when validating a single process file."""
+    source: str
+    problems: List[Problem]
+
+    @property
+    def ok(self) -> bool:
+        """True if no problems were found."""
+        return not self.problems
+
+
+@dataclass
+class BatchSummary:
+    """Totals for a batch run."""
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def total(self) -> int:
+        """Number of files attempted."""
+        return self.succeeded + self.failed + self.skipped
+
+    @property
+    def files_per_second(self) -> float:
+        """Overall throughput of the run."""
+        return self.total / self.seconds if self.seconds else 0.0
+
+    def add(self, result):
+        """Count a finished conversion or check."""
+        if getattr(result, 'skipped', False):
+            self.skipped += 1
+        elif result.ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+
+def plan_conversions(paths: Iterable[str], output_dir: str = None) -> List[Tuple[str, str]]:
+    """
+    Expand files, directories and glob patterns into (source, output) pairs.
+
+    Directories are searched recursively for YAML, JSON and msgpack files.
+    Outputs are written next to their sources unless output_dir is given, in
+    which case files found under a directory keep their path relative to it.
+    """
+    jobs = {}
+    for path in paths:
+        for source, relative in _expand(path):
+            if output_dir is None:
+                output = source.with_suffix(OUTPUT_SUFFIX)
+            else:
+                output = Path(output_dir, relative).with_suffix(OUTPUT_SUFFIX)
+            jobs.setdefault(str(source), str(output))
+    return sorted(jobs.items())
+
+
+def output_paths(output: str, formats: Sequence[str] = DEFAULT_FORMATS) -> Dict[str, str]:
+    """Return {format name: path} for a planned output, swapping the .mmd suffix for each format's own."""
+    paths = {}
+    for format_name in formats:
+        paths[format_name] = str(Path(output).with_suffix(visitor_class(format_name).suffix))
+    return paths
+
+
+def _is_output_file(filename: str) -> bool:
+    """Return True for names written by a visitor, such as .graph.json, which are never inputs."""
+    return filename.endswith(tuple(visitor.suffix for visitor in VISITORS.values()))
+
+
+def _expand(path: str) -> Iterator[Tuple[Path, Path]]:
+    """Yield (source, path relative to its search root) for one argument."""
+    root = Path(path)
+    if root.is_dir():
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(PROCESS_FILE_SUFFIXES) and not _is_output_file(filename):
+                    source = Path(dirpath, filename)
+                    yield source, source.relative_to(root)
+    elif root.is_file():
+        yield root, Path(root.name)
+    else:
+        for match in glob.iglob(path, recursive=True):
+            source = Path(match)
+            if source.is_file() and not _is_output_file(source.name):
+                yield source, Path(source.name)
+
+
+def convert_file(source: str, output: str, cache_dir: str = None,
+                 page_budget: Tuple[int, int] = None,
+                 formats: Sequence[str] = DEFAULT_FORMATS) -> ConversionResult:
+    """
+    Convert one file, reporting failure in the result rather than raising.
+
+    Fragments and libraries of a manifest are skipped; a manifest is
+    converted together with the files it includes. Every format in formats
+    is written in a single walk over the process, next to output with the
+    format's suffix. If cache_dir is given, the outputs of a single-file
+    process are also stored in the conversion cache there. Manifest outputs
+    are not, since their key would have to cover every included file. If
+    page_budget is given as (max_nodes, max_edges), a Mermaid diagram too
+    large for one page is written as linked pages next to output, with an
+    index page at output.
+    """
+    started = time.perf_counter()
+    try:
+        outputs = output_paths(output, formats)
+        output = outputs[formats[0]]
+        raw = Path(source).read_bytes()
+        process, dependencies = load_process(source, raw)
+        if process is None:
+            return ConversionResult(source, output, seconds=time.perf_counter() - started, skipped=True)
+        visitors = {}
+        for format_name, path in outputs.items():
+            if format_name == MermaidVisitor.format_name and page_budget is not None:
+                ChunkedMermaidVisitor(*page_budget).visit_process_to_files(process, path, atomic_output)
+            else:
+                visitors[path] = _visitor if format_name == MermaidVisitor.format_name else get_visitor(format_name)
+        visit_to_files(process, visitors, atomic_output)
+        if cache_dir is not None and not dependencies and page_budget is None:
+            cache = ConversionCache(cache_dir)
+            for format_name, path in outputs.items():
+                cache.put_file(cache_key(raw, format_name), path)
+    except Exception as e:
+        return ConversionResult(source, output, f"{type(e).__name__}: {e}",
+                                time.perf_counter() - started)
+    return ConversionResult(source, output, seconds=time.perf_counter() - started,
+                            dependencies=tuple(dependencies))
+
+
+def load_process(source: str, raw: bytes):
+    """
+    Load a process file or manifest from its raw contents.
+
+    Returns (process, dependencies), where dependencies lists the files a
+    manifest includes. Returns (None, []) for a fragment or library, which
+    only makes sense as part of a manifest. Snapshots are recognised by
+    their suffix.
+    """
+    if source.endswith(SNAPSHOT_SUFFIX):
+        return loads_snapshot(raw), []
+    data = load_data(raw, input_format_for(source))
+    if is_manifest(data):
+        return _manifests.load_data(data, source), _manifests.dependencies(source, data)
+    if is_fragment(data):
+        return None, []
+    return _parser.parse_data(data), []
+
+
+@contextmanager
+def atomic_output(output: str):
+    """
+    Open a temporary file next to output and move it into place on success.
+
+    Readers of output never see a partly written file, and a failed
+    conversion leaves any previous output untouched.
+    """
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = output.with_name(f".{output.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(temp_path, 'x') as output_file:
+            yield output_file
+        os.replace(temp_path, output)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def _write_output(output: str, diagram: str):
+    with atomic_output(output) as output_file:
+        output_file.write(diagram)
+
+
+def _convert_from_cache(source: str, output: str, cache: ConversionCache,
+                        formats: Sequence[str] = DEFAULT_FORMATS) -> Optional[ConversionResult]:
+    """Reuse the cached outputs for source, or return None unless every format is cached."""
+    started = time.perf_counter()
+    try:
+        raw = Path(source).read_bytes()
+        outputs = output_paths(output, formats)
+        cached = {}
+        for format_name, path in outputs.items():
+            cached[path] = cache.get(cache_key(raw, format_name))
+            if cached[path] is None:
+                return None
+        for path, text in cached.items():
+            _write_output(path, text)
+    except OSError:
+        # Let the full conversion report the problem
+        return None
+    return ConversionResult(source, outputs[formats[0]], seconds=time.perf_counter() - started, cached=True)
+
+
+def convert_all(jobs: List[Tuple[str, str]], workers: int = None,
+                cache: ConversionCache = None, page_budget: Tuple[int, int] = None,
+                formats: Sequence[str] = DEFAULT_FORMATS) -> Iterator[ConversionResult]:
+    """
+    Convert (source, output) pairs, yielding each result as soon as it finishes.
+
+    With workers=1 the conversions run in this process; otherwise they are
+    spread across a process pool (workers=None uses one per CPU). If a cache
+    is given, unchanged sources are served from it without being parsed, new
+    outputs are added to it, and it is trimmed to size at the end of the run.
+    The cache holds single diagrams, so it is not used when page_budget is
+    given. See convert_file for formats.
+    """
+    if page_budget is not None:
+        cache = None
+    pending = []
+    for source, output in jobs:
+        result = _convert_from_cache(source, output, cache, formats) if cache is not None else None
+        if result is not None:
+            yield result
+        else:
+            pending.append((source, output))
+
+    cache_dir = str(cache.directory) if cache is not None else None
+    yield from _run_all(convert_file, [(source, output, cache_dir, page_budget, tuple(formats))
+                                       for source, output in pending], workers)
+
+    if cache is not None:
+        cache.evict()
+
+
+def build_process(source: str, raw: bytes):
+    """
+    Load a process file or manifest like load_process, without failing on reference problems.
+
+    Returns (process, problems) as Parser.build does, or (None, []) for a
+    fragment or library.
+    """
+    if source.endswith(SNAPSHOT_SUFFIX):
+        return loads_snapshot(raw), []
+    data = load_data(raw, input_format_for(source))
+    if is_manifest(data):
+        data = _manifests.merge(data, source)
+    elif is_fragment(data):
+        return None, []
+    return _parser.build(data)
+
+
+def check_file(source: str, check_cycles: bool = False, included: bool = False) -> CheckResult:
+    """
+    Parse and validate one file, reporting every problem found.
+
+    Reference problems found while building the process are reported
+    together with validate's. A fragment or library is reported unless
+    included is set, meaning a manifest being checked uses it.
+    """
+    try:
+        process, problems = build_process(source, Path(source).read_bytes())
+    except Exception as e:
+        return CheckResult(source, [Problem(UNREADABLE, None, f"{type(e).__name__}: {e}")])
+    if process is None:
+        if included:
+            return CheckResult(source, [])
+        return CheckResult(source, [Problem(UNUSED_FRAGMENT, None,
+                                            "has steps but no process header, and no manifest "
+                                            "being checked includes it")])
+    return CheckResult(source, problems + validate(process, check_cycles))
+
+
+def check_all(sources: List[str], workers: int = None, check_cycles: bool = False) -> Iterator[CheckResult]:
+    """
+    Validate many files, yielding each result as soon as it finishes.
+
+    Fragments and libraries pass only if a manifest among sources includes them.
+    """
+    included = set()
+    for source in sources:
+        try:
+            included.update(manifest_dependencies(source))
+        except Exception:
+            # check_file reports the manifest itself
+            pass
+    yield from _run_all(check_file, [(source, check_cycles, os.path.normpath(source) in included)
+                                     for source in sources], workers)
+
+
+def _run_all(function, jobs: List[tuple], workers: int = None) -> Iterator:
+    """
+    Call function with each tuple of arguments, yielding results in completion order.
+
+    With workers=1 the calls run in this process; otherwise they are spread
+    across a process pool (workers=None uses one per CPU).
+    """
+    if workers == 1 or len(jobs) <= 1:
+        for arguments in jobs:
+            yield function(*arguments)
+        return
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(function, *arguments) for arguments in jobs]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,130 @@
+"""On-disk cache of conversion outputs keyed by a hash of their inputs."""
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from . import __version__
+
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'mermaid_mint'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Entries live in this subdirectory of the cache directory, so pointing the
+# cache at a directory that holds other files never touches them
+ENTRIES_DIR = 'mermaid_mint-entries'
+_KEY = re.compile(r'[0-9a-f]{64}')
+
+
+def cache_key(source: bytes, output_format: str = 'mermaid') -> str:
+    """Return the cache key for converting source bytes to the given format."""
+    digest = hashlib.sha256()
+    digest.update(__version__.encode())
+    digest.update(b'\0')
+    digest.update(output_format.encode())
+    digest.update(b'\0')
+    digest.update(source)
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """
+    A directory of cached conversion outputs with size-bounded eviction.
+
+    Entries are stored one file per key, under ENTRIES_DIR in directory.
+    Reading an entry refreshes its modification time, so eviction removes
+    the least recently used entries first once the cache grows beyond
+    max_bytes. Eviction and clear() only remove files named like entries
+    in that subdirectory, never anything else in directory.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / ENTRIES_DIR / key[:2] / key
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached output for key, or None if it is not cached."""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r') as entry:
+                output = entry.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return output
+
+    def put(self, key: str, output: str):
+        """Store output under key, replacing any existing entry atomically."""
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(handle, 'w') as entry:
+            entry.write(output)
+        os.replace(temp_path, path)
+
+    def put_file(self, key: str, output_path):
+        """Store the contents of an output file under key without reading it into memory."""
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as entry, open(output_path, 'rb') as output:
+            shutil.copyfileobj(output, entry)
+        os.replace(temp_path, path)
+
+    def size(self) -> int:
+        """Return the total size in bytes of all cached entries."""
+        return sum(path.stat().st_size for path in self._entries())
+
+    def evict(self) -> int:
+        """Remove least recently used entries until within max_bytes; return the count removed."""
+        entries = [(path.stat(), path) for path in self._entries()]
+        total = sum(stat.st_size for stat, _ in entries)
+        removed = 0
+        for stat, path in sorted(entries, key=lambda entry: entry[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            path.unlink()
+            total -= stat.st_size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """Remove every cached entry, and the cache's subdirectories once they are empty."""
+        entries_dir = self.directory / ENTRIES_DIR
+        for path in self._entries(include_temporary=True):
+            path.unlink(missing_ok=True)
+        for shard in entries_dir.glob('*') if entries_dir.is_dir() else ():
+            self._remove_if_empty(shard)
+        self._remove_if_empty(entries_dir)
+
+    @staticmethod
+    def _remove_if_empty(directory: Path):
+        try:
+            directory.rmdir()
+        except OSError:
+            pass
+
+    def _entries(self, include_temporary: bool = False):
+        """Return the entry files the cache wrote, leaving out partly written ones unless asked."""
+        entries_dir = self.directory / ENTRIES_DIR
+        if not entries_dir.is_dir():
+            return []
+        entries = []
+        for path in entries_dir.glob('*/*'):
+            name = path.name
+            if name.endswith('.tmp'):
+                if include_temporary:
+                    entries.append(path)
+            elif _KEY.fullmatch(name) and path.parent.name == name[:2] and path.is_file():
+                entries.append(path)
+        return entries
@@ -0,0 +1,194 @@
+"""
+Loading many processes together, sharing what they have in common.
+
+A large catalogue repeats itself: the same Databases and Documents appear
+in process after process, and names such as "Begin" and operation
+descriptions recur across files. Loaded one at a time, every process gets
+its own copy of each. A Catalogue loads them into one interpreter and,
+as each process is added:
+
+- interns its strings (step IDs, names, descriptions and string tests)
+  in a table shared by the whole catalogue, so equal strings are stored
+  once, and
+- replaces each Database or Document with the first one loaded having
+  the same type, step_id and name, retargeting the operations that use
+  it, so every process refers to one canonical resource object.
+
+Resources have no outgoing references, so sharing them between processes
+is safe. Treat shared resources as read-only: renaming one renames it in
+every process. Resources that share an ID but differ in type or name are
+kept apart and listed in conflicts.
+
+memory_report loads the same files with and without a Catalogue under
+tracemalloc and reports the difference.
+"""
+
+import gc
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+from .steps import Process, Task, Decision, Resource, Query, _gc_paused
+
+
+class Catalogue:
+    """Processes loaded together, with repeated strings interned and identical resources shared."""
+
+    def __init__(self):
+        # Process by source path, in load order
+        self.processes: Dict[str, Process] = {}
+        self.failures: List[Tuple[str, str]] = []
+        # IDs of resources defined differently in different processes
+        self.conflicts: Set[str] = set()
+        self.strings_seen = 0
+        self.resources_seen = 0
+        self._strings = {}
+        self._resources = {}
+        self._resource_keys = {}
+
+    @property
+    def unique_strings(self) -> int:
+        """Number of distinct strings held by the catalogue's processes."""
+        return len(self._strings)
+
+    @property
+    def unique_resources(self) -> int:
+        """Number of distinct resource objects shared by the catalogue's processes."""
+        return len(self._resources)
+
+    def intern(self, value):
+        """Return the catalogue's copy of a string, adding it if new; other values are returned as is."""
+        if type(value) is not str:
+            return value
+        self.strings_seen += 1
+        return self._strings.setdefault(value, value)
+
+    def load(self, paths: Iterable[str]) -> 'Catalogue':
+        """Load every process file matched by files, directories or glob patterns, skipping fragments."""
+        from .batch import load_process, plan_conversions
+        for source, _ in plan_conversions(paths):
+            try:
+                process, _ = load_process(source, Path(source).read_bytes())
+            except Exception as error:
+                self.failures.append((source, f"{type(error).__name__}: {error}"))
+                continue
+            if process is not None:
+                self.add(process, source)
+        return self
+
+    def add(self, process: Process, source: str = None) -> Process:
+        """Share the strings and resources of a process with the catalogue and keep it under source."""
+        with _gc_paused():
+            self._share(process)
+        self.processes[source or process.process_id] = process
+        return process
+
+    def _share(self, process: Process):
+        intern = self.intern
+        process.process_id = intern(process.process_id)
+        process.name = intern(process.name)
+        step_ids = process.step_ids()
+        steps = [process[step_id] for step_id in step_ids]
+        # Re-insert every step so the step table's keys are interned too
+        for step_id in step_ids:
+            del process[step_id]
+        replaced = {}
+        for step in steps:
+            step.step_id = intern(step.step_id)
+            step.name = intern(step.name)
+            if isinstance(step, Resource):
+                canonical = self._canonical(step)
+                replaced[id(step)] = canonical
+                step = canonical
+            process[step.step_id] = step
+
+        for step in steps:
+            if isinstance(step, Task):
+                operations = step.operations
+            elif isinstance(step, Decision):
+                if not isinstance(step.test, Query):
+                    step.test = intern(step.test)
+                    continue
+                operations = (step.test,)
+            else:
+                continue
+            for operation in operations:
+                operation.description = intern(operation.description)
+                if id(operation.target) in replaced:
+                    operation.target = replaced[id(operation.target)]
+
+    def _canonical(self, resource: Resource) -> Resource:
+        """Return the shared resource equal to this one, making it the shared one if it is the first."""
+        self.resources_seen += 1
+        key = (type(resource), resource.step_id, resource.name)
+        canonical = self._resources.setdefault(key, resource)
+        first_key = self._resource_keys.setdefault(resource.step_id, key)
+        if first_key != key:
+            self.conflicts.add(resource.step_id)
+        return canonical
+
+    def summary_lines(self) -> List[str]:
+        """Return a short description of what the catalogue holds and shares."""
+        steps = sum(len(process) for process in self.processes.values())
+        return [
+            f"{len(self.processes)} processes, {steps} steps, {len(self.failures)} files failed",
+            f"strings: {self.strings_seen} held as {self.unique_strings} distinct",
+            f"resources: {self.resources_seen} held as {self.unique_resources} shared objects, "
+            f"{len(self.conflicts)} IDs defined differently in different processes",
+        ]
+
+
+def _traced_load(load) -> Tuple[object, int]:
+    """Call load() and return (its result, the bytes it left allocated)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = load()
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return result, used
+
+
+def memory_report(paths: Iterable[str]) -> dict:
+    """
+    Load the same files separately and as a Catalogue, and return the memory each kept.
+
+    Both loads run under tracemalloc, which slows them down several times,
+    so this is for reports rather than routine loading.
+    """
+    from .batch import load_process, plan_conversions
+    sources = [source for source, _ in plan_conversions(paths)]
+
+    def load_separately():
+        processes = []
+        for source in sources:
+            try:
+                processes.append(load_process(source, Path(source).read_bytes())[0])
+            except Exception:
+                pass
+        return processes
+
+    # Load a file untraced so lazy imports are not counted against the first measurement
+    if sources:
+        try:
+            load_process(sources[0], Path(sources[0]).read_bytes())
+        except Exception:
+            pass
+    processes, separate_bytes = _traced_load(load_separately)
+    del processes
+    catalogue, catalogue_bytes = _traced_load(lambda: Catalogue().load(sources))
+    return {
+        'files': len(sources),
+        'processes': len(catalogue.processes),
+        'separate_bytes': separate_bytes,
+        'catalogue_bytes': catalogue_bytes,
+        'saved_bytes': separate_bytes - catalogue_bytes,
+        'strings_seen': catalogue.strings_seen,
+        'unique_strings': catalogue.unique_strings,
+        'resources_seen': catalogue.resources_seen,
+        'unique_resources': catalogue.unique_resources,
+        'conflicts': sorted(catalogue.conflicts),
+    }
@@ -0,0 +1,239 @@
+"""
+Splitting of oversized processes into linked Mermaid pages.
+
+Browsers struggle to render diagrams with thousands of nodes, and Mermaid
+has its own limits on edges and text size. A ChunkedMermaidVisitor writes
+a large process as several .mmd pages, each within a node and edge budget,
+and an index page showing how they connect.
+"""
+
+from pathlib import Path
+from typing import Callable, Iterator, List
+
+from .profiling import RENDER, phase
+from .steps import Process, Collapsed, Resource
+from .subgraph import extract
+from .validation import CONTROL_EDGES
+from .visitors import MermaidVisitor
+
+DEFAULT_MAX_NODES = 200
+DEFAULT_MAX_EDGES = 400
+
+
+def layout_order(process: Process) -> List[str]:
+    """
+    Return every step_id in depth-first order of the control flow from the start.
+
+    Each branch of a decision is listed in full before the next, yes before
+    no, so consecutive steps belong together. Steps not reachable from the
+    start follow in definition order.
+    """
+    order = []
+    visited = set()
+    roots = [process.start.step_id] if process.start is not None else []
+    for root in roots + list(process.step_ids()):
+        stack = [root]
+        while stack:
+            step_id = stack.pop()
+            if step_id in visited or step_id not in process:
+                continue
+            visited.add(step_id)
+            order.append(step_id)
+            branches = [edge.target for edge in process.out_edges(step_id) if edge.kind in CONTROL_EDGES]
+            stack.extend(reversed(branches))
+    return order
+
+
+class _Page:
+    """The steps of one page, with the nodes and edges drawing them will take."""
+
+    def __init__(self, process: Process, control_in: dict):
+        self.process = process
+        # Control edges into each step, so a shared resource's many operation
+        # edges are not scanned again for every page that draws it
+        self.control_in = control_in
+        self.step_ids = []
+        self.members = set()
+        self.nodes = set()
+        self.edges = set()
+
+    def cost(self, step_ids: List[str]) -> tuple:
+        """Return the (nodes, edges) the page would draw with step_ids added."""
+        edges = set()
+        for step_id in step_ids:
+            edges.update(self._edges(step_id))
+        edges -= self.edges
+        nodes = set(step_ids) | {edge.source for edge in edges} | {edge.target for edge in edges}
+        return len(self.nodes) + len(nodes - self.nodes), len(self.edges) + len(edges)
+
+    def add(self, step_ids: List[str]):
+        for step_id in step_ids:
+            self.step_ids.append(step_id)
+            self.members.add(step_id)
+            self.nodes.add(step_id)
+            for edge in self._edges(step_id):
+                self.edges.add(edge)
+                self.nodes.update((edge.source, edge.target))
+
+    def _edges(self, step_id: str):
+        # Operations from other pages onto a resource are not drawn here
+        yield from self.process.out_edges(step_id)
+        yield from self.control_in.get(step_id, ())
+
+
+def partition(process: Process, max_nodes: int = DEFAULT_MAX_NODES,
+              max_edges: int = DEFAULT_MAX_EDGES) -> List[List[str]]:
+    """
+    Split a process into pages of step_ids, each drawing at most max_nodes nodes and max_edges edges.
+
+    Steps are taken in layout_order and a new page is started when the next
+    step would exceed either budget, so pages follow decision branches.
+    Nodes and edges include the placeholders for steps on other pages. The
+    Databases and Documents a step uses are drawn on the same page as the
+    step, so a shared resource may appear on several pages. A step that
+    cannot fit within the budgets even on a page of its own gets one anyway.
+    """
+    control_in = _control_in(process)
+    pages = []
+    page = _Page(process, control_in)
+    placed = set()
+    for step_id in layout_order(process):
+        if step_id in placed:
+            continue
+        resources = [edge.target for edge in process.out_edges(step_id)
+                     if isinstance(process.get_step(edge.target), Resource)]
+        additions = [step_id] + [resource for resource in dict.fromkeys(resources)
+                                 if resource not in page.members]
+        nodes, edges = page.cost(additions)
+        if page.step_ids and (nodes > max_nodes or edges > max_edges):
+            pages.append(page.step_ids)
+            page = _Page(process, control_in)
+        page.add(additions)
+        placed.update(additions)
+    if page.step_ids or not pages:
+        pages.append(page.step_ids)
+    return pages
+
+
+class ChunkedMermaidVisitor:
+    """
+    Visitor that writes a Process as linked Mermaid pages when it is too large for one diagram.
+
+    Each page draws the steps of one partition plus a placeholder for every
+    step on another page that it connects to. Placeholders and the nodes of
+    the index page are click links to the page that holds the step.
+    """
+
+    def __init__(self, max_nodes: int = DEFAULT_MAX_NODES, max_edges: int = DEFAULT_MAX_EDGES):
+        self.max_nodes = max_nodes
+        self.max_edges = max_edges
+        self._visitor = MermaidVisitor()
+
+    @staticmethod
+    def page_names(output: str, count: int) -> List[str]:
+        """Return the file names of the pages written alongside output."""
+        stem = Path(output).stem
+        return [f"{stem}-{number}.mmd" for number in range(1, count + 1)]
+
+    def visit_process_to_files(self, process: Process, output: str,
+                               opener: Callable = None) -> List[str]:
+        """
+        Write a process to output, or to pages next to it and an index at output if it is too large.
+
+        opener(path) must return a context manager giving a text stream;
+        by default files are opened for writing. Returns the paths written,
+        index last.
+        """
+        opener = opener or (lambda path: open(path, 'w'))
+        pages = partition(process, self.max_nodes, self.max_edges)
+        if len(pages) == 1:
+            with opener(output) as stream:
+                self._visitor.visit_process_to(process, stream)
+            return [str(output)]
+
+        names = self.page_names(output, len(pages))
+        page_of = _page_of(pages)
+        control_in = _control_in(process)
+        # Pages draw their steps in process order; sorting each page here saves
+        # extract scanning the whole process once per page
+        position = {step_id: number for number, step_id in enumerate(process.step_ids())}
+        ordered = [sorted(step_ids, key=position.__getitem__) for step_ids in pages]
+        written = []
+        with phase(RENDER):
+            for number, name in enumerate(names):
+                path = Path(output).with_name(name)
+                with opener(path) as stream:
+                    _write_lines(stream, self.iter_page_lines(process, ordered, number, names,
+                                                                page_of, control_in))
+                written.append(str(path))
+            with opener(output) as stream:
+                _write_lines(stream, self.iter_index_lines(process, pages, names))
+        written.append(str(output))
+        return written
+
+    def iter_page_lines(self, process: Process, pages: List[List[str]], number: int,
+                        names: List[str], page_of: dict = None, control_in: dict = None) -> Iterator[str]:
+        """
+        Generate the lines of one page, linking its placeholders to the pages holding their steps.
+
+        Each page's step_ids must be in process order. When drawing many
+        pages, pass page_of from _page_of(pages) and control_in from
+        _control_in(process) to compute them only once.
+        """
+        if page_of is None:
+            page_of = _page_of(pages)
+        if control_in is None:
+            control_in = _control_in(process)
+        focused = extract(process, pages[number], resource_users=False, in_order=True,
+                          in_edges=lambda step_id: control_in.get(step_id, ()))
+        yield from self._visitor.iter_lines(focused)
+        for step_id in focused.step_ids():
+            step = focused[step_id]
+            if isinstance(step, Collapsed):
+                yield f'    click {step_id} "{names[page_of[step.original_id]]}"'
+
+    def iter_index_lines(self, process: Process, pages: List[List[str]],
+                         names: List[str]) -> Iterator[str]:
+        """Generate the lines of the index page: one node per page and an edge wherever control flow crosses pages."""
+        page_of = _page_of(pages)
+        yield from MermaidVisitor.HEADER
+        for number, step_ids in enumerate(pages):
+            first = process[step_ids[0]]
+            yield f"    page_{number + 1}[[Page {number + 1}: {first.name}, {len(step_ids)} steps]]"
+
+        links = {}
+        for edge in process.edges():
+            if edge.kind in CONTROL_EDGES and edge.target in page_of:
+                source, target = page_of[edge.source], page_of[edge.target]
+                if source != target:
+                    links.setdefault((source, target), None)
+        for source, target in links:
+            yield f"    page_{source + 1} --> page_{target + 1}"
+        for number, name in enumerate(names):
+            yield f'    click page_{number + 1} "{name}"'
+
+
+def _control_in(process: Process) -> dict:
+    """Return {step_id: control edges into it}, leaving out operations on resources."""
+    control_in = {}
+    for edge in process.edges():
+        if edge.kind in CONTROL_EDGES:
+            control_in.setdefault(edge.target, []).append(edge)
+    return control_in
+
+
+def _page_of(pages: List[List[str]]) -> dict:
+    """Return {step_id: index of the first page drawing it}."""
+    page_of = {}
+    for number, step_ids in enumerate(pages):
+        for step_id in step_ids:
+            page_of.setdefault(step_id, number)
+    return page_of
+
+
+def _write_lines(stream, lines: Iterator[str]):
+    """Write lines separated by newlines, without a trailing newline, like visit_process_to."""
+    stream.write(next(lines))
+    for line in lines:
+        stream.write("\n")
+        stream.write(line)
@@ -0,0 +1,529 @@
+"""
+Command line interface for mermaid-mint.
+
+Only the standard library modules needed to parse arguments are imported
+at startup. Each command imports the parts of mermaid_mint it needs when it
+runs, so the command starts quickly when run thousands of times from make.
+"""
+
+import argparse
+import sys
+import time
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the mermaid_mint command."""
+    parser = argparse.ArgumentParser(
+        prog='mermaid_mint',
+        description='Convert YAML process definitions to Mermaid diagrams.')
+    parser.add_argument('--profile', action='store_true',
+                        help='time the load, create, link and render phases and print a breakdown '
+                             'to stderr. Conversions run in this process')
+    parser.add_argument('--profile-output', metavar='FILE',
+                        help='also write the profile as JSON to FILE.json, or cProfile stats to '
+                             'FILE.prof or FILE.pstats (implies --profile)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    convert = commands.add_parser(
+        'convert', help='convert process files, directories or glob patterns')
+    convert.add_argument('paths', nargs='+', help='process files, directories or glob patterns')
+    convert.add_argument('-o', '--output-dir',
+                         help='write diagrams here instead of next to their sources')
+    convert.add_argument('-j', '--workers', type=int, default=None,
+                         help='number of worker processes (default: one per CPU)')
+    convert.add_argument('-q', '--quiet', action='store_true',
+                         help='only report failures and the summary')
+    convert.add_argument('--cache-dir',
+                         help='directory for cached outputs (default: ~/.cache/mermaid_mint)')
+    convert.add_argument('--cache-size', type=int,
+                         help='maximum cache size in megabytes (default: 256)')
+    convert.add_argument('--no-cache', action='store_true',
+                         help='convert every file without reading or writing the cache')
+    convert.add_argument('--clear-cache', action='store_true',
+                         help='empty the cache before converting')
+    convert.add_argument('-f', '--format', dest='formats', action='append', metavar='FORMAT',
+                         help='output format: mermaid, dot, json or graphml; repeat to write '
+                              'several formats in one pass (default: mermaid)')
+    convert.add_argument('--max-nodes', type=int,
+                         help='split diagrams with more nodes than this into linked pages '
+                              'and an index (200 if only --max-edges is given)')
+    convert.add_argument('--max-edges', type=int,
+                         help='split diagrams with more edges than this into linked pages '
+                              'and an index (400 if only --max-nodes is given)')
+    convert.set_defaults(handler=run_convert)
+
+    check = commands.add_parser(
+        'check', help='validate process files without converting them')
+    check.add_argument('paths', nargs='+', help='process files, directories or glob patterns')
+    check.add_argument('-j', '--workers', type=int, default=None,
+                       help='number of worker processes (default: one per CPU)')
+    check.add_argument('--cycles', action='store_true',
+                       help='also report loops back to earlier steps')
+    check.set_defaults(handler=run_check)
+
+    watch = commands.add_parser(
+        'watch', help='keep running and reconvert process files as they change')
+    watch.add_argument('paths', nargs='+', help='process files, directories or glob patterns')
+    watch.add_argument('-o', '--output-dir',
+                       help='write diagrams here instead of next to their sources')
+    watch.add_argument('--interval', type=float, default=0.5,
+                       help='seconds between checks for changes (default: %(default)s)')
+    watch.add_argument('--debounce', type=float, default=0.2,
+                       help='seconds a file must be unchanged before converting (default: %(default)s)')
+    watch.set_defaults(handler=run_watch)
+
+    focus = commands.add_parser(
+        'focus', help='draw part of a large process, collapsing the steps around it')
+    focus.add_argument('path', help='process file or manifest')
+    selection = focus.add_mutually_exclusive_group(required=True)
+    selection.add_argument('--around', metavar='STEP',
+                           help='draw the steps near STEP')
+    selection.add_argument('--between', nargs=2, metavar=('FROM', 'TO'),
+                           help='draw every step on a path from FROM to TO')
+    selection.add_argument('--resource', metavar='ID',
+                           help='draw a Database or Document and the steps that use it')
+    focus.add_argument('--hops', type=int, default=1,
+                       help='how many edges from STEP to include with --around (default: %(default)s)')
+    focus.add_argument('-o', '--output', help='write the diagram here instead of to stdout')
+    focus.set_defaults(handler=run_focus)
+
+    simulate = commands.add_parser(
+        'simulate', help='run simulated instances of a process and report throughput and load')
+    simulate.add_argument('path', help='process file or manifest')
+    simulate.add_argument('-n', '--instances', type=int, default=10000,
+                          help='number of instances to simulate (default: %(default)s)')
+    simulate.add_argument('--seed', type=int, help='random seed, for repeatable results')
+    simulate.add_argument('-j', '--workers', type=int, default=1,
+                          help='number of worker processes (default: %(default)s)')
+    simulate.add_argument('--top', type=int, default=5,
+                          help='how many paths, steps and resources to list (default: %(default)s)')
+    simulate.set_defaults(handler=run_simulate)
+
+    compare = commands.add_parser(
+        'diff', help='draw the changes between two versions of a process')
+    compare.add_argument('old', help='the earlier process file or manifest')
+    compare.add_argument('new', help='the later process file or manifest')
+    compare.add_argument('--context', type=int,
+                         help='only draw changed steps and those within this many edges of them')
+    compare.add_argument('--summary', action='store_true',
+                         help='list the changes as text instead of drawing them')
+    compare.add_argument('-o', '--output', help='write the diagram here instead of to stdout')
+    compare.set_defaults(handler=run_diff)
+
+    export = commands.add_parser(
+        'export', help='write a process back out as YAML, JSON or a binary snapshot')
+    export.add_argument('path', help='process file, manifest or snapshot')
+    export.add_argument('output', help='file to write; .yaml, .yml, .json or .mmsnap chooses the format')
+    export.set_defaults(handler=run_export)
+
+    ingest = commands.add_parser(
+        'import', help='turn Mermaid flowcharts into YAML process definitions')
+    ingest.add_argument('paths', nargs='+', help='.mmd files, directories or glob patterns')
+    ingest.add_argument('-o', '--output-dir',
+                        help='write definitions here instead of next to their charts')
+    ingest.add_argument('-q', '--quiet', action='store_true',
+                        help='do not list what could not be mapped')
+    ingest.set_defaults(handler=run_import)
+
+    crud = commands.add_parser(
+        'resources', help='report which steps read and write each Database and Document')
+    crud.add_argument('paths', nargs='+', help='process files, directories or glob patterns')
+    crud.add_argument('--format', choices=('csv', 'json'), default='csv',
+                      help='csv: one row per resource and step; json: a resource by step matrix '
+                           '(default: %(default)s)')
+    crud.add_argument('-o', '--output', help='write the report here instead of to stdout')
+    crud.add_argument('-j', '--workers', type=int, default=None,
+                      help='number of worker processes (default: one per CPU)')
+    crud.set_defaults(handler=run_resources)
+
+    catalogue = commands.add_parser(
+        'catalogue', help='load many processes together, sharing repeated strings and resources')
+    catalogue.add_argument('paths', nargs='+', help='process files, directories or glob patterns')
+    catalogue.add_argument('--memory', action='store_true',
+                           help='also load the files separately and compare the memory used '
+                                '(several times slower)')
+    catalogue.set_defaults(handler=run_catalogue)
+
+    serve = commands.add_parser(
+        'serve', help='run a local HTTP service that converts process definitions on request')
+    serve.add_argument('--host', default='127.0.0.1', help='address to listen on (default: %(default)s)')
+    serve.add_argument('--port', type=int, default=8737, help='port to listen on (default: %(default)s)')
+    serve.add_argument('-j', '--workers', type=int, default=None,
+                       help='number of worker processes (default: one per CPU)')
+    serve.add_argument('--cache-entries', type=int, default=1024,
+                       help='number of outputs kept in memory (default: %(default)s)')
+    serve.add_argument('--cache-size', type=int, default=64,
+                       help='maximum size of the kept outputs in megabytes (default: %(default)s)')
+    serve.set_defaults(handler=run_serve)
+    return parser
+
+
+def run_convert(args) -> int:
+    """Convert every matching file and print a per-file and overall summary."""
+    from .batch import BatchSummary, convert_all, plan_conversions
+    from .cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, ConversionCache
+    from .visitors import visitor_class
+
+    formats = tuple(dict.fromkeys(args.formats or ['mermaid']))
+    try:
+        for format_name in formats:
+            visitor_class(format_name)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    jobs = plan_conversions(args.paths, args.output_dir)
+    if not jobs:
+        print("No process files found", file=sys.stderr)
+        return 1
+
+    page_budget = None
+    if args.max_nodes is not None or args.max_edges is not None:
+        from .chunking import DEFAULT_MAX_EDGES, DEFAULT_MAX_NODES
+        page_budget = (args.max_nodes or DEFAULT_MAX_NODES, args.max_edges or DEFAULT_MAX_EDGES)
+
+    cache = None
+    if not args.no_cache and page_budget is None:
+        max_bytes = DEFAULT_MAX_BYTES if args.cache_size is None else args.cache_size * 1024 * 1024
+        cache = ConversionCache(args.cache_dir or DEFAULT_CACHE_DIR, max_bytes)
+        if args.clear_cache:
+            cache.clear()
+
+    summary = BatchSummary()
+    started = time.perf_counter()
+    for result in convert_all(jobs, args.workers, cache, page_budget, formats):
+        summary.add(result)
+        if not result.ok:
+            print(f"FAIL {result.source}: {result.error}", file=sys.stderr)
+        elif not args.quiet and not result.skipped:
+            status = 'hit ' if result.cached else 'ok  '
+            print(f"{status} {result.source} -> {result.output} ({result.seconds * 1000:.1f} ms)")
+    summary.seconds = time.perf_counter() - started
+
+    skipped = f", {summary.skipped} fragments skipped" if summary.skipped else ""
+    print(f"Converted {summary.succeeded} of {summary.total} files, "
+          f"{summary.failed} failed{skipped}, in {summary.seconds:.2f}s "
+          f"({summary.files_per_second:.1f} files/s)")
+    if cache is not None:
+        print(f"Cache: {cache.hits} hits, {cache.misses} misses")
+    return 0 if summary.failed == 0 else 1
+
+
+def run_check(args) -> int:
+    """Validate every matching file and print each problem found."""
+    from .batch import BatchSummary, check_all, plan_conversions
+
+    sources = [source for source, _ in plan_conversions(args.paths)]
+    if not sources:
+        print("No process files found", file=sys.stderr)
+        return 1
+
+    summary = BatchSummary()
+    started = time.perf_counter()
+    for result in check_all(sources, args.workers, args.cycles):
+        summary.add(result)
+        for problem in result.problems:
+            print(f"{result.source}: {problem}")
+    summary.seconds = time.perf_counter() - started
+
+    print(f"Checked {summary.total} files, {summary.failed} with problems, "
+          f"in {summary.seconds:.2f}s", file=sys.stderr)
+    return 0 if summary.failed == 0 else 1
+
+
+def run_watch(args) -> int:
+    """Convert out of date files, then keep converting files as they change."""
+    from .watch import Watcher
+
+    def report(result):
+        stamp = time.strftime('%H:%M:%S')
+        if result.ok:
+            print(f"{stamp} updated {result.output} ({result.seconds * 1000:.1f} ms)", flush=True)
+        else:
+            print(f"{stamp} FAIL {result.source}: {result.error}", file=sys.stderr, flush=True)
+
+    watcher = Watcher(args.paths, args.output_dir, args.debounce)
+    print(f"Watching {', '.join(args.paths)} (Ctrl-C to stop)", flush=True)
+    try:
+        watcher.run(args.interval, report)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def run_focus(args) -> int:
+    """Draw the selected part of one process."""
+    from .batch import atomic_output, load_process
+    from .subgraph import between, extract, neighbourhood, touching
+    from .visitors import MermaidVisitor
+
+    try:
+        with open(args.path, 'rb') as process_file:
+            process, _ = load_process(args.path, process_file.read())
+    except Exception as error:
+        print(f"FAIL {args.path}: {error}", file=sys.stderr)
+        return 1
+    if process is None:
+        print(f"{args.path} is a fragment; focus on its manifest instead", file=sys.stderr)
+        return 1
+
+    try:
+        if args.around:
+            step_ids = neighbourhood(process, args.around, args.hops)
+        elif args.between:
+            step_ids = between(process, *args.between)
+        else:
+            step_ids = touching(process, args.resource)
+    except KeyError as error:
+        print(f"{args.path}: no step {error.args[0]}", file=sys.stderr)
+        return 1
+    except ValueError as error:
+        print(f"{args.path}: {error}", file=sys.stderr)
+        return 1
+
+    focused = extract(process, step_ids)
+    visitor = MermaidVisitor()
+    if args.output:
+        with atomic_output(args.output) as stream:
+            visitor.visit_process_to(focused, stream)
+    else:
+        visitor.visit_process_to(focused, sys.stdout)
+        sys.stdout.write("\n")
+    return 0
+
+
+def run_simulate(args) -> int:
+    """Simulate one process and print path frequencies, cycle times and the busiest steps and resources."""
+    from .batch import load_process
+    from .simulation import simulate
+
+    try:
+        with open(args.path, 'rb') as process_file:
+            process, _ = load_process(args.path, process_file.read())
+        if process is None:
+            raise ValueError("fragments can only be simulated as part of a manifest")
+        report = simulate(process, args.instances, args.seed, args.workers)
+    except Exception as error:
+        print(f"FAIL {args.path}: {error}", file=sys.stderr)
+        return 1
+
+    finished = report.instances - report.unfinished
+    print(f"Simulated {report.instances} instances of {process.name}, {finished} finished")
+    if report.cycle_times:
+        print("Cycle time: " + ", ".join(f"p{percent} {report.percentile(percent):.2f}"
+                                         for percent in (50, 90, 95, 99)))
+    print("Paths:")
+    for path, fraction in report.path_frequencies(args.top):
+        choices = ", ".join(f"{step_id}={answer}" for step_id, answer in path) or "(no decisions)"
+        print(f"  {fraction:7.2%}  {choices}")
+    print("Ends:")
+    for step_id, count in report.ends.most_common(args.top):
+        print(f"  {count / report.instances:7.2%}  {step_id}")
+    print("Busiest steps (total time):")
+    for step_id, busy in report.bottlenecks(args.top):
+        print(f"  {busy:12.2f}  {step_id}")
+    print("Busiest resources (queries, updates):")
+    for resource_id, queries, updates in report.busiest_resources(args.top):
+        print(f"  {queries:8d} {updates:8d}  {resource_id}")
+    return 0
+
+
+def run_diff(args) -> int:
+    """Draw or list the changes between two versions of a process."""
+    from .batch import atomic_output, load_process
+    from .diff import DiffMermaidVisitor, diff
+
+    versions = []
+    for path in (args.old, args.new):
+        try:
+            with open(path, 'rb') as process_file:
+                process, _ = load_process(path, process_file.read())
+        except Exception as error:
+            print(f"FAIL {path}: {error}", file=sys.stderr)
+            return 1
+        if process is None:
+            print(f"{path} is a fragment; compare its manifest instead", file=sys.stderr)
+            return 1
+        versions.append(process)
+
+    old, new = versions
+    changes = diff(old, new)
+    if args.summary:
+        for line in changes.lines():
+            print(line)
+        return 0
+
+    lines = DiffMermaidVisitor().iter_diff_lines(old, new, changes, args.context)
+    if args.output:
+        with atomic_output(args.output) as stream:
+            stream.write("\n".join(lines))
+    else:
+        print("\n".join(lines))
+    return 0
+
+
+def run_export(args) -> int:
+    """Write one process in the format implied by the output file's suffix."""
+    from pathlib import Path
+    from .batch import load_process
+    from .serializer import SNAPSHOT_SUFFIX, dump_snapshot, dumps_json, dumps_yaml
+
+    writers = {'.yaml': dumps_yaml, '.yml': dumps_yaml, '.json': dumps_json}
+    suffix = Path(args.output).suffix.lower()
+    if suffix not in writers and suffix != SNAPSHOT_SUFFIX:
+        print(f"Cannot tell the format of {args.output}: use .yaml, .yml, .json or {SNAPSHOT_SUFFIX}",
+              file=sys.stderr)
+        return 1
+
+    try:
+        with open(args.path, 'rb') as process_file:
+            process, _ = load_process(args.path, process_file.read())
+        if process is None:
+            raise ValueError("fragments can only be exported as part of a manifest")
+        if suffix == SNAPSHOT_SUFFIX:
+            dump_snapshot(process, args.output)
+        else:
+            Path(args.output).write_text(writers[suffix](process), encoding='utf-8')
+    except Exception as error:
+        print(f"FAIL {args.path}: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_import(args) -> int:
+    """Convert Mermaid flowcharts to YAML, listing anything that could not be mapped."""
+    import glob
+    from pathlib import Path
+    from .batch import atomic_output
+    from .mermaid_parser import MermaidParser
+    from .serializer import dumps_yaml
+
+    charts = []
+    for path in args.paths:
+        root = Path(path)
+        matches = sorted(root.rglob('*.mmd')) if root.is_dir() else [Path(match) for match in glob.glob(path)]
+        charts.extend((chart, chart.relative_to(root) if root.is_dir() else Path(chart.name))
+                      for chart in matches if chart.is_file())
+    if not charts:
+        print("No Mermaid files found", file=sys.stderr)
+        return 1
+
+    parser = MermaidParser()
+    failed = 0
+    for chart, relative in charts:
+        output = (Path(args.output_dir, relative) if args.output_dir else chart).with_suffix('.yaml')
+        try:
+            process, problems = parser.parse_file(str(chart))
+            with atomic_output(output) as stream:
+                stream.write(dumps_yaml(process))
+        except Exception as error:
+            failed += 1
+            print(f"FAIL {chart}: {error}", file=sys.stderr)
+            continue
+        print(f"{chart} -> {output} ({len(process)} steps, {len(problems)} notes)")
+        if not args.quiet:
+            for problem in problems:
+                print(f"  {problem}")
+    print(f"Imported {len(charts) - failed} of {len(charts)} charts, {failed} failed")
+    return 0 if failed == 0 else 1
+
+
+def run_resources(args) -> int:
+    """Write the read/write matrix of resources against steps for every matching file."""
+    from .batch import atomic_output, plan_conversions
+    from .resources import collect, write_csv, write_json
+
+    sources = [source for source, _ in plan_conversions(args.paths)]
+    if not sources:
+        print("No process files found", file=sys.stderr)
+        return 1
+    rows, failures = collect(sources, args.workers)
+    for source, error in failures:
+        print(f"FAIL {source}: {error}", file=sys.stderr)
+
+    write = write_csv if args.format == 'csv' else write_json
+    if args.output:
+        with atomic_output(args.output) as stream:
+            write(rows, stream)
+    else:
+        write(rows, sys.stdout)
+    return 0 if not failures else 1
+
+
+def run_catalogue(args) -> int:
+    """Load a catalogue and report how much of it is shared."""
+    from .catalogue import Catalogue, memory_report
+
+    catalogue = Catalogue().load(args.paths)
+    if not catalogue.processes and not catalogue.failures:
+        print("No process files found", file=sys.stderr)
+        return 1
+    for source, error in catalogue.failures:
+        print(f"FAIL {source}: {error}", file=sys.stderr)
+    for line in catalogue.summary_lines():
+        print(line)
+    if catalogue.conflicts:
+        print("Defined differently: " + ", ".join(sorted(catalogue.conflicts)))
+    if args.memory:
+        report = memory_report(args.paths)
+        saved = report['saved_bytes'] / report['separate_bytes'] if report['separate_bytes'] else 0.0
+        print(f"Memory: {report['separate_bytes'] / 1e6:.1f} MB loaded separately, "
+              f"{report['catalogue_bytes'] / 1e6:.1f} MB as a catalogue, "
+              f"{report['saved_bytes'] / 1e6:.1f} MB ({saved:.0%}) saved")
+    return 0 if not catalogue.failures else 1
+
+
+def run_serve(args) -> int:
+    """Serve conversions over HTTP until interrupted."""
+    from .server import serve
+
+    def ready(server):
+        print(f"Serving on http://{server.host}:{server.port} (Ctrl-C to stop)", flush=True)
+
+    try:
+        serve(args.host, args.port, args.workers, args.cache_entries, args.cache_size * 1024 * 1024, ready)
+    except KeyboardInterrupt:
+        pass
+    except OSError as error:
+        print(f"Cannot serve on {args.host}:{args.port}: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv=None) -> int:
+    """Entry point for the mermaid_mint console script."""
+    args = build_parser().parse_args(argv)
+    if args.profile or args.profile_output:
+        return run_profiled(args)
+    return args.handler(args)
+
+
+def run_profiled(args) -> int:
+    """Run a command with profiling on, then report where its time went."""
+    from .profiling import profiling
+
+    # Work done in a process pool would not be recorded
+    if hasattr(args, 'workers'):
+        args.workers = 1
+    destination = args.profile_output or ''
+    with profiling() as profile:
+        if destination.endswith(('.prof', '.pstats')):
+            import cProfile
+            profiler = cProfile.Profile()
+            try:
+                exit_code = profiler.runcall(args.handler, args)
+            finally:
+                profiler.dump_stats(destination)
+        else:
+            exit_code = args.handler(args)
+    if destination.endswith('.json'):
+        with open(destination, 'w') as stats_file:
+            stats_file.write(profile.dumps())
+    elif destination and not destination.endswith(('.prof', '.pstats')):
+        print(f"Cannot tell the format of {destination}; printing the profile only", file=sys.stderr)
+    print("\n".join(profile.lines()), file=sys.stderr)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""Structural comparison of two versions of a Process."""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Iterator, List, Set, Tuple
+
+from .steps import ADDED, CHANGED, REMOVED, Process, Step, Task, Decision, Query, Edge, _gc_paused
+from .visitors import MermaidVisitor
+
+
+def _operations(step: Step) -> tuple:
+    """Return what a step does to resources, for comparison between versions."""
+    if isinstance(step, Task):
+        return tuple((type(operation).__name__, operation.target and operation.target.step_id,
+                      operation.description) for operation in step.operations)
+    if isinstance(step, Decision):
+        test = step.test
+        if isinstance(test, Query):
+            return (('Query', test.target and test.target.step_id, test.description),)
+        return (test,)
+    return ()
+
+
+@dataclass
+class ProcessDiff:
+    """
+    The differences between two versions of a process, matching steps by step_id.
+
+    renamed and retyped hold (step_id, old, new) tuples. changed_operations
+    lists steps whose operations or decision test differ in any way.
+    """
+    added_steps: List[str] = field(default_factory=list)
+    removed_steps: List[str] = field(default_factory=list)
+    renamed: List[Tuple[str, str, str]] = field(default_factory=list)
+    retyped: List[Tuple[str, str, str]] = field(default_factory=list)
+    changed_operations: List[str] = field(default_factory=list)
+    added_edges: List[Edge] = field(default_factory=list)
+    removed_edges: List[Edge] = field(default_factory=list)
+
+    def __bool__(self):
+        return any((self.added_steps, self.removed_steps, self.renamed, self.retyped,
+                    self.changed_operations, self.added_edges, self.removed_edges))
+
+    def changed_steps(self) -> Set[str]:
+        """Return the IDs of steps present in both versions that differ, including in their edges."""
+        changed = {step_id for step_id, _, _ in self.renamed}
+        changed.update(step_id for step_id, _, _ in self.retyped)
+        changed.update(self.changed_operations)
+        changed.update(edge.source for edge in self.added_edges + self.removed_edges)
+        return changed - set(self.added_steps) - set(self.removed_steps)
+
+    def lines(self) -> Iterator[str]:
+        """Generate a readable summary of the differences, one change per line."""
+        for step_id in self.added_steps:
+            yield f"+ {step_id}"
+        for step_id in self.removed_steps:
+            yield f"- {step_id}"
+        for step_id, old, new in self.renamed:
+            yield f"~ {step_id}: renamed from {old!r} to {new!r}"
+        for step_id, old, new in self.retyped:
+            yield f"~ {step_id}: changed from {old} to {new}"
+        for step_id in self.changed_operations:
+            yield f"~ {step_id}: operations changed"
+        for edge in self.added_edges:
+            yield f"+ {edge.source} --{edge.kind}--> {edge.target}"
+        for edge in self.removed_edges:
+            yield f"- {edge.source} --{edge.kind}--> {edge.target}"
+
+
+def diff(old: Process, new: Process) -> ProcessDiff:
+    """Compare two versions of a process in O(steps + edges)."""
+    with _gc_paused():
+        return _diff(old, new)
+
+
+def _diff(old: Process, new: Process) -> ProcessDiff:
+    result = ProcessDiff()
+    old_ids = old.step_ids()
+    new_ids = new.step_ids()
+    result.added_steps = [step_id for step_id in new_ids if step_id not in old]
+    result.removed_steps = [step_id for step_id in old_ids if step_id not in new]
+
+    for step_id in new_ids:
+        if step_id not in old:
+            continue
+        before, after = old[step_id], new[step_id]
+        if before.name != after.name:
+            result.renamed.append((step_id, before.name, after.name))
+        if type(before) is not type(after):
+            result.retyped.append((step_id, type(before).__name__, type(after).__name__))
+        if _operations(before) != _operations(after):
+            result.changed_operations.append(step_id)
+
+    old_edges = set(old.edges())
+    new_edges = set(new.edges())
+    result.added_edges = [edge for edge in new.edges() if edge not in old_edges]
+    result.removed_edges = [edge for edge in old.edges() if edge not in new_edges]
+    return result
+
+
+class DiffMermaidVisitor(MermaidVisitor):
+    """
+    Visitor that draws the differences between two versions of a Process.
+
+    The diagram shows the new version plus the steps and edges that were
+    removed. Added, removed and changed steps are styled with Mermaid
+    classes of those names, removed edges are dotted, and added and removed
+    edges are coloured.
+    """
+
+    STYLES = (
+        f"    classDef {ADDED} fill:#dfd,stroke:#393",
+        f"    classDef {REMOVED} fill:#fdd,stroke:#c33,stroke-dasharray:4 2",
+        f"    classDef {CHANGED} fill:#ffd,stroke:#c93",
+    )
+    EDGE_COLOURS = {ADDED: '#393', REMOVED: '#c33'}
+
+    def visit_diff(self, old: Process, new: Process, context: int = None) -> str:
+        """Generate a Mermaid diagram of the changes from old to new."""
+        return "\n".join(self.iter_diff_lines(old, new, context=context))
+
+    def iter_diff_lines(self, old: Process, new: Process, changes: ProcessDiff = None,
+                        context: int = None) -> Iterator[str]:
+        """
+        Generate the lines of the diff diagram, one at a time.
+
+        If context is given, only changed steps and the steps within that
+        many edges of them are drawn.
+        """
+        changes = changes if changes is not None else diff(old, new)
+        status = dict.fromkeys(changes.changed_steps(), CHANGED)
+        status.update(dict.fromkeys(changes.added_steps, ADDED))
+        status.update(dict.fromkeys(changes.removed_steps, REMOVED))
+        added_edges = set(changes.added_edges)
+        edges = [(edge, ADDED if edge in added_edges else None) for edge in new.edges()]
+        edges.extend((edge, REMOVED) for edge in changes.removed_edges)
+
+        steps = [new[step_id] for step_id in new.step_ids()]
+        steps.extend(old[step_id] for step_id in changes.removed_steps)
+        if context is not None:
+            shown = _around(status, [edge for edge, _ in edges], context)
+            steps = [step for step in steps if step.step_id in shown]
+            edges = [(edge, kind) for edge, kind in edges if edge.source in shown and edge.target in shown]
+
+        yield from self.HEADER
+        for step in steps:
+            yield self._format_step(step)
+        for edge, kind in edges:
+            arrow = '-.->' if kind == REMOVED else '-->'
+            yield f"    {edge.source} {arrow} {edge.target}"
+        yield from self.STYLES
+        for kind in (ADDED, REMOVED, CHANGED):
+            members = [step.step_id for step in steps if status.get(step.step_id) == kind]
+            if members:
+                yield f"    class {','.join(members)} {kind}"
+        for number, (_, kind) in enumerate(edges):
+            if kind is not None:
+                yield f"    linkStyle {number} stroke:{self.EDGE_COLOURS[kind]},stroke-width:2px"
+
+
+def _around(changed, edges: List[Edge], hops: int) -> Set[str]:
+    """Return the changed step IDs and those within hops edges of them, in either direction."""
+    neighbours = {}
+    for edge in edges:
+        neighbours.setdefault(edge.source, []).append(edge.target)
+        neighbours.setdefault(edge.target, []).append(edge.source)
+    shown = set(changed)
+    queue = deque((step_id, 0) for step_id in changed)
+    while queue:
+        step_id, distance = queue.popleft()
+        if distance == hops:
+            continue
+        for neighbour in neighbours.get(step_id, ()):
+            if neighbour not in shown:
+                shown.add(neighbour)
+                queue.append((neighbour, distance + 1))
+    return shown
@@ -0,0 +1,95 @@
+"""
+Incremental Mermaid rendering for processes edited one step at a time.
+
+IncrementalMermaidVisitor keeps the node line and edge lines of every step
+it has drawn. The first render of a process formats every step and asks
+the process to track changes; later renders format only the steps set,
+removed or relinked since, and reuse the cached lines for the rest. Edge
+lines hold only step IDs, so the steps with edges into a changed step
+never need formatting again. The output is always identical to
+MermaidVisitor's.
+
+    visitor = IncrementalMermaidVisitor()
+    visitor.visit_process(process)          # formats every step
+    process[step_id] = Task(step_id, 'Renamed')
+    visitor.update(process)                 # formats that one step
+    visitor.step_lines(step_id)             # the lines to patch into an editor
+
+Each visitor follows one process at a time, and should be the only
+consumer of that process's take_changes.
+"""
+
+from itertools import chain
+from typing import Dict, Iterator, List, Set, Tuple
+
+from .profiling import RENDER, phase
+from .steps import ADDED, REMOVED, Process
+from .visitors import MermaidVisitor
+
+
+class IncrementalMermaidVisitor(MermaidVisitor):
+    """MermaidVisitor that caches each step's lines and re-formats only changed steps."""
+
+    def __init__(self):
+        super().__init__()
+        self._process = None
+        # Lines by step ID, in the process's step order
+        self._nodes: Dict[str, str] = {}
+        self._edges: Dict[str, List[str]] = {}
+
+    def update(self, process: Process) -> Set[str]:
+        """
+        Bring the cached lines up to date with process and return the IDs of the steps re-formatted.
+
+        A process not seen before is formatted in full. Steps that were
+        removed are dropped from the cache and are not in the result.
+        """
+        if process is not self._process:
+            self._process = process
+            process.track_changes()
+            process.take_changes()
+            self._nodes.clear()
+            self._edges.clear()
+            for step_id in process.step_ids():
+                self._format(step_id)
+            return set(self._nodes)
+
+        changes = process.take_changes()
+        formatted = set()
+        for step_id, kind in changes.items():
+            if kind == REMOVED or kind == ADDED:
+                # Added steps are formatted in the order they were appended,
+                # so they land at the end of the cache as in the process
+                self._nodes.pop(step_id, None)
+                self._edges.pop(step_id, None)
+            if kind != REMOVED:
+                self._format(step_id)
+                formatted.add(step_id)
+        return formatted
+
+    def step_lines(self, step_id: str) -> Tuple[str, List[str]]:
+        """Return the cached (node line, edge lines) of a step."""
+        return self._nodes[step_id], self._edges[step_id]
+
+    def _format(self, step_id: str):
+        step = self._process[step_id]
+        self._nodes[step_id] = self._format_step(step)
+        self._edges[step_id] = [line for edge in self._process.out_edges(step_id) for line in self.visit_edge(edge, 0)]
+
+    def iter_lines(self, process: Process) -> Iterator[str]:
+        """Generate the diagram from the cached lines, updating them first."""
+        self.update(process)
+        return chain(self.HEADER, self._nodes.values(), chain.from_iterable(self._edges.values()))
+
+    def visit_process(self, process: Process) -> str:
+        """Generate the whole diagram as a string, re-formatting only changed steps."""
+        with phase(RENDER):
+            return "\n".join(self.iter_lines(process))
+
+    def visit_process_to(self, process: Process, stream):
+        """Write the diagram to a text stream, re-formatting only changed steps."""
+        with phase(RENDER):
+            for number, line in enumerate(self.iter_lines(process)):
+                if number:
+                    stream.write("\n")
+                stream.write(line)
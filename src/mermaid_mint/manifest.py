@@ -0,0 +1,190 @@
+"""
+Process packages: a manifest that assembles one Process from several files.
+
+A manifest has the usual process header, lists step fragments under
+include, and shared resource libraries under libraries:
+
+    process:
+      process_id: "order_processing"
+      name: "Order Processing Workflow"
+    include:
+      - fragments/intake.yaml
+      - fragments/fulfilment/*.yaml
+    libraries:
+      - ../shared/databases.yaml
+
+Fragments and libraries hold only a steps list. Paths are relative to the
+manifest and may be glob patterns. All steps share one namespace, so a
+step in one fragment may refer to steps and resources defined in any
+other file of the package. Libraries may only define Database and
+Document steps.
+"""
+
+import glob
+import os
+from pathlib import Path
+from typing import Dict, List
+
+from .parser import Parser, input_format_for, load_data
+from .steps import Process
+
+RESOURCE_TYPES = ('Database', 'Document')
+
+
+# Keys that make a process file a manifest; either may be given alone
+MANIFEST_KEYS = ('include', 'libraries')
+
+
+def is_manifest(data) -> bool:
+    """Return True if loaded data is a manifest rather than a single process."""
+    return isinstance(data, dict) and any(key in data for key in MANIFEST_KEYS)
+
+
+def is_fragment(data) -> bool:
+    """Return True if loaded data is a fragment or library: a steps list and nothing else."""
+    return isinstance(data, dict) and set(data) == {'steps'}
+
+
+def load_fragment(path: str) -> list:
+    """Load the steps list of a fragment or library file."""
+    with open(path, 'rb') as fragment_file:
+        data = load_data(fragment_file.read(), input_format_for(path))
+    if not is_fragment(data):
+        raise ValueError(f"{path} is not a fragment: expected a steps list and no process header")
+    return data['steps']
+
+
+def manifest_dependencies(path: str) -> List[str]:
+    """Return the fragment and library files a manifest uses, or [] if path is not a manifest."""
+    with open(path, 'rb') as process_file:
+        raw = process_file.read()
+    # Avoid loading ordinary process files, which cannot be manifests
+    if not any(key.encode() in raw for key in MANIFEST_KEYS):
+        return []
+    data = load_data(raw, input_format_for(path))
+    return ManifestLoader.dependencies(path, data) if is_manifest(data) else []
+
+
+class FragmentCache:
+    """
+    Loaded fragment steps keyed by path.
+
+    An entry is reused until the file's modification time or size changes,
+    so editing one fragment of a package only reloads that fragment.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.loads = 0
+
+    @staticmethod
+    def signature(path: str) -> tuple:
+        """Return the (mtime, size) signature that invalidates an entry."""
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, path: str, signature: tuple):
+        """Return the cached steps for path if they match signature, else None."""
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        return None
+
+    def put(self, path: str, signature: tuple, steps: list):
+        """Store the steps loaded from path."""
+        self._entries[path] = (signature, steps)
+        self.loads += 1
+
+
+class ManifestLoader:
+    """
+    Loads manifests, reading their fragments concurrently and merging them into one Process.
+
+    Fragments that are not already cached are loaded by a thread pool, or a
+    process pool if use_processes is set, which suits large YAML fragments
+    where parsing rather than reading dominates.
+    """
+
+    def __init__(self, parser: Parser = None, cache: FragmentCache = None,
+                 workers: int = None, use_processes: bool = False):
+        self.parser = parser or Parser()
+        self.cache = cache if cache is not None else FragmentCache()
+        self.workers = workers
+        self.use_processes = use_processes
+
+    def load(self, manifest_path: str) -> Process:
+        """Load a manifest file and everything it includes."""
+        with open(manifest_path, 'rb') as manifest_file:
+            data = load_data(manifest_file.read(), input_format_for(manifest_path))
+        return self.load_data(data, manifest_path)
+
+    def load_data(self, data: dict, manifest_path: str) -> Process:
+        """Build a Process from already loaded manifest data."""
+        return self.parser.parse_data(self.merge(data, manifest_path))
+
+    def merge(self, data: dict, manifest_path: str) -> dict:
+        """Return loaded manifest data as process data, with every fragment's steps in place."""
+        includes = self.resolve(manifest_path, data.get('include', []))
+        libraries = [path for path in self.resolve(manifest_path, data.get('libraries', []))
+                     if path not in includes]
+        fragments = self._load_all(includes + libraries)
+
+        steps = list(data.get('steps', []))
+        for path in includes:
+            steps.extend(fragments[path])
+        for path in libraries:
+            for step_data in fragments[path]:
+                if step_data.get('type') not in RESOURCE_TYPES:
+                    raise ValueError(f"Library {path} defines {step_data.get('step_id')}, "
+                                     f"which is not a Database or Document")
+            steps.extend(fragments[path])
+        return {'process': data['process'], 'steps': steps}
+
+    @staticmethod
+    def dependencies(manifest_path: str, data: dict) -> List[str]:
+        """Return every fragment and library file a manifest uses."""
+        return ManifestLoader.resolve(manifest_path,
+                                      list(data.get('include', [])) + list(data.get('libraries', [])))
+
+    @staticmethod
+    def resolve(manifest_path: str, patterns: List[str]) -> List[str]:
+        """Resolve paths and glob patterns relative to the manifest, in order, without duplicates."""
+        base = Path(manifest_path).parent
+        paths = {}
+        for pattern in patterns:
+            full_pattern = str(base / pattern)
+            if glob.has_magic(full_pattern):
+                matches = sorted(glob.glob(full_pattern, recursive=True))
+                if not matches:
+                    raise ValueError(f"{manifest_path}: {pattern} matches no files")
+            else:
+                matches = [full_pattern]
+            for match in matches:
+                paths.setdefault(os.path.normpath(match), None)
+        return list(paths)
+
+    def _load_all(self, paths: List[str]) -> Dict[str, list]:
+        """Return {path: steps}, loading files that are not cached concurrently."""
+        fragments = {}
+        stale = {}
+        for path in paths:
+            signature = FragmentCache.signature(path)
+            steps = self.cache.get(path, signature)
+            if steps is None:
+                stale[path] = signature
+            else:
+                fragments[path] = steps
+
+        if len(stale) == 1:
+            path, signature = stale.popitem()
+            fragments[path] = load_fragment(path)
+            self.cache.put(path, signature, fragments[path])
+        elif stale:
+            from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+            pool = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            with pool(max_workers=self.workers) as executor:
+                loaded = executor.map(load_fragment, stale)
+                for (path, signature), steps in zip(stale.items(), loaded):
+                    fragments[path] = steps
+                    self.cache.put(path, signature, steps)
+        return fragments
@@ -0,0 +1,304 @@
+"""
+Reading Mermaid flowcharts back into Process objects.
+
+MermaidParser reads a flowchart a line at a time, so very large files are
+never held in memory, and keeps only a table of nodes and edges. Once the
+whole chart is read it maps the graph onto the DSL:
+
+- {text} nodes become Decisions, [(text)] Databases and [/text/] Documents.
+- Other nodes become Tasks, except that the first node with no incoming
+  flow becomes the Start and nodes with no outgoing edges become Ends.
+- Edges to a Database or Document become operations: a Query if the edge
+  label reads like one (query, read, get, ...), otherwise an Update, with
+  the label as the description. An edge from a Decision to a resource
+  becomes its test. Operations whose label reads like neither a query nor
+  an update (write, save, insert, ...), or that have no label and so no
+  description, are reported as inferred.
+- Decision branches labelled yes/no (or true/false, y/n) are assigned by
+  label, and unlabelled ones in order: yes first, then no.
+
+Everything that cannot be mapped, such as a third branch, an edge leaving
+a resource or unsupported syntax, is reported as a Problem and left out.
+"""
+
+import re
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+from .steps import Process, Start, Task, Decision, End, Database, Document, Query, Update, _gc_paused
+from .validation import Problem
+
+# Problem kinds
+UNSUPPORTED_SYNTAX = 'unsupported-syntax'
+UNMAPPED_EDGE = 'unmapped-edge'
+INFERRED = 'inferred'
+
+# Node shapes
+PLAIN = 'plain'
+DECISION = 'decision'
+DATABASE = 'database'
+DOCUMENT = 'document'
+ROUNDED = 'rounded'
+
+_HEADER = re.compile(r'(?:flowchart|graph)(?:\s+(?:TD|TB|BT|LR|RL))?\s*;?$')
+_NODE = re.compile(r'''
+    (?P<id>\w[\w.]*(?:-(?![-.>])[\w.]+)*)
+    (?:
+        \[\((?P<database>.*?)\)\]
+      | \[/(?P<document>.*?)/\]
+      | \(\[(?P<stadium>.*?)\]\)
+      | \(\((?P<circle>.*?)\)\)
+      | \{(?P<decision>.*?)\}
+      | \[(?P<plain>.*?)\]
+      | \((?P<rounded>.*?)\)
+    )?
+    \s*''', re.VERBOSE)
+_ARROW = re.compile(r'''
+    (?:
+        --\s*(?P<inline>[^->|][^>|]*?)\s*-->
+      | (?P<arrow>-->|-\.->|==>|---|-\.-|===)
+    )
+    \s*(?:\|(?P<label>[^|]*)\|)?\s*''', re.VERBOSE)
+_IGNORED = ('classDef ', 'class ', 'style ', 'linkStyle ', 'click ', 'direction ', 'accTitle', 'accDescr')
+
+_SHAPE_GROUPS = {
+    'database': DATABASE, 'document': DOCUMENT, 'decision': DECISION,
+    'stadium': ROUNDED, 'circle': ROUNDED, 'rounded': ROUNDED, 'plain': PLAIN,
+}
+_YES_LABELS = {'yes', 'y', 'true'}
+_NO_LABELS = {'no', 'n', 'false'}
+_QUERY_WORDS = re.compile(r'\b(query|queries|read|reads|get|gets|lookup|look up|select|check|fetch)\b', re.I)
+_UPDATE_WORDS = re.compile(r'\b(update|updates|write|writes|save|saves|insert|inserts|record|records|'
+                           r'create|creates|delete|deletes|store|stores|add|adds|mark|marks|log|logs)\b', re.I)
+
+
+def _text(raw: str) -> str:
+    raw = raw.strip()
+    if len(raw) >= 2 and raw[0] == raw[-1] == '"':
+        raw = raw[1:-1]
+    return raw
+
+
+class MermaidParser:
+    """Parses Mermaid flowcharts into Process objects, reporting what could not be mapped."""
+
+    def parse_file(self, file_path: str, process_id: str = None, name: str = None) -> Tuple[Process, List[Problem]]:
+        """Parse a .mmd file, taking the process ID and name from the file name unless given."""
+        stem = Path(file_path).stem
+        with open(file_path, encoding='utf-8') as chart:
+            return self.parse_lines(chart, process_id or stem, name or stem.replace('_', ' ').title())
+
+    def parse_string(self, text: str, process_id: str, name: str) -> Tuple[Process, List[Problem]]:
+        """Parse a flowchart held in a string."""
+        return self.parse_lines(text.splitlines(), process_id, name)
+
+    def parse_lines(self, lines: Iterable[str], process_id: str, name: str) -> Tuple[Process, List[Problem]]:
+        """
+        Parse a flowchart from an iterable of lines and return (process, problems).
+
+        Raises ValueError if there is no flowchart header.
+        """
+        reader = _ChartReader()
+        with _gc_paused():
+            for number, line in enumerate(lines, 1):
+                reader.read(number, line)
+            if not reader.started:
+                raise ValueError("Not a Mermaid flowchart: no 'flowchart' or 'graph' header")
+            return _build(reader, process_id, name), reader.problems
+
+
+class _ChartReader:
+    """Accumulates the nodes and edges of a flowchart, one line at a time."""
+
+    def __init__(self):
+        self.started = False
+        self.in_front_matter = False
+        # id -> [shape, text, line number]
+        self.nodes = {}
+        # (source, target, label, line number)
+        self.edges = []
+        self.problems = []
+
+    def read(self, number: int, line: str):
+        line = line.strip()
+        if not line or line.startswith('%%'):
+            return
+        if line == '---':
+            # Front matter before the header (title, config)
+            self.in_front_matter = not self.in_front_matter and not self.started
+            return
+        if self.in_front_matter:
+            return
+        if not self.started:
+            if _HEADER.match(line):
+                self.started = True
+            else:
+                self.problems.append(Problem(UNSUPPORTED_SYNTAX, None, f"line {number}: expected a flowchart header"))
+            return
+        if line.startswith(_IGNORED):
+            return
+        if line.startswith('subgraph ') or line == 'end':
+            # Subgraphs only group nodes; their contents are read as usual
+            return
+        for statement in line.rstrip(';').split(';'):
+            self._statement(number, statement.strip())
+
+    def _statement(self, number: int, statement: str):
+        position = 0
+        source, position = self._node(number, statement, position)
+        if source is None:
+            self.problems.append(Problem(UNSUPPORTED_SYNTAX, None, f"line {number}: cannot read {statement!r}"))
+            return
+        while position < len(statement):
+            arrow = _ARROW.match(statement, position)
+            if arrow is None:
+                self.problems.append(Problem(UNSUPPORTED_SYNTAX, source,
+                                             f"line {number}: cannot read {statement[position:]!r}"))
+                return
+            target, position = self._node(number, statement, arrow.end())
+            if target is None:
+                self.problems.append(Problem(UNSUPPORTED_SYNTAX, source,
+                                             f"line {number}: edge has no target in {statement!r}"))
+                return
+            label = arrow.group('label') if arrow.group('label') is not None else arrow.group('inline')
+            self.edges.append((source, target, _text(label or ''), number))
+            source = target
+
+    def _node(self, number: int, statement: str, position: int):
+        match = _NODE.match(statement, position)
+        if match is None:
+            return None, position
+        step_id = match.group('id')
+        for group, shape in _SHAPE_GROUPS.items():
+            text = match.group(group)
+            if text is not None:
+                node = self.nodes.get(step_id)
+                if node is not None and node[0] is not None and node[0] != shape:
+                    self.problems.append(Problem(UNSUPPORTED_SYNTAX, step_id,
+                                                 f"line {number}: shape differs from line {node[2]}; "
+                                                 f"keeping the first"))
+                elif node is None or node[0] is None:
+                    self.nodes[step_id] = [shape, _text(text), number]
+                break
+        else:
+            self.nodes.setdefault(step_id, [None, step_id, number])
+        return step_id, match.end()
+
+
+def _build(reader: _ChartReader, process_id: str, name: str) -> Process:
+    """Map the nodes and edges read from a chart onto DSL steps."""
+    problems = reader.problems
+    nodes = reader.nodes
+    resources = {step_id for step_id, (shape, _, _) in nodes.items() if shape in (DATABASE, DOCUMENT)}
+    flows_out = {}
+    operations = {}
+    has_flow_in = set()
+    for source, target, label, number in reader.edges:
+        if source in resources:
+            problems.append(Problem(UNMAPPED_EDGE, source,
+                                    f"line {number}: edge to {target} leaves a resource, which has no successors"))
+        elif target in resources:
+            operations.setdefault(source, []).append((target, label, number))
+        else:
+            flows_out.setdefault(source, []).append((target, label, number))
+            has_flow_in.add(target)
+
+    start_id = _choose_start(nodes, resources, has_flow_in, flows_out)
+    process = Process(process_id, name)
+    for step_id, (shape, text, _) in nodes.items():
+        if shape == DATABASE:
+            step = Database(step_id, text)
+        elif shape == DOCUMENT:
+            step = Document(step_id, text)
+        elif shape == DECISION:
+            step = Decision(step_id, text)
+        elif step_id == start_id:
+            step = Start(step_id, text)
+        elif step_id not in flows_out and step_id not in operations:
+            step = End(step_id, text)
+        else:
+            step = Task(step_id, text)
+        if shape == ROUNDED:
+            problems.append(Problem(INFERRED, step_id, f"rounded node mapped to {type(step).__name__}"))
+        process[step_id] = step
+    process.start = process.get_step(start_id)
+    if start_id is None:
+        problems.append(Problem(INFERRED, None, "no node without incoming flow to use as the Start"))
+
+    for step_id, step in ((step_id, process[step_id]) for step_id in process.step_ids()):
+        branches = flows_out.get(step_id, [])
+        uses = operations.get(step_id, [])
+        if isinstance(step, Decision):
+            _link_decision(process, step, branches, uses, problems)
+            continue
+        if branches:
+            step.successor = process[branches[0][0]]
+            for target, _, number in branches[1:]:
+                problems.append(Problem(UNMAPPED_EDGE, step_id,
+                                        f"line {number}: second successor {target} dropped; "
+                                        f"only Decisions can branch"))
+        if isinstance(step, Task):
+            step.operations = [_operation(process, step_id, target, label, number, problems)
+                               for target, label, number in uses]
+        else:
+            for target, _, number in uses:
+                problems.append(Problem(UNMAPPED_EDGE, step_id,
+                                        f"line {number}: {type(step).__name__} steps cannot use {target}"))
+    return process
+
+
+def _choose_start(nodes, resources, has_flow_in, flows_out):
+    """Return the first plain node with outgoing but no incoming flow, preferring one named like a start."""
+    candidates = [step_id for step_id, (shape, _, _) in nodes.items()
+                  if step_id not in resources and shape != DECISION
+                  and step_id not in has_flow_in and step_id in flows_out]
+    for step_id in candidates:
+        if re.search(r'start|begin', f"{step_id} {nodes[step_id][1]}", re.I):
+            return step_id
+    return candidates[0] if candidates else None
+
+
+def _operation(process: Process, step_id: str, target: str, label: str, number: int, problems):
+    """Return the operation an edge to a resource stands for, reporting it if its kind or description is a guess."""
+    kind = Query if _QUERY_WORDS.search(label) else Update
+    if not label:
+        problems.append(Problem(INFERRED, step_id, f"line {number}: unlabelled edge to {target} taken as "
+                                                   f"an Update with no description"))
+    elif kind is Update and not _UPDATE_WORDS.search(label):
+        problems.append(Problem(INFERRED, step_id, f"line {number}: edge to {target} labelled {label!r} "
+                                                   f"taken as an Update"))
+    return kind(process[target], label)
+
+
+def _link_decision(process, decision, branches, uses, problems):
+    unlabelled = []
+    for target, label, number in branches:
+        answer = label.lower()
+        if answer in _YES_LABELS and decision.yes is None:
+            decision.yes = process[target]
+        elif answer in _NO_LABELS and decision.no is None:
+            decision.no = process[target]
+        else:
+            unlabelled.append((target, label, number))
+    for target, label, number in unlabelled:
+        if decision.yes is None:
+            decision.yes = process[target]
+        elif decision.no is None:
+            decision.no = process[target]
+        else:
+            problems.append(Problem(UNMAPPED_EDGE, decision.step_id,
+                                    f"line {number}: extra branch to {target} dropped; a Decision has two"))
+            continue
+        described = f"branch labelled {label!r}" if label else "unlabelled branch"
+        problems.append(Problem(INFERRED, decision.step_id,
+                                f"line {number}: {described} to {target} taken as "
+                                f"{'yes' if decision.no is None else 'no'}"))
+    if uses:
+        target, label, number = uses[0]
+        decision.test = Query(process[target], label)
+        if not label:
+            problems.append(Problem(INFERRED, decision.step_id,
+                                    f"line {number}: unlabelled test on {target} has no description"))
+        for target, _, number in uses[1:]:
+            problems.append(Problem(UNMAPPED_EDGE, decision.step_id,
+                                    f"line {number}: a Decision tests one resource; {target} dropped"))
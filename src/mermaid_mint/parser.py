@@ -1,141 +1,251 @@
-"""Parser for converting YAML to Process objects."""
+"""
+Parser for converting YAML to Process objects.
 
-import yaml
-from .steps import Process, Start, Task, Decision, End, Database, Document, Query, Update
+PyYAML and msgpack are imported on first use, so importing this module
+stays cheap for callers that never load those formats.
+"""
+
+import json
+from pathlib import Path
+from typing import List, Tuple
+
+from .profiling import CREATE, LINK, LOAD, active, count, phase
+from .steps import Process, Start, Task, Decision, End, Database, Document, Query, Update, _gc_paused
+from .validation import DUPLICATE_STEP, MISSING_START, UNRESOLVED_REFERENCE, Problem, ValidationError
+
+YAML = 'yaml'
+JSON = 'json'
+MSGPACK = 'msgpack'
+
+FORMATS_BY_SUFFIX = {
+    '.yaml': YAML,
+    '.yml': YAML,
+    '.json': JSON,
+    '.msgpack': MSGPACK,
+    '.mpk': MSGPACK,
+}
+
+# First bytes of a msgpack map (fixmap, map16, map32)
+_MSGPACK_MAP_MARKERS = set(range(0x80, 0x90)) | {0xde, 0xdf}
+
+
+def input_format_for(file_path) -> str:
+    """Return the input format implied by a file's extension, or None if unknown."""
+    return FORMATS_BY_SUFFIX.get(Path(file_path).suffix.lower())
+
+
+def sniff_input_format(raw_data) -> str:
+    """Guess whether raw data is msgpack, JSON or YAML."""
+    if isinstance(raw_data, bytes):
+        if raw_data[:1] and raw_data[0] in _MSGPACK_MAP_MARKERS:
+            return MSGPACK
+        head = raw_data[:64].lstrip(b'\xef\xbb\xbf \t\r\n')[:1]
+        return JSON if head == b'{' else YAML
+    return JSON if raw_data.lstrip()[:1] == '{' else YAML
+
+
+def load_data(raw_data, input_format: str = None):
+    """Load raw process data in the given format, sniffing the format if it is not given."""
+    count('bytes_in', len(raw_data))
+    with phase(LOAD):
+        return _load_data(raw_data, input_format)
+
+
+def _load_data(raw_data, input_format: str = None):
+    if input_format is None:
+        input_format = sniff_input_format(raw_data)
+        if input_format == JSON:
+            # A flow-style YAML mapping also starts with '{'
+            try:
+                return json.loads(raw_data)
+            except ValueError:
+                return _load_yaml(raw_data)
+    if input_format == YAML:
+        return _load_yaml(raw_data)
+    if input_format == JSON:
+        return json.loads(raw_data)
+    if input_format == MSGPACK:
+        return _load_msgpack(raw_data)
+    raise ValueError(f"Unknown input format: {input_format}")
+
+
+def yaml_loader():
+    """Return the fastest available safe YAML loader: libyaml's CSafeLoader if PyYAML was built with it."""
+    import yaml
+    return getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def _load_yaml(raw_data):
+    import yaml
+    return yaml.load(raw_data, Loader=yaml_loader())
+
+
+def _load_msgpack(raw_data):
+    try:
+        import msgpack
+    except ImportError:
+        raise ValueError("msgpack input requires the msgpack package") from None
+    return msgpack.unpackb(raw_data, raw=False)
+
+
+def _link(links: list, step_id: str, owner, attribute: str, data: dict, key: str):
+    """Record a reference from owner.attribute to the step named by data[key], if present."""
+    if key in data:
+        links.append((step_id, owner, attribute, data[key]))
+
+
+def _create_start(step_data, links):
+    """Create a Start step from step data."""
+    start = Start(step_data['step_id'], step_data['name'])
+    _link(links, start.step_id, start, 'successor', step_data, 'successor')
+    return start
+
+
+def _create_task(step_data, links):
+    """Create a Task step and its operations from step data."""
+    task = Task(step_data['step_id'], step_data['name'])
+    _link(links, task.step_id, task, 'successor', step_data, 'successor')
+    if 'operations' in step_data:
+        task.operations = [_create_operation(task.step_id, op_data, links)
+                           for op_data in step_data['operations']]
+    return task
+
+
+def _create_decision(step_data, links):
+    """Create a Decision step from step data."""
+    step_id = step_data['step_id']
+    test = step_data.get('test', '')
+    # The test is either a Query object or a plain string
+    if isinstance(test, dict) and test.get('type') == 'Query':
+        test = _create_operation(step_id, test, links)
+    decision = Decision(step_id, step_data['name'], test)
+    _link(links, step_id, decision, 'yes', step_data, 'yes')
+    _link(links, step_id, decision, 'no', step_data, 'no')
+    return decision
+
+
+def _create_end(step_data, links):
+    """Create an End step from step data."""
+    return End(step_data['step_id'], step_data['name'])
+
+
+def _create_database(step_data, links):
+    """Create a Database step from step data."""
+    return Database(step_data['step_id'], step_data['name'])
+
+
+def _create_document(step_data, links):
+    """Create a Document step from step data."""
+    return Document(step_data['step_id'], step_data['name'])
+
+
+def _create_operation(step_id, op_data, links):
+    """Create an Operation whose target will be resolved once all steps exist."""
+    op_type = op_data['type']
+    if op_type not in OPERATION_TYPES:
+        raise ValueError(f"Unknown operation type: {op_type}")
+    operation = OPERATION_TYPES[op_type](target=op_data['target'], description=op_data['description'])
+    _link(links, step_id, operation, 'target', op_data, 'target')
+    return operation
+
+
+STEP_CREATORS = {
+    'Start': _create_start,
+    'Task': _create_task,
+    'Decision': _create_decision,
+    'End': _create_end,
+    'Database': _create_database,
+    'Document': _create_document,
+}
+
+OPERATION_TYPES = {
+    'Query': Query,
+    'Update': Update,
+}
+
+# Optional step keys kept in Process.annotations rather than on the steps
+ANNOTATIONS = ('simulation',)
 
 
 class Parser:
-    """Parses YAML files to create Process objects."""
+    """Parses YAML, JSON or msgpack process definitions to create Process objects."""
     
     def parse_file(self, file_path: str) -> Process:
-        """Parse a YAML file and return a Process object."""
-        with open(file_path, 'r') as process_file:
-            return self.parse_string(process_file.read())
+        """Parse a process file, choosing the format from its extension."""
+        with open(file_path, 'rb') as process_file:
+            return self.parse_string(process_file.read(), input_format_for(file_path))
+
+    def parse_string(self, raw_data, input_format: str = None) -> Process:
+        """Parse a process definition held in a str or bytes."""
+        return self.parse_data(load_data(raw_data, input_format))
+
+    def parse_data(self, data) -> Process:
+        """
+        Build a Process from already loaded process data.
+
+        Steps are created in a single pass over the step data. References to
+        other steps (successor, yes, no and operation targets) are recorded as
+        they are met and resolved once every step exists, so they may point
+        forwards.
+
+        Raises ValidationError listing every duplicate step_id, unresolved
+        reference and missing Start step found. Use validation.validate for
+        the deeper graph checks.
+        """
+        process, problems = self.build(data)
+        if process.start is None:
+            problems.append(Problem(MISSING_START, None, f"Process {process.process_id} has no Start step"))
+        if problems:
+            raise ValidationError(problems)
+        return process
+
+    def build(self, data) -> Tuple[Process, List[Problem]]:
+        """
+        Build a Process from loaded data without failing on reference problems.
 
-    def parse_string(self, raw_data):
-        data = yaml.safe_load(raw_data)
+        Returns (process, problems). Unresolved references are left as None
+        and reported in problems, as are duplicate step_ids, so a checker can
+        combine them with validation.validate's findings. A missing Start step
+        is left for validate to report.
+        """
+        if 'process' not in data:
+            raise ValueError("No process header: expected a process with process_id and name")
         process_data = data['process']
-        # Create process
         process = Process(
             process_id=process_data['process_id'],
             name=process_data['name']
         )
-        
-        # Create all steps and add to process
-        for step_data in data['steps']:
-            step = self._create_step(step_data)
-            process[step.step_id] = step
-        
-        # Connect steps
-        self._connect_steps(data['steps'], process)
-        
-        # Connect operations (resolve target references)
-        self._connect_operations(data['steps'], process)
-        
-        # Find and set the start step
-        start_step = next(step for step in process.step_ids() if isinstance(process[step], Start))
-        process.start = process[start_step]
-        return process
 
-    def _create_step(self, step_data):
-        """Create a step object from step data."""
-        step_type = step_data['type']
-        
-        step_creators = {
-            'Start': self._create_start_step,
-            'Task': self._create_task_step,
-            'Decision': self._create_decision_step,
-            'End': self._create_end_step,
-            'Database': self._create_database_step,
-            'Document': self._create_document_step
-        }
-        
-        if step_type not in step_creators:
-            raise ValueError(f"Unknown step type: {step_type}")
-        
-        return step_creators[step_type](step_data)
-    
-    def _create_start_step(self, step_data):
-        """Create a Start step from step data."""
-        return Start(step_data['step_id'], step_data['name'])
-    
-    def _create_task_step(self, step_data):
-        """Create a Task step from step data."""
-        task = Task(step_data['step_id'], step_data['name'])
-        
-        # Parse operations if present
-        if 'operations' in step_data:
-            for op_data in step_data['operations']:
-                operation = self._create_operation(op_data)
-                task.operations.append(operation)
-        
-        return task
-    
-    def _create_decision_step(self, step_data):
-        """Create a Decision step from step data."""
-        test_data = step_data.get('test', '')
-        
-        # Check if test is a Query object or a string
-        if isinstance(test_data, dict) and test_data.get('type') == 'Query':
-            test = self._create_operation(test_data)
-        else:
-            test = test_data
-            
-        return Decision(step_data['step_id'], step_data['name'], test)
-    
-    def _create_end_step(self, step_data):
-        """Create an End step from step data."""
-        return End(step_data['step_id'], step_data['name'])
-    
-    def _create_database_step(self, step_data):
-        """Create a Database step from step data."""
-        return Database(step_data['step_id'], step_data['name'])
-    
-    def _create_document_step(self, step_data):
-        """Create a Document step from step data."""
-        return Document(step_data['step_id'], step_data['name'])
-    
-    def _create_operation(self, op_data):
-        """Create an Operation object from operation data."""
-        op_type = op_data['type']
-        
-        # Note: target will be resolved in _connect_operations
-        if op_type == 'Query':
-            return Query(target=op_data['target'], description=op_data['description'])
-        elif op_type == 'Update':
-            return Update(target=op_data['target'], description=op_data['description'])
-        else:
-            raise ValueError(f"Unknown operation type: {op_type}")
-    
-    def _connect_steps(self, steps_data, process):
-        """Connect steps based on successor/yes/no references."""
-        for step_data in steps_data:
-            step = process[step_data['step_id']]
-            
-            if hasattr(step, 'successor') and 'successor' in step_data:
-                step.successor = process[step_data['successor']]
-            
-            if hasattr(step, 'yes') and 'yes' in step_data:
-                step.yes = process[step_data['yes']]
-            
-            if hasattr(step, 'no') and 'no' in step_data:
-                step.no = process[step_data['no']]
-    
-    def _connect_operations(self, steps_data, process):
-        """Connect operation targets to actual Resource objects."""
-        for step_data in steps_data:
-            step = process[step_data['step_id']]
-            
-            # Handle Task operations
-            if hasattr(step, 'operations') and 'operations' in step_data:
-                for i, op_data in enumerate(step_data['operations']):
-                    target_id = op_data['target']
-                    step.operations[i].target = process[target_id]
-            
-            # Handle Decision test if it's a Query
-            if hasattr(step, 'test') and isinstance(step.test, Query):
-                # Find the test data to get the target reference
-                test_data = step_data.get('test', {})
-                if isinstance(test_data, dict) and 'target' in test_data:
-                    target_id = test_data['target']
-                    step.test.target = process[target_id]
\ No newline at end of file
+        links = []
+        problems = []
+        with _gc_paused(), phase(CREATE):
+            for step_data in data['steps']:
+                step_type = step_data['type']
+                if step_type not in STEP_CREATORS:
+                    raise ValueError(f"Unknown step type: {step_type}")
+                step = STEP_CREATORS[step_type](step_data, links)
+                if step.step_id in process:
+                    problems.append(Problem(DUPLICATE_STEP, step.step_id,
+                                            "step_id is used by more than one step"))
+                    continue
+                process[step.step_id] = step
+                for key in ANNOTATIONS:
+                    if key in step_data:
+                        process.annotations.setdefault(step.step_id, {})[key] = step_data[key]
+                if process.start is None and step_type == 'Start':
+                    process.start = step
+
+        with _gc_paused(), phase(LINK):
+            for step_id, owner, attribute, target_id in links:
+                target = process.get_step(target_id)
+                if target is None:
+                    problems.append(Problem(UNRESOLVED_REFERENCE, step_id,
+                                            f"{attribute} refers to unknown step {target_id}"))
+                setattr(owner, attribute, target)
+
+        profile = active()
+        if profile is not None:
+            profile.count('steps', len(process))
+            profile.count('operations', sum(attribute == 'target' for _, _, attribute, _ in links))
+            profile.count('references', len(links))
+        return process, problems
@@ -0,0 +1,130 @@
+"""
+Per-phase timers and counters for finding where a conversion spends its time.
+
+The parser, loaders and visitors mark their phases with phase() and their
+sizes with count():
+
+    load      reading YAML, JSON, msgpack or a snapshot (bytes_in)
+    create    creating steps and operations (steps, operations)
+    link      resolving references between steps (references)
+    render    writing the output formats (edges, chars_out)
+
+Nothing is recorded unless a Profile is active. With none active, phase()
+returns a shared do-nothing context manager and count() returns at once,
+so the hooks cost a function call each:
+
+    with profiling() as profile:
+        convert_file('order.yaml', 'order.mmd')
+    print('\\n'.join(profile.lines()))
+
+Hooks are callables added to Profile.hooks; each is called with the phase
+name and its duration in seconds as every phase ends.
+"""
+
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List
+
+LOAD = 'load'
+CREATE = 'create'
+LINK = 'link'
+RENDER = 'render'
+
+# The profile being recorded, if any
+_active = None
+_DISABLED = nullcontext()
+
+
+class Profile:
+    """Totals of the time spent in each phase and the counters recorded while active."""
+
+    def __init__(self, hooks: List[Callable[[str, float], None]] = None):
+        # name -> [calls, seconds]
+        self.phases: Dict[str, list] = {}
+        self.counters: Dict[str, int] = {}
+        self.hooks = list(hooks or ())
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a phase, adding it to the totals and calling the hooks when it ends."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            totals = self.phases.setdefault(name, [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            for hook in self.hooks:
+                hook(name, seconds)
+
+    def count(self, name: str, amount: int = 1):
+        """Add amount to a counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def to_dict(self) -> dict:
+        """Return the phases and counters as plain data, for JSON output."""
+        return {
+            'phases': {name: {'calls': calls, 'seconds': seconds}
+                       for name, (calls, seconds) in self.phases.items()},
+            'counters': dict(self.counters),
+        }
+
+    def dumps(self) -> str:
+        """Return the profile as JSON."""
+        return json.dumps(self.to_dict(), indent=2)
+
+    def lines(self) -> List[str]:
+        """Return a table of the phases, slowest first, followed by the counters."""
+        total = sum(seconds for _, seconds in self.phases.values())
+        lines = [f"{'phase':10} {'calls':>8} {'ms':>10} {'share':>6}"]
+        for name, (calls, seconds) in sorted(self.phases.items(), key=lambda item: -item[1][1]):
+            share = seconds / total if total else 0.0
+            lines.append(f"{name:10} {calls:8} {seconds * 1000:10.1f} {share:6.1%}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:10} {value:8}")
+        return lines
+
+
+@contextmanager
+def profiling(profile: Profile = None):
+    """Record phases and counters into profile (a new Profile if not given) for the duration."""
+    global _active
+    profile = profile or Profile()
+    previous, _active = _active, profile
+    try:
+        yield profile
+    finally:
+        _active = previous
+
+
+def active() -> Profile:
+    """Return the profile being recorded, or None."""
+    return _active
+
+
+def phase(name: str):
+    """Return a context manager timing a phase into the active profile, if any."""
+    if _active is None:
+        return _DISABLED
+    return _active.phase(name)
+
+
+def count(name: str, amount: int = 1):
+    """Add amount to a counter of the active profile, if any."""
+    if _active is not None:
+        _active.count(name, amount)
+
+
+class CountingStream:
+    """Wraps a text stream, counting the characters written to it into a counter."""
+
+    def __init__(self, stream, profile: Profile, counter: str = 'chars_out'):
+        self._stream = stream
+        self._profile = profile
+        self._counter = counter
+
+    def write(self, text: str):
+        self._profile.count(self._counter, len(text))
+        return self._stream.write(text)
@@ -0,0 +1,162 @@
+"""
+Which steps read and write each Database and Document.
+
+ResourceIndex is built in one pass over a process's steps. It maps each
+resource to the steps that query or update it, and each step to the
+resources it uses. A Decision whose test is a Query reads its resource.
+The CRUD report combines the indexes of many process files into one
+read/write matrix of resources against steps, written as CSV or JSON.
+"""
+
+import csv
+import json
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .steps import Process, Step, Task, Decision, Resource, Query
+
+READ = 'R'
+WRITE = 'W'
+
+CSV_COLUMNS = ('resource_id', 'resource_type', 'resource_name', 'process_id', 'step_id', 'step_type',
+               'access', 'descriptions')
+
+
+class ResourceUse(NamedTuple):
+    """One step's use of one resource through a single operation."""
+    step_id: str
+    resource_id: str
+    access: str
+    description: str
+
+
+def _uses(step: Step) -> Iterator[ResourceUse]:
+    """Generate a step's resource uses, in operation order."""
+    if isinstance(step, Task):
+        operations = step.operations
+    elif isinstance(step, Decision) and isinstance(step.test, Query):
+        operations = (step.test,)
+    else:
+        return
+    for operation in operations:
+        if operation.target is not None:
+            yield ResourceUse(step.step_id, operation.target.step_id,
+                              READ if isinstance(operation, Query) else WRITE, operation.description)
+
+
+class ResourceIndex:
+    """Resource uses of one process, by resource and by step."""
+
+    def __init__(self, process: Process):
+        self.process = process
+        self.by_resource: Dict[str, List[ResourceUse]] = {}
+        self.by_step: Dict[str, List[ResourceUse]] = {}
+        for step_id in process.step_ids():
+            step = process[step_id]
+            if isinstance(step, Resource):
+                self.by_resource.setdefault(step_id, [])
+                continue
+            for use in _uses(step):
+                self.by_resource.setdefault(use.resource_id, []).append(use)
+                self.by_step.setdefault(step_id, []).append(use)
+
+    def resource_ids(self) -> List[str]:
+        """Return every resource in the process, including unused ones and those only referred to."""
+        return list(self.by_resource)
+
+    def readers(self, resource_id: str) -> List[str]:
+        """Return the IDs of the steps that query a resource, in step order."""
+        return list(dict.fromkeys(use.step_id for use in self.by_resource.get(resource_id, ())
+                                  if use.access == READ))
+
+    def writers(self, resource_id: str) -> List[str]:
+        """Return the IDs of the steps that update a resource, in step order."""
+        return list(dict.fromkeys(use.step_id for use in self.by_resource.get(resource_id, ())
+                                  if use.access == WRITE))
+
+    def resources_used_by(self, step_id: str) -> List[str]:
+        """Return the IDs of the resources a step queries or updates, in operation order."""
+        return list(dict.fromkeys(use.resource_id for use in self.by_step.get(step_id, ())))
+
+    def access(self, resource_id: str, step_id: str) -> str:
+        """Return 'R', 'W', 'RW' or '' for how a step uses a resource."""
+        kinds = {use.access for use in self.by_step.get(step_id, ()) if use.resource_id == resource_id}
+        return ''.join(kind for kind in (READ, WRITE) if kind in kinds)
+
+    def rows(self) -> Iterator[tuple]:
+        """Generate one CSV_COLUMNS row per resource and step that uses it, resources in step order."""
+        process = self.process
+        for resource_id, uses in self.by_resource.items():
+            resource = process.get_step(resource_id)
+            resource_type = type(resource).__name__ if resource is not None else ''
+            resource_name = resource.name if resource is not None else ''
+            by_step = defaultdict(list)
+            for use in uses:
+                by_step[use.step_id].append(use)
+            for step_id, step_uses in by_step.items():
+                kinds = {use.access for use in step_uses}
+                access = ''.join(kind for kind in (READ, WRITE) if kind in kinds)
+                descriptions = '; '.join(dict.fromkeys(use.description for use in step_uses
+                                                       if use.description))
+                yield (resource_id, resource_type, resource_name, process.process_id, step_id,
+                       type(process[step_id]).__name__, access, descriptions)
+
+
+def file_rows(source: str) -> Tuple[str, List[tuple], Optional[str]]:
+    """
+    Load one process file and return (source, rows, error).
+
+    Fragments give no rows; failures are reported in error rather than raised.
+    """
+    from pathlib import Path
+    from .batch import load_process
+    try:
+        process, _ = load_process(source, Path(source).read_bytes())
+    except Exception as error:
+        return source, [], f"{type(error).__name__}: {error}"
+    if process is None:
+        return source, [], None
+    return source, list(ResourceIndex(process).rows()), None
+
+
+def collect(sources: List[str], workers: int = None) -> Tuple[List[tuple], List[Tuple[str, str]]]:
+    """
+    Index many files, spread across a process pool, and return (rows, failures).
+
+    Rows are ordered by source file, so the report is the same on every run.
+    failures lists (source, error) for files that could not be loaded.
+    """
+    from .batch import _run_all
+    results = sorted(_run_all(file_rows, [(source,) for source in sources], workers))
+    rows = [row for _, rows_of_file, _ in results for row in rows_of_file]
+    return rows, [(source, error) for source, _, error in results if error is not None]
+
+
+def write_csv(rows: Iterable[tuple], stream):
+    """Write matrix rows as CSV with a header."""
+    writer = csv.writer(stream, lineterminator='\n')
+    writer.writerow(CSV_COLUMNS)
+    writer.writerows(rows)
+
+
+def matrix(rows: Iterable[tuple]) -> dict:
+    """
+    Return rows as a resource by step matrix.
+
+    {resource_id: {'type', 'name', 'steps': {'process_id/step_id': 'R', 'W' or 'RW'}}}
+    Resources with the same ID in several processes are merged, taking the
+    type and name from the first that defines them.
+    """
+    resources = {}
+    for resource_id, resource_type, resource_name, process_id, step_id, _, access, _ in rows:
+        entry = resources.setdefault(resource_id, {'type': '', 'name': '', 'steps': {}})
+        if not entry['type'] and resource_type:
+            entry['type'], entry['name'] = resource_type, resource_name
+        entry['steps'][f"{process_id}/{step_id}"] = access
+    return resources
+
+
+def write_json(rows: Iterable[tuple], stream):
+    """Write matrix rows as the JSON matrix returned by matrix."""
+    json.dump(matrix(rows), stream, indent=2, sort_keys=True)
+    stream.write('\n')
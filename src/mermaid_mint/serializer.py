@@ -0,0 +1,230 @@
+"""
+Serialization of Process objects back to the DSL, and binary snapshots.
+
+to_data turns a Process into the nested dicts and lists the parser loads,
+so dumps_yaml and dumps_json write files that parse back to an equivalent
+Process. A snapshot is a compact binary form that loads several times
+faster than parsing YAML:
+
+    header    magic, version, process_id, name, start, annotations and
+              the number of strings, steps and operations
+    strings   every distinct string, UTF-8 encoded and NUL separated
+    steps     one fixed-size record per step: type, step_id, name,
+              successor, yes, no, test and its first operation and count
+    operations  one fixed-size record per operation: type, target and
+              description
+
+References to steps are indexes into the step records and strings are
+indexes into the string table, so every record is a fixed-size array
+element that can be read in place from an mmap.
+"""
+
+import json
+import mmap
+import struct
+
+from .profiling import LOAD, count, phase
+from .steps import Process, Start, Task, Decision, End, Database, Document, Query, Update, _gc_paused
+
+SNAPSHOT_SUFFIX = '.mmsnap'
+SNAPSHOT_MAGIC = b'MMSNAP'
+SNAPSHOT_VERSION = 1
+
+STEP_TYPES = (Start, Task, Decision, End, Database, Document)
+OPERATION_TYPES = (Query, Update)
+
+# magic, version, process_id, name, start, annotations, strings size, steps, operations
+_HEADER = struct.Struct('<6sHiiiiIII')
+# type, step_id, name, successor, yes, no, test string, test operation, first operation, operations
+_STEP = struct.Struct('<Biiiiiiiii')
+# type, target, description
+_OPERATION = struct.Struct('<Bii')
+
+_NONE = -1
+
+
+def _step_id(step):
+    return step.step_id if step is not None else None
+
+
+def _operation_data(operation) -> dict:
+    return {'type': type(operation).__name__, 'target': _step_id(operation.target),
+            'description': operation.description}
+
+
+def step_data(step, annotations: dict = None) -> dict:
+    """Return the DSL data for one step, in the key order used by the examples."""
+    if type(step) not in STEP_TYPES:
+        raise ValueError(f"{step.step_id}: {type(step).__name__} steps cannot be serialized")
+    data = {'step_id': step.step_id, 'type': type(step).__name__, 'name': step.name}
+    if isinstance(step, Decision):
+        data['test'] = _operation_data(step.test) if isinstance(step.test, Query) else step.test
+        if step.yes is not None:
+            data['yes'] = step.yes.step_id
+        if step.no is not None:
+            data['no'] = step.no.step_id
+    if isinstance(step, Task) and step.operations:
+        data['operations'] = [_operation_data(operation) for operation in step.operations]
+    if isinstance(step, (Start, Task)) and step.successor is not None:
+        data['successor'] = step.successor.step_id
+    if annotations:
+        data.update(annotations)
+    return data
+
+
+def to_data(process: Process) -> dict:
+    """Return a Process as the data the parser loads, annotations included."""
+    return {
+        'process': {'process_id': process.process_id, 'name': process.name},
+        'steps': [step_data(process[step_id], process.annotations.get(step_id))
+                  for step_id in process.step_ids()],
+    }
+
+
+def dumps_yaml(process: Process) -> str:
+    """Return a Process as a YAML process definition."""
+    import yaml
+    dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+    return yaml.dump(to_data(process), Dumper=dumper, sort_keys=False, allow_unicode=True)
+
+
+def dumps_json(process: Process, indent: int = 2) -> str:
+    """Return a Process as a JSON process definition."""
+    return json.dumps(to_data(process), indent=indent, ensure_ascii=False)
+
+
+def dumps_snapshot(process: Process) -> bytes:
+    """Return a Process as a binary snapshot."""
+    strings = {}
+
+    def string(value) -> int:
+        if value is None:
+            return _NONE
+        if not isinstance(value, str):
+            raise ValueError(f"Snapshot strings must be str, not {type(value).__name__}: {value!r}")
+        if '\0' in value:
+            raise ValueError(f"Snapshot strings cannot contain NUL: {value!r}")
+        return strings.setdefault(value, len(strings))
+
+    step_ids = process.step_ids()
+    index = {step_id: number for number, step_id in enumerate(step_ids)}
+
+    def reference(step) -> int:
+        return index[step.step_id] if step is not None else _NONE
+
+    steps = bytearray()
+    operations = bytearray()
+    operation_count = 0
+
+    def add_operations(items) -> tuple:
+        nonlocal operation_count
+        first = operation_count
+        for operation in items:
+            operations.extend(_OPERATION.pack(OPERATION_TYPES.index(type(operation)),
+                                              reference(operation.target), string(operation.description)))
+            operation_count += 1
+        return first, operation_count - first
+
+    for step_id in step_ids:
+        step = process[step_id]
+        if type(step) not in STEP_TYPES:
+            raise ValueError(f"{step_id}: {type(step).__name__} steps cannot be serialized")
+        successor = yes = no = test = test_operation = _NONE
+        first, count = operation_count, 0
+        if isinstance(step, (Start, Task)):
+            successor = reference(step.successor)
+        if isinstance(step, Task):
+            first, count = add_operations(step.operations)
+        if isinstance(step, Decision):
+            yes, no = reference(step.yes), reference(step.no)
+            if isinstance(step.test, Query):
+                test_operation = add_operations([step.test])[0]
+            elif step.test is None or isinstance(step.test, str):
+                test = string(step.test)
+            else:
+                raise ValueError(f"{step_id}: a Decision test must be a string or Query to be serialized, "
+                                 f"not {type(step.test).__name__}")
+        steps.extend(_STEP.pack(STEP_TYPES.index(type(step)), string(step.step_id), string(step.name),
+                                successor, yes, no, test, test_operation, first, count))
+
+    annotations = string(json.dumps(process.annotations)) if process.annotations else _NONE
+    header_strings = (string(process.process_id), string(process.name))
+    table = '\0'.join(strings).encode('utf-8')
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, *header_strings,
+                          reference(process.start), annotations, len(table), len(step_ids), operation_count)
+    return b''.join((header, table, bytes(steps), bytes(operations)))
+
+
+def loads_snapshot(data) -> Process:
+    """Build a Process from a binary snapshot held in bytes, a memoryview or an mmap."""
+    view = memoryview(data)
+    count('bytes_in', view.nbytes)
+    with phase(LOAD):
+        return _load_snapshot(view)
+
+
+def _load_snapshot(view: memoryview) -> Process:
+    try:
+        magic, version, process_id, name, start, annotations, table_size, step_count, operation_count = \
+            _HEADER.unpack_from(view)
+    except struct.error:
+        raise ValueError("Not a mermaid-mint snapshot: too short") from None
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not a mermaid-mint snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+
+    offset = _HEADER.size
+    strings = str(view[offset:offset + table_size], 'utf-8').split('\0')
+    offset += table_size
+    steps_end = offset + step_count * _STEP.size
+    operations_end = steps_end + operation_count * _OPERATION.size
+    if len(view) < operations_end:
+        raise ValueError("Truncated snapshot")
+    step_records = list(_STEP.iter_unpack(view[offset:steps_end]))
+    operation_records = list(_OPERATION.iter_unpack(view[steps_end:operations_end]))
+
+    process = Process(strings[process_id], strings[name])
+    with _gc_paused():
+        steps = [STEP_TYPES[record[0]](strings[record[1]], strings[record[2]]) for record in step_records]
+
+        def operation(number):
+            kind, target, description = operation_records[number]
+            return OPERATION_TYPES[kind](steps[target] if target != _NONE else None,
+                                         strings[description] if description != _NONE else None)
+
+        for step, (_, _, _, successor, yes, no, test, test_operation, first, count) in zip(steps, step_records):
+            if successor != _NONE:
+                step.successor = steps[successor]
+            if count:
+                step.operations = [operation(number) for number in range(first, first + count)]
+            if isinstance(step, Decision):
+                step.yes = steps[yes] if yes != _NONE else None
+                step.no = steps[no] if no != _NONE else None
+                if test_operation != _NONE:
+                    step.test = operation(test_operation)
+                else:
+                    step.test = strings[test] if test != _NONE else None
+            process[step.step_id] = step
+    if start != _NONE:
+        process.start = steps[start]
+    if annotations != _NONE:
+        process.annotations = json.loads(strings[annotations])
+    return process
+
+
+def dump_snapshot(process: Process, path: str):
+    """Write a Process to a snapshot file."""
+    with open(path, 'wb') as snapshot_file:
+        snapshot_file.write(dumps_snapshot(process))
+
+
+def load_snapshot(path: str) -> Process:
+    """Load a snapshot file, reading its records in place through mmap."""
+    with open(path, 'rb') as snapshot_file:
+        with mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return loads_snapshot(view)
+            finally:
+                view.release()
@@ -0,0 +1,382 @@
+"""
+Local HTTP service that converts process definitions on request.
+
+    POST /render?format=mermaid   body: a YAML or JSON process definition
+    GET  /metrics                 request, cache and latency counters as JSON
+    GET  /health                  "ok"
+
+The service runs on asyncio and hands each conversion to a process pool,
+so the event loop keeps accepting requests while large processes convert.
+Each worker keeps its Parser and visitors warm between requests. Outputs
+are kept in a bounded LRU cache keyed by a hash of the body and format,
+and concurrent requests for the same key share one conversion.
+
+Only the standard library is used. The HTTP handling is deliberately
+small: it understands Content-Length bodies and keep-alive, which is all a
+local client such as a wiki plugin needs.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .cache import cache_key
+from .manifest import is_fragment, is_manifest
+from .parser import JSON, YAML, Parser, load_data
+from .visitors import MermaidVisitor, get_visitor, visitor_class
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8737
+DEFAULT_CACHE_ENTRIES = 1024
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+MAX_BODY_BYTES = 16 * 1024 * 1024
+# Latencies kept for the percentiles reported by /metrics
+LATENCY_WINDOW = 4096
+
+CONTENT_TYPES = {
+    'mermaid': 'text/plain; charset=utf-8',
+    'dot': 'text/vnd.graphviz; charset=utf-8',
+    'json': 'application/json',
+    'graphml': 'application/xml',
+}
+_INPUT_TYPES = {'application/json': JSON, 'application/yaml': YAML, 'application/x-yaml': YAML,
+                'text/yaml': YAML}
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            411: 'Length Required', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+# One warm parser and one visitor per format in each worker process
+_parser = Parser()
+_visitors = {}
+
+
+def render(raw: bytes, format_name: str, input_format: str = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Convert one process definition in a worker, returning (output, None) or (None, error).
+
+    Errors are returned as text rather than raised, so exceptions that do
+    not pickle cannot break the pool.
+    """
+    try:
+        data = load_data(raw, input_format)
+        if is_manifest(data) or is_fragment(data):
+            raise ValueError("manifests and fragments must be converted from disk")
+        process = _parser.parse_data(data)
+        visitor = _visitors.get(format_name)
+        if visitor is None:
+            visitor = _visitors[format_name] = get_visitor(format_name)
+        return visitor.visit_process(process), None
+    except Exception as error:
+        return None, f"{type(error).__name__}: {error}"
+
+
+def _warm_up():
+    """Load the YAML library in a new worker before its first request."""
+    from .parser import yaml_loader
+    yaml_loader()
+
+
+class LRUCache:
+    """Outputs by key, dropping the least recently used once either bound is exceeded."""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the output cached under key, marking it as recently used, or None."""
+        output = self._entries.get(key)
+        if output is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return output
+
+    def put(self, key: str, output: bytes):
+        """Cache output under key, evicting old entries to stay within the bounds."""
+        if len(output) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= len(previous)
+        self._entries[key] = output
+        self.bytes += len(output)
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= len(evicted)
+            self.evictions += 1
+
+
+class RenderService:
+    """
+    The conversion service behind the HTTP server.
+
+    render() serves from the cache, joins a conversion already running for
+    the same key, or starts a new one in the executor. Pass an executor to
+    share one; otherwise a process pool of the given number of workers is
+    created on start().
+    """
+
+    def __init__(self, workers: int = None, cache: LRUCache = None, executor=None):
+        self.workers = workers
+        self.cache = cache if cache is not None else LRUCache()
+        self.executor = executor
+        self._owns_executor = executor is None
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Work submitted to the executor and not yet finished, so close() can
+        # cancel what has not started (shutdown's cancel_futures needs 3.9)
+        self._submitted = set()
+        self.requests = 0
+        self.conversions = 0
+        self.deduplicated = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.started = time.monotonic()
+
+    def start(self):
+        """
+        Create the worker pool, if none was given.
+
+        Workers are started by a fork server where available: a worker forked
+        from this process while a request is being served would inherit the
+        client's socket and hold the connection open.
+        """
+        if self.executor is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                                initializer=_warm_up)
+            # Start the workers now rather than on the first requests
+            for _ in range(self.workers or os.cpu_count() or 1):
+                self._submit(_warm_up)
+
+    def _submit(self, function, *arguments):
+        """Submit work to the executor and track it until it finishes."""
+        future = self.executor.submit(function, *arguments)
+        self._submitted.add(future)
+        future.add_done_callback(self._submitted.discard)
+        return future
+
+    def close(self):
+        """Cancel work that has not started and shut down the worker pool if this service created it."""
+        for future in list(self._submitted):
+            future.cancel()
+        if self._owns_executor and self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    async def render(self, raw: bytes, format_name: str, input_format: str = None) -> bytes:
+        """Return the output for raw in a format, raising ValueError if it cannot be converted."""
+        visitor_class(format_name)
+        key = cache_key(raw, format_name)
+        output = self.cache.get(key)
+        if output is not None:
+            return output
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.deduplicated += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            self.conversions += 1
+            text, error = await asyncio.wrap_future(self._submit(render, raw, format_name, input_format))
+            if error is not None:
+                raise ValueError(error)
+            output = text.encode('utf-8')
+            self.cache.put(key, output)
+            future.set_result(output)
+            return output
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            # Waiters see the exception; mark it retrieved for when there are none
+            future.exception()
+            raise
+        finally:
+            del self._pending[key]
+
+    def record(self, seconds: float, ok: bool):
+        """Count a finished request and its latency."""
+        self.requests += 1
+        self.errors += not ok
+        self.latencies.append(seconds)
+
+    def metrics(self) -> dict:
+        """Return the request, cache and latency counters."""
+        latencies = sorted(self.latencies)
+
+        def percentile(percent):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(len(latencies) * percent / 100))] * 1000
+
+        return {
+            'uptime_seconds': time.monotonic() - self.started,
+            'requests': self.requests,
+            'errors': self.errors,
+            'conversions': self.conversions,
+            'deduplicated': self.deduplicated,
+            'in_flight': len(self._pending),
+            'cache': {'entries': len(self.cache), 'bytes': self.cache.bytes, 'hits': self.cache.hits,
+                      'misses': self.cache.misses, 'evictions': self.cache.evictions},
+            'latency_ms': {'p50': percentile(50), 'p90': percentile(90), 'p99': percentile(99),
+                           'max': latencies[-1] * 1000 if latencies else 0.0},
+        }
+
+
+class _HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    """Read one request, returning (method, target, headers, body), or None at end of stream."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, target, _ = request_line.decode('latin-1').split()
+    except ValueError:
+        raise _HttpError(400, "malformed request line") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    body = b''
+    if method == 'POST':
+        if 'content-length' not in headers:
+            raise _HttpError(411, "a Content-Length header is required")
+        try:
+            length = int(headers['content-length'])
+        except ValueError:
+            raise _HttpError(400, "Content-Length is not a number") from None
+        if length > MAX_BODY_BYTES:
+            raise _HttpError(413, f"bodies are limited to {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length)
+    return method, target, headers, body
+
+
+def _response(status: int, body: bytes, content_type: str, keep_alive: bool) -> bytes:
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+class RenderServer:
+    """Serves a RenderService over HTTP on asyncio streams."""
+
+    def __init__(self, service: RenderService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.service = service
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        """Start the worker pool and begin listening; port 0 picks a free port."""
+        self.service.start()
+        self._server = await asyncio.start_server(self._connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """Start if needed and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening and shut down the worker pool."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.service.close()
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    method, target, headers, body = request
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+                    status, payload, content_type = await self._handle(method, target, headers, body)
+                except _HttpError as error:
+                    status, payload, content_type = error.status, str(error).encode(), 'text/plain'
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as error:
+                    status, payload, content_type = 500, f"{type(error).__name__}: {error}".encode(), 'text/plain'
+                writer.write(_response(status, payload, content_type, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _handle(self, method: str, target: str, headers: dict, body: bytes):
+        url = urlsplit(target)
+        if url.path == '/health':
+            return 200, b'ok', 'text/plain'
+        if url.path == '/metrics':
+            return 200, json.dumps(self.service.metrics()).encode(), 'application/json'
+        if url.path != '/render':
+            raise _HttpError(404, f"no such endpoint: {url.path}")
+        if method != 'POST':
+            raise _HttpError(405, "POST a process definition to /render")
+
+        format_name = parse_qs(url.query).get('format', [MermaidVisitor.format_name])[0]
+        input_format = _INPUT_TYPES.get(headers.get('content-type', '').split(';')[0].strip())
+        started = time.perf_counter()
+        ok = False
+        try:
+            output = await self.service.render(body, format_name, input_format)
+            ok = True
+        except ValueError as error:
+            raise _HttpError(400, str(error)) from None
+        finally:
+            self.service.record(time.perf_counter() - started, ok)
+        return 200, output, CONTENT_TYPES.get(format_name, 'text/plain; charset=utf-8')
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = None,
+          cache_entries: int = DEFAULT_CACHE_ENTRIES, cache_bytes: int = DEFAULT_CACHE_BYTES,
+          ready=None):
+    """Run the service until interrupted, calling ready(server) once it is listening."""
+    server = RenderServer(RenderService(workers, LRUCache(cache_entries, cache_bytes)), host, port)
+
+    async def main():
+        await server.start()
+        if ready is not None:
+            ready(server)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    asyncio.run(main())
@@ -0,0 +1,248 @@
+"""
+Monte Carlo simulation of process instances.
+
+Steps may carry an optional simulation annotation in the process file:
+
+    - step_id: "check_inventory"
+      type: "Decision"
+      name: "Check Product Availability"
+      simulation:
+        yes_probability: 0.8
+        duration: 2
+
+    - step_id: "process_payment"
+      type: "Task"
+      name: "Process Payment"
+      simulation:
+        duration: {distribution: "triangular", low: 5, mode: 8, high: 20}
+
+A duration is either a number or a distribution: constant (value),
+uniform (low, high), triangular (low, mode, high), normal (mean, stddev,
+truncated at zero) or exponential (mean). Steps without a duration take
+no time and decisions without a yes_probability go either way equally.
+Durations are in whatever unit the annotations use.
+"""
+
+import math
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from .steps import Process, Start, Task, Decision, End, QUERY, UPDATE
+
+# Instances are simulated in batches of this size, each with its own seed,
+# so a seed gives the same results whatever the number of workers
+BATCH_SIZE = 10000
+DEFAULT_MAX_STEPS = 10000
+
+DISTRIBUTIONS = {
+    'constant': ('value',),
+    'uniform': ('low', 'high'),
+    'triangular': ('low', 'mode', 'high'),
+    'normal': ('mean', 'stddev'),
+    'exponential': ('mean',),
+}
+
+# Kinds of compiled step
+_TASK = 0
+_DECISION = 1
+_END = 2
+
+
+def compile_duration(step_id: str, spec) -> tuple:
+    """Return a duration annotation as a (distribution, *parameters) tuple."""
+    if spec is None:
+        return ('constant', 0.0)
+    if isinstance(spec, (int, float)) and not isinstance(spec, bool):
+        return ('constant', float(spec))
+    if not isinstance(spec, dict):
+        raise ValueError(f"{step_id}: duration must be a number or a distribution")
+    distribution = spec.get('distribution', 'constant')
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"{step_id}: unknown duration distribution {distribution}")
+    try:
+        parameters = tuple(float(spec[name]) for name in DISTRIBUTIONS[distribution])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"{step_id}: a {distribution} duration needs numeric "
+                         f"{', '.join(DISTRIBUTIONS[distribution])}") from None
+    return (distribution,) + parameters
+
+
+def sample_duration(rng: random.Random, duration: tuple) -> float:
+    """Draw one duration from a compiled distribution."""
+    distribution = duration[0]
+    if distribution == 'constant':
+        return duration[1]
+    if distribution == 'uniform':
+        return rng.uniform(duration[1], duration[2])
+    if distribution == 'triangular':
+        return rng.triangular(duration[1], duration[3], duration[2])
+    if distribution == 'normal':
+        return max(0.0, rng.gauss(duration[1], duration[2]))
+    return rng.expovariate(1.0 / duration[1]) if duration[1] > 0 else 0.0
+
+
+@dataclass
+class SimulationModel:
+    """
+    A process compiled to flat tuples for fast, picklable simulation.
+
+    Each entry of steps is (kind, step_id, duration, operations, next) where
+    operations is a tuple of (resource_id, kind) and next is the index of
+    the successor (-1 for none) or, for a decision, (yes_probability, yes
+    index, no index).
+    """
+    steps: tuple
+    start: int
+
+    @classmethod
+    def from_process(cls, process: Process) -> 'SimulationModel':
+        """Compile a process, raising ValueError for a missing start or a bad annotation."""
+        if process.start is None:
+            raise ValueError(f"Process {process.process_id} has no Start step")
+        control = [step_id for step_id in process.step_ids()
+                   if isinstance(process[step_id], (Start, Task, Decision, End))]
+        index = {step_id: number for number, step_id in enumerate(control)}
+
+        def target(step):
+            return index.get(step.step_id, -1) if step is not None else -1
+
+        steps = []
+        for step_id in control:
+            step = process[step_id]
+            annotation = process.annotations.get(step_id, {}).get('simulation') or {}
+            duration = compile_duration(step_id, annotation.get('duration'))
+            operations = tuple((edge.target, edge.kind) for edge in process.out_edges(step_id)
+                               if edge.kind in (QUERY, UPDATE))
+            if isinstance(step, Decision):
+                probability = annotation.get('yes_probability', 0.5)
+                if not isinstance(probability, (int, float)) or not 0 <= probability <= 1:
+                    raise ValueError(f"{step_id}: yes_probability must be between 0 and 1")
+                steps.append((_DECISION, step_id, duration, operations,
+                              (probability, target(step.yes), target(step.no))))
+            elif isinstance(step, End):
+                steps.append((_END, step_id, duration, operations, -1))
+            else:
+                steps.append((_TASK, step_id, duration, operations, target(step.successor)))
+        return cls(tuple(steps), index[process.start.step_id])
+
+
+@dataclass
+class SimulationReport:
+    """
+    Aggregated results of simulated instances.
+
+    paths counts the sequence of (decision, 'yes' or 'no') choices each
+    instance made. unfinished counts instances that reached a step with no
+    successor other than an End, or ran for more than the step limit.
+    """
+    instances: int = 0
+    unfinished: int = 0
+    cycle_times: List[float] = field(default_factory=list)
+    paths: Counter = field(default_factory=Counter)
+    ends: Counter = field(default_factory=Counter)
+    visits: Counter = field(default_factory=Counter)
+    busy_time: Counter = field(default_factory=Counter)
+    resource_load: Counter = field(default_factory=Counter)
+
+    def merge(self, other: 'SimulationReport'):
+        """Add the results of another batch to this report."""
+        self.instances += other.instances
+        self.unfinished += other.unfinished
+        self.cycle_times.extend(other.cycle_times)
+        self.paths.update(other.paths)
+        self.ends.update(other.ends)
+        self.visits.update(other.visits)
+        self.busy_time.update(other.busy_time)
+        self.resource_load.update(other.resource_load)
+
+    def percentile(self, percent: float) -> float:
+        """Return a cycle time percentile of the finished instances (nearest rank)."""
+        if not self.cycle_times:
+            return 0.0
+        times = sorted(self.cycle_times)
+        rank = max(1, math.ceil(percent / 100 * len(times)))
+        return times[rank - 1]
+
+    def path_frequencies(self, top: int = None) -> List[Tuple[tuple, float]]:
+        """Return the most common decision paths with the fraction of instances taking each."""
+        return [(path, count / self.instances) for path, count in self.paths.most_common(top)]
+
+    def bottlenecks(self, top: int = None) -> List[Tuple[str, float]]:
+        """Return steps by the total simulated time spent in them, busiest first."""
+        return self.busy_time.most_common(top)
+
+    def busiest_resources(self, top: int = None) -> List[Tuple[str, int, int]]:
+        """Return (resource_id, queries, updates) for the most used resources, busiest first."""
+        totals = Counter()
+        for (resource_id, _), count in self.resource_load.items():
+            totals[resource_id] += count
+        return [(resource_id, self.resource_load[resource_id, QUERY], self.resource_load[resource_id, UPDATE])
+                for resource_id, _ in totals.most_common(top)]
+
+
+def simulate_batch(model: SimulationModel, count: int, seed: int,
+                   max_steps: int = DEFAULT_MAX_STEPS) -> SimulationReport:
+    """Simulate count instances of a compiled model with one random seed."""
+    rng = random.Random(seed)
+    report = SimulationReport(instances=count)
+    steps = model.steps
+    for _ in range(count):
+        position = model.start
+        elapsed = 0.0
+        choices = []
+        for _ in range(max_steps):
+            kind, step_id, duration, operations, following = steps[position]
+            spent = sample_duration(rng, duration)
+            elapsed += spent
+            report.visits[step_id] += 1
+            report.busy_time[step_id] += spent
+            for operation in operations:
+                report.resource_load[operation] += 1
+            if kind == _END:
+                report.ends[step_id] += 1
+                report.cycle_times.append(elapsed)
+                report.paths[tuple(choices)] += 1
+                break
+            if kind == _DECISION:
+                probability, yes, no = following
+                answer = rng.random() < probability
+                choices.append((step_id, 'yes' if answer else 'no'))
+                following = yes if answer else no
+            if following < 0:
+                report.unfinished += 1
+                break
+            position = following
+        else:
+            report.unfinished += 1
+    return report
+
+
+def simulate(process: Process, instances: int, seed: int = None, workers: int = 1,
+             max_steps: int = DEFAULT_MAX_STEPS) -> SimulationReport:
+    """
+    Simulate instances of a process from its Start step and aggregate the results.
+
+    Instances run in batches of BATCH_SIZE, each seeded from seed, so a
+    given seed always gives the same report. With workers=1 the batches
+    run in this process; otherwise they are spread across a process pool
+    (workers=None uses one per CPU). An instance that visits more than
+    max_steps steps is abandoned as unfinished.
+    """
+    model = SimulationModel.from_process(process)
+    seeds = random.Random(seed)
+    batches = []
+    for first in range(0, instances, BATCH_SIZE):
+        batches.append((model, min(BATCH_SIZE, instances - first), seeds.getrandbits(64), max_steps))
+
+    report = SimulationReport()
+    if workers == 1 or len(batches) <= 1:
+        for batch in batches:
+            report.merge(simulate_batch(*batch))
+        return report
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(simulate_batch, *zip(*batches)):
+            report.merge(result)
+    return report
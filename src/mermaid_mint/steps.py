@@ -1,85 +1,109 @@
 """Process step classes for the mermaid-mint DSL."""
 
+import gc
+import sys
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Union, List
+from typing import Iterator, List, NamedTuple, Union
 
+# Steps and operations are slotted where supported (Python 3.10+), so large
+# processes don't pay for a __dict__ on every instance
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@contextmanager
+def _gc_paused():
+    """
+    Suspend the cyclic garbage collector while building a large object graph.
+
+    Building a process allocates many objects and no garbage, so collections
+    triggered part way through only rescan the growing graph.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+@dataclass(**_SLOTS)
 class Step:
     """Base class for all process steps."""
     step_id: str
     name: str
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class TerminalStep(Step):
     """Base class for steps with no successor."""
     pass
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class NonTerminalStep(Step):
     """Base class for steps with successor(s)."""
     successor: Step = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Start(NonTerminalStep):
     """Starting point of a process."""
     pass
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class End(TerminalStep):
     """End point of a process."""
     pass
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Resource(TerminalStep):
     """Base class for resources that can be updated or queried."""
     pass
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Database(Resource):
     """A database that can be updated or queried."""
     pass
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Document(Resource):
     """A document that can be updated or queried."""
     pass
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Operation(ABC):
     """Abstract base class for operations on resources."""
     target: Resource
     description: str
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Query(Operation):
     """Query operation on a resource."""
     pass
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Update(Operation):
     """Update operation on a resource."""
     pass
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Task(NonTerminalStep):
     """A task/activity in the process."""
     operations: List[Operation] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Decision(Step):
     """A decision point with yes/no branches."""
     test: Union[str, Query] = ""
@@ -87,6 +111,65 @@ class Decision(Step):
     no: Step = None
 
 
+@dataclass(**_SLOTS)
+class Collapsed(Step):
+    """Placeholder for a step left out of a focused view, linking to the steps it connected to."""
+    links: List[Step] = field(default_factory=list)
+    # step_id of the step it stands for in the full process
+    original_id: str = None
+
+
+# Change kinds, from Process.take_changes and diff (where they are also Mermaid class names)
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+# Edge kinds
+FLOW = 'flow'
+YES = 'yes'
+NO = 'no'
+QUERY = 'query'
+UPDATE = 'update'
+
+
+class Edge(NamedTuple):
+    """A connection from one step to another, identified by step IDs."""
+    source: str
+    target: str
+    kind: str
+
+
+def _operation_edge(step: Step, operation: Operation):
+    kind = QUERY if isinstance(operation, Query) else UPDATE
+    return Edge(step.step_id, operation.target.step_id, kind)
+
+
+def step_edges(step: Step) -> Iterator[Edge]:
+    """
+    Generate the outgoing edges of a step.
+
+    Edges come in a fixed order: successor, yes, no, then operation targets
+    (a Task's operations or a Decision's Query test). Unset references are skipped.
+    """
+    if isinstance(step, NonTerminalStep):
+        if step.successor is not None:
+            yield Edge(step.step_id, step.successor.step_id, FLOW)
+        if isinstance(step, Task):
+            for operation in step.operations:
+                if operation.target is not None:
+                    yield _operation_edge(step, operation)
+    elif isinstance(step, Decision):
+        if step.yes is not None:
+            yield Edge(step.step_id, step.yes.step_id, YES)
+        if step.no is not None:
+            yield Edge(step.step_id, step.no.step_id, NO)
+        if isinstance(step.test, Query) and step.test.target is not None:
+            yield _operation_edge(step, step.test)
+    elif isinstance(step, Collapsed):
+        for target in step.links:
+            yield Edge(step.step_id, target.step_id, FLOW)
+
+
 @dataclass
 class Process:
     """Complete process workflow."""
@@ -95,12 +178,19 @@ class Process:
     start: Step = None
     
     def __post_init__(self):
-        """Initialize the steps dictionary after dataclass init."""
+        """Initialize the steps dictionary and edge index after dataclass init."""
         self._steps = {}
+        # Optional annotations from the process file, by step ID then name
+        self.annotations = {}
+        # Outgoing and incoming edges by step ID, built on first use
+        self._outgoing = None
+        self._incoming = None
+        # Change kind by step ID since the last take_changes, once tracking starts
+        self._changed = None
     
     def add_step(self, step: Step):
         """Add a step to the process."""
-        self._steps[step.step_id] = step
+        self[step.step_id] = step
     
     def step_ids(self):
         """Return a list of all step IDs in the process."""
@@ -110,10 +200,119 @@ class Process:
         """Return the step with the given ID, or None if not found."""
         return self._steps.get(step_id)
     
+    def __contains__(self, step_id: str):
+        """Return True if the process has a step with the given ID."""
+        return step_id in self._steps
+
+    def __len__(self):
+        """Return the number of steps in the process."""
+        return len(self._steps)
+    
     def __getitem__(self, step_id: str):
         """Get a step by ID using indexing syntax."""
         return self._steps[step_id]
     
     def __setitem__(self, step_id: str, step: Step):
         """Set a step by ID using indexing syntax."""
-        self._steps[step_id] = step
\ No newline at end of file
+        if self._changed is not None:
+            self._record_change(step_id, CHANGED if step_id in self._steps else ADDED)
+        self._steps[step_id] = step
+        if self._outgoing is not None:
+            self._index_step(step_id, step)
+
+    def __delitem__(self, step_id: str):
+        """
+        Remove a step by ID.
+
+        Steps that refer to it keep their references until they are changed
+        and relinked, so their edges still point at the removed ID.
+        """
+        del self._steps[step_id]
+        if self._outgoing is not None:
+            for edge in self._outgoing.pop(step_id, ()):
+                self._incoming[edge.target].remove(edge)
+        if self._changed is not None:
+            self._record_change(step_id, REMOVED)
+
+    def relink(self, step_id: str):
+        """
+        Update the edge index after changing a step's references.
+
+        Call this after setting a step's successor, yes or no, or editing its
+        operations or test, once the edge index may already have been built.
+        It also marks the step as changed, so call it after renaming a step.
+        """
+        if self._outgoing is not None:
+            self._index_step(step_id, self._steps[step_id])
+        if self._changed is not None:
+            self._record_change(step_id, CHANGED)
+
+    def track_changes(self):
+        """Start recording which steps are added, replaced, removed or relinked, for take_changes."""
+        if self._changed is None:
+            self._changed = {}
+
+    def take_changes(self) -> dict:
+        """
+        Return {step_id: ADDED, CHANGED or REMOVED} since the last call or track_changes, and start over.
+
+        Added steps come in the order they were appended to the process, so
+        a step removed and added again is ADDED, at its new place at the end.
+        """
+        changed = self._changed or {}
+        self._changed = {}
+        return changed
+
+    def _record_change(self, step_id: str, kind: str):
+        if kind == CHANGED:
+            self._changed.setdefault(step_id, CHANGED)
+        else:
+            # Keep added steps in the order they were appended
+            self._changed.pop(step_id, None)
+            self._changed[step_id] = kind
+
+    def edges(self) -> Iterator[Edge]:
+        """Generate every edge in the process, grouped by source in step order."""
+        outgoing = self._edge_index()[0]
+        for step_id in self._steps:
+            yield from outgoing.get(step_id, ())
+
+    def out_edges(self, step_id: str) -> List[Edge]:
+        """Return the edges leaving a step."""
+        return self._edge_index()[0].get(step_id, [])
+
+    def in_edges(self, step_id: str) -> List[Edge]:
+        """Return the edges arriving at a step."""
+        return self._edge_index()[1].get(step_id, [])
+
+    def successors(self, step_id: str, kind: str = None) -> Iterator[Step]:
+        """Generate the steps a step connects to, optionally only by edges of one kind."""
+        for edge in self.out_edges(step_id):
+            if kind is None or edge.kind == kind:
+                yield self._steps[edge.target]
+
+    def predecessors(self, step_id: str, kind: str = None) -> Iterator[Step]:
+        """Generate the steps that connect to a step, optionally only by edges of one kind."""
+        for edge in self.in_edges(step_id):
+            if kind is None or edge.kind == kind:
+                yield self._steps[edge.source]
+
+    def _edge_index(self):
+        """Return the (outgoing, incoming) edge index, building it if needed."""
+        if self._outgoing is None:
+            self._outgoing = {}
+            self._incoming = {}
+            with _gc_paused():
+                for step_id, step in self._steps.items():
+                    self._index_step(step_id, step)
+        return self._outgoing, self._incoming
+
+    def _index_step(self, step_id: str, step: Step):
+        """Replace the indexed outgoing edges of one step."""
+        for edge in self._outgoing.pop(step_id, ()):
+            self._incoming[edge.target].remove(edge)
+        edges = list(step_edges(step))
+        if edges:
+            self._outgoing[step_id] = edges
+            for edge in edges:
+                self._incoming.setdefault(edge.target, []).append(edge)
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""Extraction of focused views of large processes."""
+
+from dataclasses import replace
+from typing import Callable, Iterable, Set
+
+from .steps import Process, Task, Decision, Collapsed, Edge, Query, Resource, QUERY, UPDATE
+from .validation import _reachable
+
+# Appended to the step_id of a step to name its Collapsed placeholder
+COLLAPSED_SUFFIX = '_collapsed'
+
+
+def neighbourhood(process: Process, step_id: str, hops: int = 1) -> Set[str]:
+    """Return the IDs of steps within hops edges of a step, following edges in either direction."""
+    _require(process, step_id)
+    selected = {step_id}
+    frontier = [step_id]
+    for _ in range(hops):
+        next_frontier = []
+        for current in frontier:
+            for edge in process.out_edges(current):
+                if edge.target not in selected and edge.target in process:
+                    selected.add(edge.target)
+                    next_frontier.append(edge.target)
+            for edge in process.in_edges(current):
+                if edge.source not in selected:
+                    selected.add(edge.source)
+                    next_frontier.append(edge.source)
+        frontier = next_frontier
+    return selected
+
+
+def between(process: Process, source_id: str, target_id: str) -> Set[str]:
+    """
+    Return the IDs of steps on any path from one step to another.
+
+    These are the steps reachable from the source that can also reach the
+    target. Raises ValueError if the target is not reachable.
+    """
+    _require(process, source_id)
+    _require(process, target_id)
+    forwards = _reachable(process, [source_id], process, forwards=True)
+    if target_id not in forwards:
+        raise ValueError(f"There is no path from {source_id} to {target_id}")
+    return forwards & _reachable(process, [target_id], process, forwards=False)
+
+
+def touching(process: Process, resource_id: str) -> Set[str]:
+    """Return the ID of a Database or Document and of every step that queries or updates it."""
+    _require(process, resource_id)
+    if not isinstance(process[resource_id], Resource):
+        raise ValueError(f"{resource_id} is not a Database or Document")
+    return {resource_id} | {edge.source for edge in process.in_edges(resource_id)
+                            if edge.kind in (QUERY, UPDATE)}
+
+
+def extract(process: Process, step_ids: Iterable[str], resource_users: bool = True,
+            in_order: bool = False, in_edges: Callable[[str], Iterable[Edge]] = None) -> Process:
+    """
+    Return a new Process holding copies of the selected steps.
+
+    Each step outside the selection that is connected to a selected step is
+    replaced by a Collapsed placeholder, so the cut edges stay visible. A
+    placeholder's step_id is the step's with COLLAPSED_SUFFIX, numbered if
+    the process already has a step of that name; its original_id names the
+    step it stands for. If
+    resource_users is False, steps outside the selection that only query or
+    update a selected resource are left out instead. The original process is
+    left unchanged. Steps are drawn in process order; pass in_order if
+    step_ids already are, so the whole process is not scanned to sort them.
+    in_edges(step_id) may replace process.in_edges, for example with an
+    index of control edges only when resource users are left out.
+    """
+    in_edges = in_edges or process.in_edges
+    if in_order:
+        selected = [step_id for step_id in dict.fromkeys(step_ids) if step_id in process]
+    else:
+        wanted = set(step_ids)
+        selected = [step_id for step_id in process.step_ids() if step_id in wanted]
+    focused = Process(process.process_id, process.name)
+    copies = {step_id: replace(process[step_id]) for step_id in selected}
+    placeholders = {}
+    placeholder_ids = set()
+
+    def placeholder(step):
+        collapsed = placeholders.get(step.step_id)
+        if collapsed is None:
+            placeholder_id = step.step_id + COLLAPSED_SUFFIX
+            number = 1
+            while placeholder_id in process or placeholder_id in placeholder_ids:
+                number += 1
+                placeholder_id = f"{step.step_id}{COLLAPSED_SUFFIX}_{number}"
+            placeholder_ids.add(placeholder_id)
+            collapsed = placeholders[step.step_id] = Collapsed(placeholder_id, step.name,
+                                                               original_id=step.step_id)
+        return collapsed
+
+    def mapped(step):
+        if step is None:
+            return None
+        return copies.get(step.step_id) or placeholder(step)
+
+    for step_id, copy in copies.items():
+        if hasattr(copy, 'successor'):
+            copy.successor = mapped(copy.successor)
+        if isinstance(copy, Task):
+            copy.operations = [replace(operation, target=mapped(operation.target))
+                               for operation in copy.operations]
+        if isinstance(copy, Decision):
+            copy.yes = mapped(copy.yes)
+            copy.no = mapped(copy.no)
+            if isinstance(copy.test, Query):
+                copy.test = replace(copy.test, target=mapped(copy.test.target))
+        focused.add_step(copy)
+
+    # Cut edges arriving at the selection come from placeholders, one link
+    # per pair of steps however many edges join them
+    linked = set()
+    for step_id in selected:
+        for edge in in_edges(step_id):
+            if edge.kind in (QUERY, UPDATE) and not resource_users:
+                continue
+            if edge.source not in copies and (edge.source, step_id) not in linked:
+                linked.add((edge.source, step_id))
+                placeholder(process[edge.source]).links.append(copies[step_id])
+
+    for step in placeholders.values():
+        focused.add_step(step)
+    focused.annotations = {step_id: process.annotations[step_id]
+                           for step_id in selected if step_id in process.annotations}
+    if process.start is not None and process.start.step_id in copies:
+        focused.start = copies[process.start.step_id]
+    return focused
+
+
+def _require(process: Process, step_id: str):
+    if step_id not in process:
+        raise KeyError(step_id)
+
@@ -0,0 +1,137 @@
+"""Structural validation of Process graphs."""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .steps import Process, End, Resource, FLOW, YES, NO, QUERY, UPDATE
+
+# Problem kinds
+UNRESOLVED_REFERENCE = 'unresolved-reference'
+DUPLICATE_STEP = 'duplicate-step'
+MISSING_START = 'missing-start'
+MISSING_END = 'missing-end'
+UNREACHABLE = 'unreachable'
+NO_PATH_TO_END = 'no-path-to-end'
+INVALID_TARGET = 'invalid-target'
+CYCLE = 'cycle'
+
+CONTROL_EDGES = (FLOW, YES, NO)
+OPERATION_EDGES = (QUERY, UPDATE)
+
+
+@dataclass
+class Problem:
+    """A single problem found in a process definition."""
+    kind: str
+    step_id: Optional[str]
+    message: str
+
+    def __str__(self):
+        if self.step_id is None:
+            return self.message
+        return f"{self.step_id}: {self.message}"
+
+
+class ValidationError(ValueError):
+    """Raised when a process definition has problems; carries all of them."""
+
+    def __init__(self, problems: List[Problem]):
+        self.problems = problems
+        super().__init__("\n".join(str(problem) for problem in problems))
+
+
+def validate(process: Process, check_cycles: bool = False) -> List[Problem]:
+    """
+    Check a Process and return every problem found, in O(steps + edges).
+
+    Reports references to steps that are not in the process, steps sharing a
+    step_id, a missing Start or End, steps unreachable from the start, steps
+    from which no End can be reached, and operations that target something
+    other than a Resource. Cycles are only reported if check_cycles is set,
+    since loops back to an earlier step are legitimate in many processes.
+    """
+    problems = []
+    steps = {step_id: process[step_id] for step_id in process.step_ids()}
+
+    seen = set()
+    for step_id, step in steps.items():
+        if step.step_id in seen or step.step_id != step_id:
+            problems.append(Problem(DUPLICATE_STEP, step.step_id,
+                                    "step_id is used by more than one step"))
+        seen.add(step.step_id)
+
+    for edge in process.edges():
+        target = steps.get(edge.target)
+        if target is None:
+            problems.append(Problem(UNRESOLVED_REFERENCE, edge.source,
+                                    f"{edge.kind} refers to unknown step {edge.target}"))
+        elif edge.kind in OPERATION_EDGES and not isinstance(target, Resource):
+            problems.append(Problem(INVALID_TARGET, edge.source,
+                                    f"{edge.kind} targets {edge.target}, which is not a Database or Document"))
+
+    ends = [step_id for step_id, step in steps.items() if isinstance(step, End)]
+    if not ends:
+        problems.append(Problem(MISSING_END, None, f"Process {process.process_id} has no End step"))
+
+    if process.start is None:
+        problems.append(Problem(MISSING_START, None, f"Process {process.process_id} has no Start step"))
+        return problems
+    if steps.get(process.start.step_id) is not process.start:
+        problems.append(Problem(UNRESOLVED_REFERENCE, process.start.step_id,
+                                "start step is not part of the process"))
+        return problems
+
+    reachable = _reachable(process, [process.start.step_id], steps, forwards=True)
+    for step_id in steps:
+        if step_id not in reachable:
+            problems.append(Problem(UNREACHABLE, step_id, "is not reachable from the start"))
+
+    finishing = _reachable(process, ends, steps, forwards=False, kinds=CONTROL_EDGES)
+    for step_id, step in steps.items():
+        if step_id in reachable and step_id not in finishing and not isinstance(step, Resource):
+            problems.append(Problem(NO_PATH_TO_END, step_id, "has no path to an End step"))
+
+    if check_cycles:
+        for source, target in _back_edges(process, process.start.step_id, steps):
+            problems.append(Problem(CYCLE, source, f"loops back to {target}"))
+    return problems
+
+
+def _reachable(process, roots, steps, forwards=True, kinds=None):
+    """Return the IDs of steps reachable from roots by a breadth-first search."""
+    visited = set(roots)
+    queue = deque(roots)
+    while queue:
+        step_id = queue.popleft()
+        edges = process.out_edges(step_id) if forwards else process.in_edges(step_id)
+        for edge in edges:
+            if kinds is not None and edge.kind not in kinds:
+                continue
+            neighbour = edge.target if forwards else edge.source
+            if neighbour not in visited and neighbour in steps:
+                visited.add(neighbour)
+                queue.append(neighbour)
+    return visited
+
+
+def _back_edges(process, root, steps):
+    """Generate (source, target) for control edges closing a cycle, by iterative depth-first search."""
+    on_path = {root}
+    done = set()
+    stack = [(root, iter(process.out_edges(root)))]
+    while stack:
+        step_id, edges = stack[-1]
+        for edge in edges:
+            if edge.kind not in CONTROL_EDGES or edge.target not in steps:
+                continue
+            if edge.target in on_path:
+                yield step_id, edge.target
+            elif edge.target not in done:
+                on_path.add(edge.target)
+                stack.append((edge.target, iter(process.out_edges(edge.target))))
+                break
+        else:
+            stack.pop()
+            on_path.discard(step_id)
+            done.add(step_id)
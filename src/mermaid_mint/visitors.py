@@ -1,93 +1,307 @@
 """Visitor classes for generating different output formats from Process objects."""
 
-from .steps import Process, Start, Task, Decision, End, Database, Document, Query
+import json
+from contextlib import ExitStack
+from typing import Dict, Iterable, Iterator, List, Tuple
+from xml.sax.saxutils import escape, quoteattr
 
+from .profiling import RENDER, CountingStream, active, count, phase
+from .steps import Process, Step, Start, Task, Decision, End, Database, Document, Collapsed, Edge, step_edges
+
+# Visitor classes by format name, filled in by register_visitor
+VISITORS = {}
+
+
+def register_visitor(visitor_class):
+    """Class decorator adding a Visitor subclass to the registry under its format_name."""
+    VISITORS[visitor_class.format_name] = visitor_class
+    return visitor_class
+
+
+def visitor_class(format_name: str) -> type:
+    """Return the visitor class registered for a format, raising ValueError for unknown formats."""
+    try:
+        return VISITORS[format_name]
+    except KeyError:
+        raise ValueError(f"Unknown output format: {format_name} "
+                         f"(choose from {', '.join(sorted(VISITORS))})") from None
+
+
+def get_visitor(format_name: str) -> 'Visitor':
+    """Return a new visitor for a registered format."""
+    return visitor_class(format_name)()
+
+
+class Visitor:
+    """
+    Base class for visitors that write a Process in one output format.
+
+    The walk over the process is shared: it visits every step, then every
+    edge, and subclasses only generate the lines for each part. Because
+    the walk is separate from the formatting, visit_many can write several
+    formats in a single pass over a process.
+    """
+
+    format_name = None
+    suffix = None
+
+    def begin(self, process: Process) -> Iterable[str]:
+        """Generate the lines before the first step."""
+        return ()
+
+    def visit_step(self, step: Step, index: int) -> Iterable[str]:
+        """Generate the lines for one step; index counts the steps visited so far."""
+        return ()
+
+    def visit_edge(self, edge: Edge, index: int) -> Iterable[str]:
+        """Generate the lines for one edge; index counts the edges visited so far."""
+        return ()
+
+    def end(self, process: Process) -> Iterable[str]:
+        """Generate the lines after the last edge."""
+        return ()
 
-class MermaidVisitor:
-    """Visitor that generates Mermaid flowchart syntax from Process objects."""
-    
     def visit_process(self, process: Process) -> str:
-        """Generate Mermaid diagram from a Process."""
-        lines = [
-            '%%{init: {"flowchart": {"defaultRenderer": "elk"}}}%%',
-            "flowchart TD"
-        ]
-        
-        # Add all step definitions
-        for step_id in process.step_ids():
-            step = process[step_id]
-            lines.append(self._format_step(step))
-        
-        # Add all connections
-        for step_id in process.step_ids():
-            step = process[step_id]
-            lines.extend(self._get_connections(step))
-        
-        return "\n".join(lines)
-    
-    def _format_step(self, step):
-        """Format a step for Mermaid output."""
-        step_formatters = {
+        """Generate the whole output for a Process as a string."""
+        with phase(RENDER):
+            return "\n".join(self.iter_lines(process))
+
+    def visit_process_to(self, process: Process, stream):
+        """
+        Write the output for a Process to a text stream.
+
+        Lines are written as they are generated, so the whole output is never
+        held in memory. The output is identical to visit_process.
+        """
+        visit_many(process, [(self, stream)])
+
+    def iter_lines(self, process: Process) -> Iterator[str]:
+        """Generate the lines of the output for a Process, one at a time."""
+        for _, lines in _walk(process, [self]):
+            yield from lines
+
+
+def _walk(process: Process, visitors: List[Visitor]) -> Iterator[Tuple[int, Iterable[str]]]:
+    """Walk a process once, yielding (visitor number, lines) for each part each visitor draws."""
+    for number, visitor in enumerate(visitors):
+        yield number, visitor.begin(process)
+    steps = [process[step_id] for step_id in process.step_ids()]
+    for index, step in enumerate(steps):
+        for number, visitor in enumerate(visitors):
+            yield number, visitor.visit_step(step, index)
+    index = 0
+    for step in steps:
+        for edge in step_edges(step):
+            for number, visitor in enumerate(visitors):
+                yield number, visitor.visit_edge(edge, index)
+            index += 1
+    count('edges', index)
+    for number, visitor in enumerate(visitors):
+        yield number, visitor.end(process)
+
+
+def visit_many(process: Process, outputs: Iterable[Tuple[Visitor, object]]):
+    """
+    Write a process in several formats with a single walk over it.
+
+    outputs pairs each visitor with the text stream it writes to. Each
+    stream receives exactly what the visitor's visit_process_to would write.
+    """
+    outputs = list(outputs)
+    visitors = [visitor for visitor, _ in outputs]
+    streams = [stream for _, stream in outputs]
+    profile = active()
+    if profile is not None:
+        streams = [CountingStream(stream, profile) for stream in streams]
+    started = [False] * len(outputs)
+    with phase(RENDER):
+        for number, lines in _walk(process, visitors):
+            stream = streams[number]
+            for line in lines:
+                if started[number]:
+                    stream.write("\n")
+                stream.write(line)
+                started[number] = True
+
+
+def visit_to_files(process: Process, outputs: Dict[str, Visitor], opener=None):
+    """Write a process to several files, {path: visitor}, with a single walk over it."""
+    opener = opener or (lambda path: open(path, 'w'))
+    with ExitStack() as stack:
+        visit_many(process, [(visitor, stack.enter_context(opener(path)))
+                             for path, visitor in outputs.items()])
+
+
+@register_visitor
+class MermaidVisitor(Visitor):
+    """Visitor that generates Mermaid flowchart syntax from Process objects."""
+
+    format_name = 'mermaid'
+    suffix = '.mmd'
+
+    HEADER = (
+        '%%{init: {"flowchart": {"defaultRenderer": "elk"}}}%%',
+        "flowchart TD",
+    )
+
+    def __init__(self):
+        self._step_formatters = {
             Start: self._format_start_step,
             Task: self._format_task_step,
             Decision: self._format_decision_step,
             End: self._format_end_step,
             Database: self._format_database_step,
-            Document: self._format_document_step
+            Document: self._format_document_step,
+            Collapsed: self._format_collapsed_step
         }
-        
-        step_type = type(step)
-        if step_type in step_formatters:
-            return step_formatters[step_type](step)
+
+    def begin(self, process: Process):
+        return self.HEADER
+
+    def visit_step(self, step, index):
+        return (self._format_step(step),)
+
+    def visit_edge(self, edge, index):
+        return (f"    {edge.source} --> {edge.target}",)
+
+    def _format_step(self, step):
+        """Format a step for Mermaid output."""
+        formatter = self._step_formatters.get(type(step))
+        if formatter is not None:
+            return formatter(step)
         return ""
-    
+
     def _format_start_step(self, step):
         """Format a Start step for Mermaid."""
         return f"    {step.step_id}[{step.name}]"
-    
+
     def _format_task_step(self, step):
         """Format a Task step for Mermaid."""
         return f"    {step.step_id}[{step.name}]"
-    
+
     def _format_decision_step(self, step):
         """Format a Decision step for Mermaid."""
         return f"    {step.step_id}{{{step.name}}}"
-    
+
     def _format_end_step(self, step):
         """Format an End step for Mermaid."""
         return f"    {step.step_id}[{step.name}]"
-    
+
     def _format_database_step(self, step):
         """Format a Database step for Mermaid."""
         return f"    {step.step_id}[({step.name})]"
-    
+
     def _format_document_step(self, step):
         """Format a Document step for Mermaid."""
         return f"    {step.step_id}[/{step.name}/]"
-    
-    def _get_connections(self, step):
-        """Get all connections for a step."""
-        connections = []
-        
-        # Regular successor connections
-        if hasattr(step, 'successor') and step.successor:
-            connections.append(f"    {step.step_id} --> {step.successor.step_id}")
-        
-        # Decision yes/no branches
-        if hasattr(step, 'yes') and step.yes:
-            connections.append(f"    {step.step_id} --> {step.yes.step_id}")
-        
-        if hasattr(step, 'no') and step.no:
-            connections.append(f"    {step.step_id} --> {step.no.step_id}")
-        
-        # Task operations - connections to resources
-        if hasattr(step, 'operations') and step.operations:
-            for operation in step.operations:
-                if operation.target:
-                    connections.append(f"    {step.step_id} --> {operation.target.step_id}")
-        
-        # Decision Query test - connection to resource
-        if hasattr(step, 'test') and isinstance(step.test, Query) and step.test.target:
-            connections.append(f"    {step.step_id} --> {step.test.target.step_id}")
-        
-        return connections
\ No newline at end of file
+
+    def _format_collapsed_step(self, step):
+        """Format a placeholder for a step left out of a focused view."""
+        return f"    {step.step_id}([{step.name} ...])"
+
+
+def _dot_quote(value) -> str:
+    """Return value as a DOT quoted string, keeping non-ASCII text as it is."""
+    escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return f'"{escaped}"'
+
+
+@register_visitor
+class DotVisitor(Visitor):
+    """Visitor that generates a Graphviz DOT digraph, for offline layout with dot or neato."""
+
+    format_name = 'dot'
+    suffix = '.dot'
+
+    SHAPES = {
+        Start: 'shape=oval',
+        Task: 'shape=box',
+        Decision: 'shape=diamond',
+        End: 'shape=oval, peripheries=2',
+        Database: 'shape=cylinder',
+        Document: 'shape=note',
+        Collapsed: 'shape=box, style=dashed',
+    }
+    EDGE_ATTRIBUTES = {
+        'yes': ' [label="yes"]',
+        'no': ' [label="no"]',
+        'query': ' [label="query", style=dashed]',
+        'update': ' [label="update", style=dashed]',
+    }
+
+    def begin(self, process):
+        return (f"digraph {_dot_quote(process.process_id)} {{",
+                f"    label={_dot_quote(process.name)};")
+
+    def visit_step(self, step, index):
+        shape = self.SHAPES.get(type(step), 'shape=box')
+        return (f"    {_dot_quote(step.step_id)} [label={_dot_quote(step.name)}, {shape}];",)
+
+    def visit_edge(self, edge, index):
+        attributes = self.EDGE_ATTRIBUTES.get(edge.kind, '')
+        return (f"    {_dot_quote(edge.source)} -> {_dot_quote(edge.target)}{attributes};",)
+
+    def end(self, process):
+        return ("}",)
+
+
+@register_visitor
+class JsonGraphVisitor(Visitor):
+    """
+    Visitor that generates a JSON node-link graph.
+
+    The layout matches networkx's node_link_data, with one node or link
+    per line: nodes carry id, type and name, and links carry source,
+    target and kind.
+    """
+
+    format_name = 'json'
+    suffix = '.graph.json'
+
+    def begin(self, process):
+        self._linked = False
+        graph = json.dumps({'id': process.process_id, 'name': process.name})
+        return ('{"directed": true, "multigraph": true, "graph": ' + graph + ', "nodes": [',)
+
+    def visit_step(self, step, index):
+        node = json.dumps({'id': step.step_id, 'type': type(step).__name__, 'name': step.name})
+        return (node if index == 0 else ',' + node,)
+
+    def visit_edge(self, edge, index):
+        link = json.dumps({'source': edge.source, 'target': edge.target, 'kind': edge.kind})
+        self._linked = True
+        return (('], "links": [' if index == 0 else ',') + link,)
+
+    def end(self, process):
+        # The links list is opened by the first edge
+        return (']}',) if self._linked else ('], "links": []}',)
+
+
+@register_visitor
+class GraphMLVisitor(Visitor):
+    """Visitor that generates GraphML, for tools such as yEd, Gephi and Cytoscape."""
+
+    format_name = 'graphml'
+    suffix = '.graphml'
+
+    def begin(self, process):
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">',
+            '  <key id="type" for="node" attr.name="type" attr.type="string"/>',
+            '  <key id="name" for="node" attr.name="name" attr.type="string"/>',
+            '  <key id="kind" for="edge" attr.name="kind" attr.type="string"/>',
+            f'  <graph id={quoteattr(str(process.process_id))} edgedefault="directed">',
+        )
+
+    def visit_step(self, step, index):
+        return (f'    <node id={quoteattr(str(step.step_id))}>'
+                f'<data key="type">{type(step).__name__}</data>'
+                f'<data key="name">{escape(str(step.name))}</data></node>',)
+
+    def visit_edge(self, edge, index):
+        return (f'    <edge id="e{index}" source={quoteattr(str(edge.source))} target={quoteattr(str(edge.target))}>'
+                f'<data key="kind">{edge.kind}</data></edge>',)
+
+    def end(self, process):
+        return ('  </graph>', '</graphml>')
@@ -0,0 +1,109 @@
+"""Watch process files and reconvert them as they change."""
+
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from .batch import ConversionResult, convert_file, plan_conversions
+from .manifest import manifest_dependencies
+
+
+def _is_newer(path: str, output: str) -> bool:
+    try:
+        return os.stat(path).st_mtime_ns > os.stat(output).st_mtime_ns
+    except FileNotFoundError:
+        return True
+
+
+class Watcher:
+    """
+    Polls a set of files, directories and glob patterns for changed process files.
+
+    A file is reconverted once it has stopped changing for the debounce
+    period, so a burst of saves produces one conversion. Conversions run in
+    this process with a warm parser and visitor, and outputs are replaced
+    atomically. When a fragment or library of a manifest changes, the
+    manifest is reconverted; only the changed fragment is reloaded.
+    """
+
+    def __init__(self, paths: Iterable[str], output_dir: str = None,
+                 debounce: float = 0.2, clock: Callable[[], float] = time.monotonic):
+        self.paths = list(paths)
+        self.output_dir = output_dir
+        self.debounce = debounce
+        self.clock = clock
+        self._signatures = {}
+        self._pending = {}
+        # Absolute path of each fragment -> manifests that include it
+        self._dependents = {}
+
+    def scan(self) -> Dict[str, Tuple[str, tuple]]:
+        """Return {source: (output, signature)} for every watched file that exists now."""
+        found = {}
+        for source, output in plan_conversions(self.paths, self.output_dir):
+            try:
+                stat = os.stat(source)
+            except FileNotFoundError:
+                continue
+            found[source] = (output, (stat.st_mtime_ns, stat.st_size))
+        return found
+
+    def start(self) -> List[ConversionResult]:
+        """Record the current files and convert those whose output is missing or older."""
+        results = []
+        for source, (output, signature) in self.scan().items():
+            self._signatures[source] = signature
+            try:
+                dependencies = manifest_dependencies(source)
+            except Exception:
+                # Reported when the file is converted
+                dependencies = []
+            inputs = [source] + dependencies
+            if not os.path.exists(output) or any(_is_newer(path, output) for path in inputs):
+                results.append(self._convert(source, output))
+            else:
+                self._add_dependents(source, dependencies)
+        return results
+
+    def poll(self) -> List[ConversionResult]:
+        """Check once for changes and convert files that have settled."""
+        now = self.clock()
+        found = self.scan()
+        for source, (output, signature) in found.items():
+            if self._signatures.get(source) != signature:
+                self._signatures[source] = signature
+                self._pending[source] = (output, now)
+                for manifest in self._dependents.get(os.path.abspath(source), ()):
+                    if manifest in found:
+                        self._pending[manifest] = (found[manifest][0], now)
+        for source in set(self._signatures) - set(found):
+            del self._signatures[source]
+            self._pending.pop(source, None)
+
+        results = []
+        for source, (output, changed_at) in list(self._pending.items()):
+            if now - changed_at >= self.debounce:
+                del self._pending[source]
+                results.append(self._convert(source, output))
+        return results
+
+    def _convert(self, source: str, output: str) -> ConversionResult:
+        """Convert one file and remember which fragments it depends on."""
+        result = convert_file(source, output)
+        self._add_dependents(source, result.dependencies)
+        return result
+
+    def _add_dependents(self, manifest: str, dependencies: Iterable[str]):
+        for dependency in dependencies:
+            self._dependents.setdefault(os.path.abspath(dependency), set()).add(manifest)
+
+    def run(self, interval: float = 0.5, report: Callable[[ConversionResult], None] = print):
+        """Poll forever, passing each conversion result to report."""
+        for result in self.start():
+            if not result.skipped:
+                report(result)
+        while True:
+            time.sleep(interval)
+            for result in self.poll():
+                if not result.skipped:
+                    report(result)
@@ -0,0 +1,127 @@
+"""Tests for the reachability, path and dominance analytics."""
+
+from itertools import islice
+
+import pytest
+from benchmarks.synthetic import chain_process
+from mermaid_mint.analytics import (bfs, dfs, distances, dominated_by, dominators, gating_decisions,
+                                    paths, postorder, shortest_path)
+from mermaid_mint.parser import Parser
+from mermaid_mint.steps import Decision, End, Process, Start, Task
+from tests.helpers.sample_data import PROCESS_WITH_RESOURCES
+
+SUCCESS = ("start", "save_order", "check_inventory", "process_payment", "end_success")
+BACKORDER = ("start", "save_order", "check_inventory", "backorder", "end_backorder")
+
+
+@pytest.fixture
+def orders():
+    return Parser().parse_string(PROCESS_WITH_RESOURCES)
+
+
+def ladder(rungs: int) -> Process:
+    """A chain of decisions whose branches merge again: 2 ** rungs paths from start to end."""
+    process = Process("ladder", "Ladder")
+    end = End("end", "End")
+    process["end"] = end
+    following = end
+    for rung in reversed(range(rungs)):
+        merge = Task(f"merge_{rung}", "Merge", following)
+        decision = Decision(f"d_{rung}", "Choose?", "", Task(f"left_{rung}", "Left", merge),
+                            Task(f"right_{rung}", "Right", merge))
+        for step in (merge, decision, decision.yes, decision.no):
+            process[step.step_id] = step
+        following = decision
+    process.start = process["start"] = Start("start", "Start", following)
+    return process
+
+
+def test_traversals_follow_control_edges_only(orders):
+    """Test breadth-first, depth-first and postorder walks from the Start."""
+    assert list(bfs(orders)) == ["start", "save_order", "check_inventory", "process_payment", "backorder",
+                                 "end_success", "end_backorder"]
+    assert list(dfs(orders)) == list(SUCCESS) + ["backorder", "end_backorder"]
+    assert postorder(orders)[:2] == ["end_success", "process_payment"]
+    assert distances(orders, "check_inventory") == {"check_inventory": 0, "process_payment": 1,
+                                                    "backorder": 1, "end_success": 2, "end_backorder": 2}
+    assert "orders_db" in bfs(orders, "save_order", kinds=("flow", "update"))
+
+
+def test_shortest_path_to_the_nearest_end_or_a_target(orders):
+    """Test unweighted and weighted shortest paths."""
+    assert shortest_path(orders) == SUCCESS
+    assert shortest_path(orders, "backorder") == ("backorder", "end_backorder")
+    assert shortest_path(orders, target="end_backorder") == BACKORDER
+    assert shortest_path(orders, "end_success", "start") is None
+
+    expensive_yes = shortest_path(orders, weight=lambda edge: 10 if edge.kind == "yes" else 1)
+    assert expensive_yes == BACKORDER
+    with pytest.raises(KeyError):
+        shortest_path(orders, target="nowhere")
+
+
+def test_paths_are_lazy_and_bounded(orders):
+    """Test enumeration of every path, with limits on count and length."""
+    assert list(paths(orders)) == [SUCCESS, BACKORDER]
+    assert list(paths(orders, max_paths=1)) == [SUCCESS]
+    assert list(paths(orders, target="end_backorder")) == [BACKORDER]
+    assert list(paths(orders, max_length=4)) == []
+    assert list(paths(orders, max_length=5)) == [SUCCESS, BACKORDER]
+
+    huge = ladder(60)
+    first = list(islice(paths(huge), 3))
+    assert len(first) == 3 and len(set(first)) == 3
+    assert all(path[0] == "start" and path[-1] == "end" and len(path) == 2 + 3 * 60 for path in first)
+    assert sum(1 for _ in paths(ladder(8))) == 2 ** 8
+
+
+def test_paths_go_round_loops_at_most_once(orders):
+    """Test that a loop back to an earlier step does not repeat steps on a path."""
+    orders["backorder"].successor = orders["save_order"]
+    orders.relink("backorder")
+
+    assert list(paths(orders)) == [SUCCESS]
+    assert list(paths(orders, "backorder")) == [("backorder", "save_order", "check_inventory",
+                                                 "process_payment", "end_success")]
+
+
+def test_dominators(orders):
+    """Test immediate dominators and dominator chains, including across a merge."""
+    idom = dominators(orders)
+
+    assert idom["start"] is None
+    assert idom["check_inventory"] == "save_order"
+    assert idom["end_success"] == "process_payment"
+    assert dominated_by(idom, "end_backorder") == ["backorder", "check_inventory", "save_order", "start"]
+    assert "orders_db" not in idom
+
+    merged = dominators(ladder(3))
+    assert merged["merge_0"] == "d_0"
+    assert merged["d_1"] == "merge_0"
+
+
+def test_gating_decisions(orders):
+    """Test which decisions, and which answers, a step depends on."""
+    assert gating_decisions(orders, "process_payment") == [("check_inventory", "yes")]
+    assert gating_decisions(orders, "end_backorder") == [("check_inventory", "no")]
+    assert gating_decisions(orders, "save_order") == []
+    # Resources are not on control paths
+    assert gating_decisions(orders, "orders_db") == []
+
+    rungs = ladder(3)
+    idom = dominators(rungs)
+    assert gating_decisions(rungs, "right_2", idom=idom) == [("d_2", "no")]
+    # Both answers lead past the merge, so no decision gates it
+    assert gating_decisions(rungs, "merge_2", idom=idom) == []
+
+
+def test_deep_processes_stay_within_the_recursion_limit():
+    """Test every algorithm on a chain far deeper than the recursion limit."""
+    process = Parser().parse_data(chain_process(10000))
+
+    assert sum(1 for _ in dfs(process)) == 10002
+    assert len(postorder(process)) == 10002
+    assert len(shortest_path(process)) == 10002
+    assert len(next(paths(process))) == 10002
+    assert dominators(process)["end"] == "task_9999"
+    assert gating_decisions(process, "end") == []
@@ -0,0 +1,95 @@
+"""Tests for batch conversion of many process files."""
+
+import pytest
+from pathlib import Path
+from mermaid_mint.batch import BatchSummary, ConversionResult, convert_all, convert_file, plan_conversions
+from tests.helpers.sample_data import PROCESS, PROCESS_WITH_RESOURCES
+
+
+@pytest.fixture
+def process_tree(tmp_path):
+    """A directory of process files, one of them broken."""
+    (tmp_path / "teams" / "sales").mkdir(parents=True)
+    (tmp_path / "registration.yaml").write_text(PROCESS)
+    (tmp_path / "teams" / "sales" / "orders.yml").write_text(PROCESS_WITH_RESOURCES)
+    (tmp_path / "teams" / "broken.yaml").write_text("process: {}\n")
+    (tmp_path / "teams" / "notes.txt").write_text("not a process")
+    return tmp_path
+
+
+def test_plan_conversions_searches_directories(process_tree):
+    """Test that directories are searched recursively for YAML files."""
+    jobs = plan_conversions([str(process_tree)])
+
+    sources = [Path(source) for source, _ in jobs]
+    assert {source.name for source in sources} == {"registration.yaml", "orders.yml", "broken.yaml"}
+    for source, output in jobs:
+        assert output == str(Path(source).with_suffix(".mmd"))
+
+
+def test_plan_conversions_mirrors_directories_into_output_dir(process_tree, tmp_path):
+    """Test that outputs keep their relative path under the output directory."""
+    jobs = dict(plan_conversions([str(process_tree / "teams")], str(tmp_path / "out")))
+
+    source = str(process_tree / "teams" / "sales" / "orders.yml")
+    assert jobs[source] == str(tmp_path / "out" / "sales" / "orders.mmd")
+
+
+def test_plan_conversions_expands_globs(process_tree):
+    """Test that glob patterns are expanded and duplicates removed."""
+    jobs = plan_conversions([str(process_tree / "**" / "*.yml"), str(process_tree / "teams")])
+
+    sources = [Path(source).name for source, _ in jobs]
+    assert sorted(sources) == ["broken.yaml", "orders.yml"]
+
+
+def test_convert_file_writes_diagram(process_tree):
+    """Test that a successful conversion writes the Mermaid diagram."""
+    source = process_tree / "registration.yaml"
+    output = process_tree / "out" / "registration.mmd"
+
+    result = convert_file(str(source), str(output))
+
+    assert result.ok
+    assert "start --> validate_email" in output.read_text()
+
+
+def test_convert_file_reports_errors(process_tree):
+    """Test that a bad file is reported rather than raising."""
+    result = convert_file(str(process_tree / "teams" / "broken.yaml"), str(process_tree / "broken.mmd"))
+
+    assert not result.ok
+    assert "KeyError" in result.error
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_convert_all_continues_after_failure(process_tree, workers):
+    """Test that one bad file does not stop the rest of the batch."""
+    jobs = plan_conversions([str(process_tree)])
+
+    results = list(convert_all(jobs, workers=workers))
+
+    assert len(results) == 3
+    assert sorted(result.ok for result in results) == [False, True, True]
+
+
+def test_batch_summary_counts_results():
+    """Test that the summary counts successes, failures and throughput."""
+    summary = BatchSummary()
+    summary.add(ConversionResult("a.yaml", "a.mmd"))
+    summary.add(ConversionResult("b.yaml", "b.mmd", error="KeyError: 'steps'"))
+    summary.seconds = 0.5
+
+    assert summary.succeeded == 1
+    assert summary.failed == 1
+    assert summary.files_per_second == 4.0
+
+
+def test_plan_conversions_skips_generated_outputs(tmp_path):
+    """Test that JSON graphs written by a previous run are not taken for process files."""
+    (tmp_path / "registration.yaml").write_text(PROCESS)
+    (tmp_path / "registration.graph.json").write_text("{}")
+
+    assert plan_conversions([str(tmp_path)]) == [
+        (str(tmp_path / "registration.yaml"), str(tmp_path / "registration.mmd"))]
+    assert plan_conversions([str(tmp_path / "*.json")]) == []
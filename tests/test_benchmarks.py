@@ -0,0 +1,38 @@
+"""Tests for the synthetic process generators and regression check used by the benchmarks."""
+
+import pytest
+from benchmarks.run import find_regressions, measure
+from benchmarks.synthetic import GENERATORS
+from mermaid_mint.parser import Parser
+from mermaid_mint.validation import validate
+
+
+@pytest.mark.parametrize("generator", sorted(GENERATORS))
+@pytest.mark.parametrize("size", [1, 10, 100])
+def test_generators_make_valid_processes(generator, size):
+    """Test that every generator produces a valid process of roughly the requested size."""
+    process = Parser().parse_data(GENERATORS[generator](size))
+
+    assert validate(process, check_cycles=True) == []
+    assert size <= len(process) <= 2 * size + 20
+
+
+def test_measure_reports_every_phase():
+    """Test that a measurement times each phase and records peak memory."""
+    result = measure("chain", 100)
+
+    assert result["steps"] == 112
+    assert all(result[phase] > 0 for phase in ("parse", "connect", "render"))
+    assert result["peak_bytes"] > 0
+
+
+def test_find_regressions():
+    """Test that only slowdowns beyond the tolerance and noise floor are reported."""
+    baseline = {"chain/1000/json": {"parse": 0.1, "connect": 0.1, "render": 0.001, "peak_bytes": 1000}}
+    results = {"chain/1000/json": {"parse": 0.14, "connect": 0.2, "render": 0.004, "peak_bytes": 1200}}
+
+    regressions = find_regressions(results, baseline, tolerance=0.5, memory_tolerance=0.1)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("chain/1000/json connect")
+    assert regressions[1].startswith("chain/1000/json peak memory")
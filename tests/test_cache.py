@@ -0,0 +1,89 @@
+"""Tests for the on-disk conversion cache."""
+
+import os
+import pytest
+from mermaid_mint.batch import convert_all
+from mermaid_mint.cache import ConversionCache, cache_key
+from tests.helpers.sample_data import PROCESS
+
+
+def test_cache_key_depends_on_content_and_format():
+    """Test that the key changes with the input bytes and the output format."""
+    assert cache_key(b"a") == cache_key(b"a")
+    assert cache_key(b"a") != cache_key(b"b")
+    assert cache_key(b"a", "mermaid") != cache_key(b"a", "dot")
+
+
+def test_cache_get_and_put(tmp_path):
+    """Test that stored outputs are returned and hits and misses are counted."""
+    cache = ConversionCache(tmp_path)
+    key = cache_key(b"process")
+
+    assert cache.get(key) is None
+    cache.put(key, "flowchart TD")
+
+    assert cache.get(key) == "flowchart TD"
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Test that eviction removes the oldest entries until under the size limit."""
+    cache = ConversionCache(tmp_path, max_bytes=25)
+    for index, key in enumerate(["old", "middle", "new"]):
+        cache.put(cache_key(key.encode()), "x" * 10)
+        os.utime(cache._entry_path(cache_key(key.encode())), (index, index))
+
+    assert cache.evict() == 1
+
+    assert cache.get(cache_key(b"old")) is None
+    assert cache.get(cache_key(b"middle")) == "x" * 10
+    assert cache.size() == 20
+
+
+def test_cache_clear(tmp_path):
+    """Test that clearing removes every entry."""
+    cache = ConversionCache(tmp_path / "cache")
+    cache.put(cache_key(b"process"), "flowchart TD")
+
+    cache.clear()
+
+    assert cache.get(cache_key(b"process")) is None
+    assert cache.size() == 0
+
+
+def test_clear_and_evict_leave_other_files_alone(tmp_path):
+    """Test that only the cache's own entries are removed from a shared directory."""
+    (tmp_path / "notes.txt").write_text("keep me")
+    (tmp_path / "ab").mkdir()
+    (tmp_path / "ab" / "report.txt").write_text("keep me too")
+    cache = ConversionCache(tmp_path, max_bytes=0)
+    cache.put(cache_key(b"process"), "flowchart TD")
+    foreign = cache._entry_path(cache_key(b"process")).parent / "readme.txt"
+    foreign.write_text("not an entry")
+
+    assert cache.evict() == 1
+    cache.put(cache_key(b"process"), "flowchart TD")
+    cache.clear()
+
+    assert cache.size() == 0
+    assert (tmp_path / "notes.txt").read_text() == "keep me"
+    assert (tmp_path / "ab" / "report.txt").read_text() == "keep me too"
+    assert foreign.read_text() == "not an entry"
+
+
+def test_convert_all_skips_parsing_on_hit(tmp_path):
+    """Test that an unchanged file is served from the cache."""
+    source = tmp_path / "registration.yaml"
+    source.write_text(PROCESS)
+    jobs = [(str(source), str(tmp_path / "registration.mmd"))]
+    cache = ConversionCache(tmp_path / "cache")
+
+    first = list(convert_all(jobs, workers=1, cache=cache))
+    cache.put(cache_key(source.read_bytes()), "cached diagram")
+    second = list(convert_all(jobs, workers=1, cache=cache))
+
+    assert not first[0].cached
+    assert second[0].cached
+    assert (tmp_path / "registration.mmd").read_text() == "cached diagram"
+    assert (cache.hits, cache.misses) == (1, 1)
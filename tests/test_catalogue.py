@@ -0,0 +1,94 @@
+"""Tests for catalogue loading with shared strings and resources."""
+
+from mermaid_mint.catalogue import Catalogue, memory_report
+from mermaid_mint.cli import main
+from mermaid_mint.parser import Parser
+from mermaid_mint.validation import validate
+from mermaid_mint.visitors import MermaidVisitor
+from tests.helpers.sample_data import PROCESS, PROCESS_WITH_RESOURCES
+
+
+def write_catalogue(directory, copies=3):
+    """Write copies of the order process under different IDs, and return their paths."""
+    paths = []
+    for number in range(copies):
+        path = directory / f"orders_{number}.yaml"
+        path.write_text(PROCESS_WITH_RESOURCES.replace('"order_processing"', f'"orders_{number}"'))
+        paths.append(str(path))
+    return paths
+
+
+def test_resources_are_shared_and_operations_retargeted(tmp_path):
+    """Test that equal resources become one object used by every process's operations."""
+    first, second, third = write_catalogue(tmp_path)
+    catalogue = Catalogue().load([str(tmp_path)])
+    processes = [catalogue.processes[path] for path in (first, second, third)]
+
+    orders_db = processes[0]["orders_db"]
+    assert all(process["orders_db"] is orders_db for process in processes)
+    assert all(process["backorder"].operations[0].target is orders_db for process in processes)
+    assert all(process["check_inventory"].test.target is processes[0]["inventory_db"] for process in processes)
+    assert (catalogue.resources_seen, catalogue.unique_resources) == (15, 5)
+    assert catalogue.conflicts == set()
+
+
+def test_strings_are_interned_across_processes(tmp_path):
+    """Test that equal names, IDs and descriptions are one string object, keys included."""
+    catalogue = Catalogue().load(write_catalogue(tmp_path))
+    first, second, _ = catalogue.processes.values()
+
+    assert first["save_order"].name is second["save_order"].name
+    assert first["save_order"].operations[0].description is second["save_order"].operations[0].description
+    assert next(iter(first.step_ids())) is next(iter(second.step_ids())) is first["start"].step_id
+    assert catalogue.unique_strings < catalogue.strings_seen
+
+
+def test_shared_processes_draw_and_validate_as_before(tmp_path):
+    """Test that sharing changes nothing visible about a process."""
+    catalogue = Catalogue().load(write_catalogue(tmp_path))
+    expected = MermaidVisitor().visit_process(Parser().parse_string(PROCESS_WITH_RESOURCES))
+
+    for process in catalogue.processes.values():
+        assert validate(process) == []
+        assert MermaidVisitor().visit_process(process).replace(process.process_id, "") == \
+            expected.replace("order_processing", "")
+        assert process.start is process["start"]
+
+
+def test_differently_defined_resources_are_kept_apart(tmp_path):
+    """Test that a resource ID with another name is not merged, and is reported."""
+    write_catalogue(tmp_path, copies=1)
+    (tmp_path / "renamed.yaml").write_text(
+        PROCESS_WITH_RESOURCES.replace('"Orders Database"', '"Order Store"'))
+    (tmp_path / "plain.yaml").write_text(PROCESS)
+    (tmp_path / "broken.yaml").write_text("process: {}\n")
+
+    catalogue = Catalogue().load([str(tmp_path)])
+
+    assert catalogue.conflicts == {"orders_db"}
+    names = {process["orders_db"].name for process in catalogue.processes.values() if "orders_db" in process}
+    assert names == {"Orders Database", "Order Store"}
+    assert [source.endswith("broken.yaml") for source, _ in catalogue.failures] == [True]
+
+
+def test_memory_report_shows_savings(tmp_path):
+    """Test that loading as a catalogue keeps less memory than loading separately."""
+    write_catalogue(tmp_path, copies=20)
+
+    report = memory_report([str(tmp_path)])
+
+    assert report["processes"] == report["files"] == 20
+    assert 0 < report["catalogue_bytes"] < report["separate_bytes"]
+    assert report["saved_bytes"] == report["separate_bytes"] - report["catalogue_bytes"]
+
+
+def test_catalogue_command(tmp_path, capsys):
+    """Test the summary and memory report printed by the CLI."""
+    write_catalogue(tmp_path)
+
+    assert main(["catalogue", str(tmp_path), "--memory"]) == 0
+
+    output = capsys.readouterr().out
+    assert "3 processes, 36 steps, 0 files failed" in output
+    assert "resources: 15 held as 5 shared objects" in output
+    assert "saved" in output
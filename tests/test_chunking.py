@@ -0,0 +1,100 @@
+"""Tests for splitting large processes into linked Mermaid pages."""
+
+from benchmarks.synthetic import chain_process, decision_tree_process, fan_in_process
+from mermaid_mint.chunking import ChunkedMermaidVisitor, layout_order, partition
+from mermaid_mint.parser import Parser
+from mermaid_mint.visitors import MermaidVisitor
+from tests.helpers.sample_data import PROCESS, PROCESS_WITH_RESOURCES
+
+
+def drawn(lines):
+    """Return the (nodes, edges) drawn by the lines of a diagram."""
+    body = [line for line in lines[2:] if not line.lstrip().startswith('click')]
+    edges = [line for line in body if '-->' in line]
+    return len(body) - len(edges), len(edges)
+
+
+def test_layout_order_keeps_branches_together():
+    """Test that each decision branch is listed in full before the next."""
+    process = Parser().parse_string(PROCESS)
+
+    assert layout_order(process) == [
+        "start", "validate_email", "check_existing_user", "reject_duplicate", "end_rejected",
+        "create_account", "send_confirmation", "end_success"]
+
+
+def test_small_process_is_one_page():
+    """Test that a process within budget is not split."""
+    process = Parser().parse_string(PROCESS_WITH_RESOURCES)
+
+    pages = partition(process)
+
+    assert len(pages) == 1
+    assert sorted(pages[0]) == sorted(process.step_ids())
+    assert pages[0][:4] == ["start", "save_order", "orders_db", "audit_log"]
+
+
+def test_partition_respects_budgets():
+    """Test that every page stays within the node and edge budgets and every step is drawn."""
+    for data in (chain_process(300), decision_tree_process(300)):
+        process = Parser().parse_data(data)
+        pages = partition(process, max_nodes=40, max_edges=60)
+        visitor = ChunkedMermaidVisitor(40, 60)
+        names = visitor.page_names("big.mmd", len(pages))
+
+        assert len(pages) > 1
+        assert set().union(*pages) == set(process.step_ids())
+        for number in range(len(pages)):
+            nodes, edges = drawn(list(visitor.iter_page_lines(process, pages, number, names)))
+            assert nodes <= 40
+            assert edges <= 60
+
+
+def test_shared_resources_are_drawn_with_their_users():
+    """Test that a resource appears on every page with a step that uses it."""
+    process = Parser().parse_string(PROCESS_WITH_RESOURCES)
+    pages = partition(process, max_nodes=6, max_edges=6)
+
+    for page in pages:
+        for step_id in page:
+            for edge in process.out_edges(step_id):
+                if edge.kind in ('query', 'update'):
+                    assert edge.target in page
+
+
+def test_pages_and_index_are_linked(tmp_path):
+    """Test that oversized processes are written as pages plus a linked index."""
+    process = Parser().parse_data(chain_process(100))
+    output = tmp_path / "chain.mmd"
+
+    written = ChunkedMermaidVisitor(max_nodes=30, max_edges=40).visit_process_to_files(process, output)
+
+    assert written[-1] == str(output)
+    assert written[0] == str(tmp_path / "chain-1.mmd")
+    index = output.read_text()
+    assert "    page_1 --> page_2" in index
+    assert '    click page_2 "chain-2.mmd"' in index
+    first_page = (tmp_path / "chain-1.mmd").read_text()
+    assert 'click' in first_page and '"chain-2.mmd"' in first_page
+
+
+def test_process_within_budget_is_written_whole(tmp_path):
+    """Test that a small process is written exactly as MermaidVisitor would."""
+    process = Parser().parse_string(PROCESS)
+    output = tmp_path / "registration.mmd"
+
+    assert ChunkedMermaidVisitor().visit_process_to_files(process, output) == [str(output)]
+    assert output.read_text() == MermaidVisitor().visit_process(process)
+
+
+def test_shared_resources_are_not_rescanned_per_page(tmp_path):
+    """Test that the operation edges into shared resources are not walked again for every page."""
+    process = Parser().parse_data(fan_in_process(2000))
+    scanned = []
+    in_edges = process.in_edges
+    process.in_edges = lambda step_id: scanned.extend(in_edges(step_id)) or in_edges(step_id)
+
+    written = ChunkedMermaidVisitor().visit_process_to_files(process, tmp_path / "fan_in.mmd")
+
+    assert len(written) > 20
+    assert len(scanned) < 2 * len(list(process.edges()))
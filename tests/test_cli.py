@@ -0,0 +1,220 @@
+"""Tests for the mermaid_mint command line interface."""
+
+import pytest
+from mermaid_mint.cli import main
+from tests.helpers.sample_data import PROCESS, PROCESS_WITH_RESOURCES
+
+
+def test_convert_command_converts_directory(tmp_path, capsys):
+    """Test that convert writes diagrams and prints a summary."""
+    (tmp_path / "registration.yaml").write_text(PROCESS)
+
+    exit_code = main(["convert", str(tmp_path), "--workers", "1", "--no-cache"])
+
+    assert exit_code == 0
+    assert (tmp_path / "registration.mmd").exists()
+    output = capsys.readouterr().out
+    assert "registration.yaml" in output
+    assert "Converted 1 of 1 files, 0 failed" in output
+
+
+def test_convert_command_reports_failures(tmp_path, capsys):
+    """Test that a failed file is reported and sets the exit code."""
+    (tmp_path / "registration.yaml").write_text(PROCESS)
+    (tmp_path / "broken.yaml").write_text("process: {}\n")
+
+    exit_code = main(["convert", str(tmp_path), "--workers", "1", "--quiet", "--no-cache"])
+
+    assert exit_code == 1
+    captured = capsys.readouterr()
+    assert "FAIL" in captured.err
+    assert "broken.yaml" in captured.err
+    assert "Converted 1 of 2 files, 1 failed" in captured.out
+
+
+def test_convert_command_with_no_matches(tmp_path, capsys):
+    """Test that an empty match is an error."""
+    exit_code = main(["convert", str(tmp_path / "*.yaml"), "--no-cache"])
+
+    assert exit_code == 1
+    assert "No process files found" in capsys.readouterr().err
+
+
+def test_convert_command_reuses_cache(tmp_path, capsys):
+    """Test that a second run is served from the cache and reports hits."""
+    (tmp_path / "registration.yaml").write_text(PROCESS)
+    cache_dir = str(tmp_path / "cache")
+
+    main(["convert", str(tmp_path), "--workers", "1", "--cache-dir", cache_dir])
+    assert "Cache: 0 hits, 1 misses" in capsys.readouterr().out
+
+    (tmp_path / "registration.mmd").unlink()
+    main(["convert", str(tmp_path), "--workers", "1", "--cache-dir", cache_dir])
+    output = capsys.readouterr().out
+    assert "Cache: 1 hits, 0 misses" in output
+    assert (tmp_path / "registration.mmd").exists()
+
+    main(["convert", str(tmp_path), "--workers", "1", "--cache-dir", cache_dir, "--clear-cache"])
+    assert "Cache: 0 hits, 1 misses" in capsys.readouterr().out
+
+
+def test_check_command_reports_problems(tmp_path, capsys):
+    """Test that check prints each problem with its file and step."""
+    (tmp_path / "registration.yaml").write_text(PROCESS)
+    (tmp_path / "broken.yaml").write_text(
+        "process: {process_id: p1, name: Broken}\n"
+        "steps:\n"
+        "  - {step_id: start, type: Start, name: Begin, successor: missing}\n")
+
+    exit_code = main(["check", str(tmp_path), "--workers", "1"])
+
+    assert exit_code == 1
+    captured = capsys.readouterr()
+    assert "broken.yaml: start: successor refers to unknown step missing" in captured.out
+    assert "registration.yaml" not in captured.out
+    assert "Checked 2 files, 1 with problems" in captured.err
+
+
+def test_check_reports_reference_and_graph_problems_together(tmp_path, capsys):
+    """Test that an unresolved reference does not hide the problems validate finds."""
+    (tmp_path / "broken.yaml").write_text(
+        "process: {process_id: p1, name: Broken}\n"
+        "steps:\n"
+        "  - {step_id: start, type: Start, name: Begin, successor: lookup}\n"
+        "  - step_id: lookup\n"
+        "    type: Decision\n"
+        "    name: Found?\n"
+        "    test: {type: Query, target: done, description: Look up}\n"
+        "    'yes': done\n"
+        "    'no': ghost\n"
+        "  - {step_id: orphan, type: Task, name: Orphan, successor: done}\n"
+        "  - {step_id: done, type: End, name: Done}\n")
+
+    assert main(["check", str(tmp_path), "--workers", "1"]) == 1
+
+    output = capsys.readouterr().out
+    assert "lookup: no refers to unknown step ghost" in output
+    assert "lookup: query targets done, which is not a Database or Document" in output
+    assert "orphan: is not reachable from the start" in output
+
+
+def test_focus_command_draws_part_of_a_process(tmp_path, capsys):
+    """Test that focus prints a diagram of the selected steps."""
+    source = tmp_path / "registration.yaml"
+    source.write_text(PROCESS)
+
+    assert main(["focus", str(source), "--around", "create_account"]) == 0
+    output = capsys.readouterr().out
+    assert "create_account[Create User Account]" in output
+    assert "end_success_collapsed([Registration Complete ...])" in output
+    assert "end_success[" not in output
+
+    output_file = tmp_path / "focus.mmd"
+    assert main(["focus", str(source), "--between", "create_account", "end_success",
+                 "-o", str(output_file)]) == 0
+    assert "check_existing_user_collapsed --> create_account" in output_file.read_text()
+
+    assert main(["focus", str(source), "--around", "missing"]) == 1
+    assert "no step missing" in capsys.readouterr().err
+
+
+def test_convert_command_splits_large_diagrams(tmp_path, capsys):
+    """Test that a node budget splits a large diagram into pages and an index."""
+    (tmp_path / "registration.yaml").write_text(PROCESS)
+
+    exit_code = main(["convert", str(tmp_path), "--workers", "1", "--max-nodes", "4"])
+
+    assert exit_code == 0
+    assert "click page_1" in (tmp_path / "registration.mmd").read_text()
+    assert (tmp_path / "registration-2.mmd").exists()
+    assert "Cache:" not in capsys.readouterr().out
+
+
+def test_simulate_command_prints_report(tmp_path, capsys):
+    """Test that simulate prints path frequencies, cycle times and resource load."""
+    source = tmp_path / "orders.yaml"
+    source.write_text(PROCESS_WITH_RESOURCES)
+
+    assert main(["simulate", str(source), "-n", "1000", "--seed", "1"]) == 0
+    output = capsys.readouterr().out
+    assert "Simulated 1000 instances of Order Processing Workflow, 1000 finished" in output
+    assert "check_inventory=yes" in output
+    assert "orders_db" in output
+
+
+def test_diff_command_summarises_and_draws_changes(tmp_path, capsys):
+    """Test that diff lists changes with --summary and draws them otherwise."""
+    old = tmp_path / "old.yaml"
+    new = tmp_path / "new.yaml"
+    old.write_text(PROCESS)
+    new.write_text(PROCESS.replace('"Create User Account"', '"Create Account"'))
+
+    assert main(["diff", str(old), str(new), "--summary"]) == 0
+    assert "~ create_account: renamed from 'Create User Account' to 'Create Account'" in capsys.readouterr().out
+
+    assert main(["diff", str(old), str(new), "--context", "0"]) == 0
+    output = capsys.readouterr().out
+    assert "    class create_account changed" in output
+    assert "start[" not in output
+
+
+def test_convert_command_writes_several_formats(tmp_path, capsys):
+    """Test that repeated --format options write every format next to the source."""
+    (tmp_path / "registration.yaml").write_text(PROCESS)
+    cache_dir = str(tmp_path / "cache")
+
+    arguments = ["convert", str(tmp_path / "*.yaml"), "--workers", "1", "--cache-dir", cache_dir,
+                 "-f", "dot", "-f", "json", "-f", "graphml"]
+    assert main(arguments) == 0
+    assert (tmp_path / "registration.dot").read_text().startswith('digraph "user_registration"')
+    assert (tmp_path / "registration.graph.json").exists()
+    assert (tmp_path / "registration.graphml").exists()
+    assert not (tmp_path / "registration.mmd").exists()
+
+    (tmp_path / "registration.dot").unlink()
+    assert main(arguments) == 0
+    assert "Cache: 3 hits, 0 misses" in capsys.readouterr().out
+    assert (tmp_path / "registration.dot").exists()
+
+    assert main(["convert", str(tmp_path), "-f", "svg"]) == 1
+    assert "Unknown output format: svg" in capsys.readouterr().err
+
+
+def test_export_command_writes_snapshots_that_convert(tmp_path, capsys):
+    """Test that an exported snapshot converts to the same diagram as its source."""
+    source = tmp_path / "registration.yaml"
+    source.write_text(PROCESS)
+    snapshot_dir = tmp_path / "snapshots"
+    snapshot_dir.mkdir()
+
+    assert main(["export", str(source), str(snapshot_dir / "registration.mmsnap")]) == 0
+    assert main(["export", str(source), str(tmp_path / "copy.json")]) == 0
+    assert main(["convert", str(tmp_path), str(snapshot_dir), "--workers", "1", "--no-cache"]) == 0
+
+    assert (snapshot_dir / "registration.mmd").read_text() == (tmp_path / "registration.mmd").read_text()
+    assert (tmp_path / "copy.mmd").read_text() == (tmp_path / "registration.mmd").read_text()
+
+    assert main(["export", str(source), str(tmp_path / "registration.txt")]) == 1
+    assert "Cannot tell the format" in capsys.readouterr().err
+
+
+def test_import_command_writes_definitions_that_convert(tmp_path, capsys):
+    """Test that an imported flowchart parses and converts back to the same diagram."""
+    source = tmp_path / "registration.yaml"
+    source.write_text(PROCESS)
+    assert main(["convert", str(source), "--no-cache"]) == 0
+    charts = tmp_path / "charts"
+    charts.mkdir()
+    (tmp_path / "registration.mmd").rename(charts / "registration.mmd")
+    (charts / "broken.mmd").write_text("sequenceDiagram\n")
+    capsys.readouterr()
+
+    assert main(["import", str(charts), "-o", str(tmp_path / "imported")]) == 1
+    output = capsys.readouterr()
+    assert "taken as no" in output.out
+    assert "FAIL" in output.err and "broken.mmd" in output.err
+    assert "Imported 1 of 2 charts, 1 failed" in output.out
+
+    imported = tmp_path / "imported" / "registration.yaml"
+    assert main(["convert", str(imported), "--no-cache"]) == 0
+    assert imported.with_suffix(".mmd").read_text() == (charts / "registration.mmd").read_text()
@@ -0,0 +1,86 @@
+"""Tests for comparing two versions of a process."""
+
+from mermaid_mint.diff import DiffMermaidVisitor, diff
+from mermaid_mint.parser import Parser
+from mermaid_mint.steps import Edge
+from tests.helpers.sample_data import PROCESS, PROCESS_WITH_RESOURCES
+
+
+def edited(source, *replacements):
+    """Parse a copy of a process definition with text replaced."""
+    for old, new in replacements:
+        assert old in source
+        source = source.replace(old, new)
+    return Parser().parse_string(source)
+
+
+def test_identical_processes_have_no_differences():
+    """Test that parsing the same definition twice gives an empty diff."""
+    changes = diff(Parser().parse_string(PROCESS), Parser().parse_string(PROCESS))
+
+    assert not changes
+    assert list(changes.lines()) == []
+
+
+def test_renamed_step_and_rerouted_edge():
+    """Test that renames and edge changes are matched by step_id."""
+    old = Parser().parse_string(PROCESS)
+    new = edited(PROCESS, ('"Create User Account"', '"Create Account"'),
+                 ('successor: "send_confirmation"', 'successor: "end_success"'))
+
+    changes = diff(old, new)
+
+    assert changes.renamed == [("create_account", "Create User Account", "Create Account")]
+    assert changes.added_edges == [Edge("create_account", "end_success", "flow")]
+    assert changes.removed_edges == [Edge("create_account", "send_confirmation", "flow")]
+    assert changes.added_steps == changes.removed_steps == []
+    assert changes.changed_steps() == {"create_account"}
+
+
+def test_added_removed_and_changed_operations():
+    """Test that added and removed steps and edited operations are reported."""
+    old = Parser().parse_string(PROCESS_WITH_RESOURCES)
+    new = edited(PROCESS_WITH_RESOURCES,
+                 ('"Insert new order record"', '"Upsert order record"'),
+                 ('  - step_id: "audit_log"\n    type: "Document"\n    name: "Audit Log"\n', ''),
+                 ('target: "audit_log"', 'target: "archive_doc"'),
+                 ('  - step_id: "end_success"', '  - step_id: "archive_doc"\n    type: "Document"\n'
+                                                '    name: "Archive"\n\n  - step_id: "end_success"'))
+
+    changes = diff(old, new)
+
+    assert changes.added_steps == ["archive_doc"]
+    assert changes.removed_steps == ["audit_log"]
+    assert changes.changed_operations == ["save_order"]
+    assert Edge("save_order", "audit_log", "update") in changes.removed_edges
+    assert "~ save_order: operations changed" in list(changes.lines())
+
+
+def test_diff_diagram_styles_changes():
+    """Test that the diagram shows removed steps and edges and styles every change."""
+    old = Parser().parse_string(PROCESS)
+    new = edited(PROCESS, ('"Reject Duplicate User"', '"Reject Duplicate"'),
+                 ('"yes": "reject_duplicate"', '"yes": "end_rejected"'))
+
+    diagram = DiffMermaidVisitor().visit_diff(old, new).splitlines()
+
+    assert "    check_existing_user -.-> reject_duplicate" in diagram
+    assert "    class check_existing_user,reject_duplicate changed" in diagram
+    edges = [line for line in diagram if '->' in line]
+    added = edges.index("    check_existing_user --> end_rejected")
+    removed = edges.index("    check_existing_user -.-> reject_duplicate")
+    assert f"    linkStyle {added} stroke:#393,stroke-width:2px" in diagram
+    assert f"    linkStyle {removed} stroke:#c33,stroke-width:2px" in diagram
+
+
+def test_diff_diagram_limited_to_context():
+    """Test that context limits the diagram to the changed region."""
+    old = Parser().parse_string(PROCESS)
+    new = edited(PROCESS, ('"Send Confirmation Email"', '"Send Welcome Email"'))
+
+    diagram = DiffMermaidVisitor().visit_diff(old, new, context=1)
+
+    assert "send_confirmation[Send Welcome Email]" in diagram
+    assert "create_account[" in diagram and "end_success[" in diagram
+    assert "start[" not in diagram
+    assert "check_existing_user" not in diagram
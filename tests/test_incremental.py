@@ -0,0 +1,112 @@
+"""Tests for incremental Mermaid rendering."""
+
+import random
+from io import StringIO
+
+from benchmarks.synthetic import GENERATORS
+from mermaid_mint.incremental import IncrementalMermaidVisitor
+from mermaid_mint.parser import Parser
+from mermaid_mint.steps import Decision, End, Task
+from mermaid_mint.visitors import MermaidVisitor
+from tests.helpers.sample_data import PROCESS_WITH_RESOURCES
+
+
+def full(process):
+    return MermaidVisitor().visit_process(process)
+
+
+def test_first_render_matches_the_full_visitor():
+    """Test that the first render formats every step and matches MermaidVisitor."""
+    process = Parser().parse_string(PROCESS_WITH_RESOURCES)
+    visitor = IncrementalMermaidVisitor()
+
+    assert visitor.update(process) == set(process.step_ids())
+    assert visitor.visit_process(process) == full(process)
+    stream = StringIO()
+    visitor.visit_process_to(process, stream)
+    assert stream.getvalue() == full(process)
+
+
+def test_only_changed_steps_are_formatted():
+    """Test that an edit re-formats the edited step and nothing else."""
+    process = Parser().parse_string(PROCESS_WITH_RESOURCES)
+    visitor = IncrementalMermaidVisitor()
+    visitor.visit_process(process)
+    assert visitor.update(process) == set()
+
+    old = process["save_order"]
+    process["save_order"] = Task("save_order", "Store Order", old.successor, old.operations)
+
+    assert visitor.update(process) == {"save_order"}
+    assert visitor.step_lines("save_order")[0] == "    save_order[Store Order]"
+    assert visitor.visit_process(process) == full(process)
+
+
+def test_in_place_edits_are_picked_up_after_relink():
+    """Test that changing a step's references and calling relink redraws its edges."""
+    process = Parser().parse_string(PROCESS_WITH_RESOURCES)
+    visitor = IncrementalMermaidVisitor()
+    visitor.visit_process(process)
+
+    process["save_order"].successor = process["end_success"]
+    process.relink("save_order")
+
+    assert visitor.update(process) == {"save_order"}
+    assert "    save_order --> end_success" in visitor.step_lines("save_order")[1]
+    assert visitor.visit_process(process) == full(process)
+
+
+def test_renaming_a_shared_resource_formats_one_step():
+    """Test that a resource used by every task is re-formatted alone."""
+    process = Parser().parse_data(GENERATORS["fan_in"](2000))
+    visitor = IncrementalMermaidVisitor()
+    visitor.visit_process(process)
+
+    process["db_0"] = type(process["db_0"])("db_0", "Renamed Database")
+
+    assert visitor.update(process) == {"db_0"}
+    assert visitor.visit_process(process) == full(process)
+
+
+def test_random_edits_keep_output_identical_to_a_full_render():
+    """Test adds, replacements, removals and re-adds in batches against MermaidVisitor."""
+    randomness = random.Random(7)
+    process = Parser().parse_data(GENERATORS["tree"](60))
+    visitor = IncrementalMermaidVisitor()
+    visitor.visit_process(process)
+
+    for round_number in range(40):
+        for edit in range(randomness.randint(1, 4)):
+            step_ids = process.step_ids()
+            step_id = randomness.choice(step_ids)
+            action = randomness.random()
+            if action < 0.3:
+                step = process[step_id]
+                if isinstance(step, Task):
+                    process[step_id] = Task(step_id, f"Edited {round_number}", step.successor, step.operations)
+                elif isinstance(step, Decision):
+                    process[step_id] = Decision(step_id, f"Edited {round_number}?", step.test, step.yes, step.no)
+            elif action < 0.5:
+                new_id = f"new_{round_number}_{edit}"
+                process[new_id] = Task(new_id, "New", process[randomness.choice(step_ids)])
+            elif action < 0.7 and step_id != "start":
+                step = process[step_id]
+                del process[step_id]
+                if randomness.random() < 0.5:
+                    process[step_id] = step
+            elif isinstance(process[step_id], Task):
+                process[step_id].successor = process[randomness.choice(step_ids)]
+                process.relink(step_id)
+        assert visitor.visit_process(process) == full(process)
+
+
+def test_a_new_process_is_rendered_in_full():
+    """Test that switching to another process drops the cached lines of the first."""
+    visitor = IncrementalMermaidVisitor()
+    first = Parser().parse_string(PROCESS_WITH_RESOURCES)
+    second = Parser().parse_data(GENERATORS["chain"](5))
+    visitor.visit_process(first)
+
+    assert visitor.visit_process(second) == full(second)
+    second["extra"] = End("extra", "Extra")
+    assert visitor.update(second) == {"extra"}
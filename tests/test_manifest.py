@@ -0,0 +1,160 @@
+"""Tests for multi-file process packages."""
+
+import os
+import pytest
+from mermaid_mint.batch import UNREADABLE, UNUSED_FRAGMENT, check_all, convert_all, plan_conversions
+from mermaid_mint.manifest import ManifestLoader, manifest_dependencies
+from mermaid_mint.steps import Database, Task
+from mermaid_mint.validation import ValidationError
+from mermaid_mint.watch import Watcher
+
+MANIFEST = """
+process:
+  process_id: "order_processing"
+  name: "Order Processing Workflow"
+include:
+  - intake.yaml
+  - fulfilment/*.yaml
+libraries:
+  - ../shared/databases.yaml
+"""
+
+INTAKE = """
+steps:
+  - {step_id: start, type: Start, name: Begin, successor: save_order}
+  - step_id: save_order
+    type: Task
+    name: Save Order
+    operations: [{type: Update, target: orders_db, description: Insert order}]
+    successor: ship
+"""
+
+SHIPPING = """
+steps:
+  - {step_id: ship, type: Task, name: Ship Order, successor: done}
+  - {step_id: done, type: End, name: Done}
+"""
+
+DATABASES = """
+steps:
+  - {step_id: orders_db, type: Database, name: Orders Database}
+"""
+
+
+@pytest.fixture
+def package(tmp_path):
+    """A manifest with fragments in two directories and a shared library."""
+    orders = tmp_path / "orders"
+    (orders / "fulfilment").mkdir(parents=True)
+    (tmp_path / "shared").mkdir()
+    (orders / "orders.yaml").write_text(MANIFEST)
+    (orders / "intake.yaml").write_text(INTAKE)
+    (orders / "fulfilment" / "shipping.yaml").write_text(SHIPPING)
+    (tmp_path / "shared" / "databases.yaml").write_text(DATABASES)
+    return orders
+
+
+def test_manifest_merges_fragments_with_cross_file_references(package):
+    """Test that steps from different files are linked into one Process."""
+    process = ManifestLoader().load(str(package / "orders.yaml"))
+
+    assert process.process_id == "order_processing"
+    save_order = process.start.successor
+    assert isinstance(save_order.successor, Task)
+    assert save_order.successor.step_id == "ship"
+    assert isinstance(save_order.operations[0].target, Database)
+
+
+def test_manifest_with_only_libraries(package):
+    """Test that a process with its own steps and a libraries list is loaded as a manifest."""
+    manifest = package / "standalone.yaml"
+    manifest.write_text(
+        "process: {process_id: standalone, name: Standalone}\n"
+        "libraries: [../shared/databases.yaml]\n" + INTAKE.replace("successor: ship", "successor: done")
+        + "  - {step_id: done, type: End, name: Done}\n")
+
+    results = list(convert_all([(str(manifest), str(package / "standalone.mmd"))], workers=1))
+
+    assert results[0].ok, results[0].error
+    assert "    save_order --> orders_db" in (package / "standalone.mmd").read_text()
+    assert [os.path.basename(path) for path in manifest_dependencies(str(manifest))] == ["databases.yaml"]
+
+
+def test_manifest_reloads_only_changed_fragments(package):
+    """Test that cached fragments are reused until their file changes."""
+    loader = ManifestLoader(workers=2)
+    loader.load(str(package / "orders.yaml"))
+    assert loader.cache.loads == 3
+
+    loader.load(str(package / "orders.yaml"))
+    assert loader.cache.loads == 3
+
+    shipping = package / "fulfilment" / "shipping.yaml"
+    shipping.write_text(SHIPPING.replace("Ship Order", "Dispatch Order"))
+    os.utime(shipping, ns=(10 ** 18, 10 ** 18))
+    process = loader.load(str(package / "orders.yaml"))
+
+    assert loader.cache.loads == 4
+    assert process["ship"].name == "Dispatch Order"
+
+
+def test_manifest_reports_unresolved_references_across_fragments(package):
+    """Test that a reference to a step missing from every fragment is reported."""
+    (package / "fulfilment" / "shipping.yaml").write_text(SHIPPING.replace("successor: done", "successor: gone"))
+
+    with pytest.raises(ValidationError, match="ship: successor refers to unknown step gone"):
+        ManifestLoader().load(str(package / "orders.yaml"))
+
+
+def test_library_may_only_define_resources(package, tmp_path):
+    """Test that a shared library cannot define process steps."""
+    (tmp_path / "shared" / "databases.yaml").write_text(DATABASES + SHIPPING.replace("steps:", ""))
+
+    with pytest.raises(ValueError, match="not a Database or Document"):
+        ManifestLoader().load(str(package / "orders.yaml"))
+
+
+def test_manifest_dependencies(package, tmp_path):
+    """Test that a manifest's files are listed and ordinary processes have none."""
+    dependencies = manifest_dependencies(str(package / "orders.yaml"))
+
+    assert [os.path.basename(path) for path in dependencies] == ["intake.yaml", "shipping.yaml", "databases.yaml"]
+    assert manifest_dependencies(str(package / "intake.yaml")) == []
+
+
+def test_batch_converts_manifest_and_skips_fragments(package):
+    """Test that converting a directory produces one diagram for the package."""
+    results = list(convert_all(plan_conversions([str(package)]), workers=1))
+
+    converted = [os.path.basename(result.source) for result in results if not result.skipped]
+    assert converted == ["orders.yaml"]
+    assert all(result.ok for result in results)
+    assert "save_order --> ship" in (package / "orders.mmd").read_text()
+
+
+def test_check_reports_fragments_no_manifest_includes(package):
+    """Test that check passes a package's fragments but reports stray and headerless files."""
+    (package / "stray.yaml").write_text(SHIPPING)
+    (package / "misspelt.yaml").write_text('proces: {process_id: p, name: P}\n' + SHIPPING)
+
+    results = {os.path.basename(result.source): result.problems
+               for result in check_all([source for source, _ in plan_conversions([str(package)])], workers=1)}
+
+    assert results["orders.yaml"] == results["intake.yaml"] == results["shipping.yaml"] == []
+    assert [problem.kind for problem in results["stray.yaml"]] == [UNUSED_FRAGMENT]
+    assert [problem.kind for problem in results["misspelt.yaml"]] == [UNREADABLE]
+    assert "No process header" in results["misspelt.yaml"][0].message
+
+
+def test_watch_reconverts_manifest_when_fragment_changes(package):
+    """Test that editing a fragment regenerates the manifest's diagram."""
+    watcher = Watcher([str(package)], debounce=0)
+    watcher.start()
+
+    shipping = package / "fulfilment" / "shipping.yaml"
+    shipping.write_text(SHIPPING.replace("Ship Order", "Dispatch Order"))
+    os.utime(shipping, ns=(10 ** 19, 10 ** 19))
+    results = watcher.poll()
+
+    assert "orders.yaml" in [os.path.basename(result.source) for result in results if not result.skipped]
+    assert "ship[Dispatch Order]" in (package / "orders.mmd").read_text()
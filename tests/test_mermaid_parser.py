@@ -0,0 +1,145 @@
+"""Tests for reading Mermaid flowcharts back into processes."""
+
+import pytest
+from mermaid_mint.diff import diff
+from mermaid_mint.mermaid_parser import INFERRED, UNMAPPED_EDGE, UNSUPPORTED_SYNTAX, MermaidParser
+from mermaid_mint.parser import Parser
+from mermaid_mint.steps import Database, Decision, Document, End, Query, Start, Task, Update
+from mermaid_mint.validation import validate
+from mermaid_mint.visitors import MermaidVisitor
+from tests.helpers.sample_data import PROCESS, PROCESS_WITH_RESOURCES
+
+LEGACY = """
+---
+title: Refunds
+---
+graph LR
+  %% hand written
+  A[Begin refund] --> B{"Approved?"}
+  B -->|No| C[Ask for details] --> B
+  B -- yes --> D[Pay out]
+  D -->|update ledger| L[(Ledger)]
+  D -->|read policy| P[/Policy/]
+  D --> E(Refunded)
+  B --> L
+  L --> A
+  X & Y --> Z
+  classDef done fill:#dfd
+  class E done
+"""
+
+
+def kinds(problems):
+    return [(problem.kind, problem.step_id) for problem in problems]
+
+
+def test_visitor_output_reads_back_as_the_same_process():
+    """Test that a diagram drawn by MermaidVisitor maps back to the process that drew it."""
+    original = Parser().parse_string(PROCESS)
+    process, problems = MermaidParser().parse_string(MermaidVisitor().visit_process(original),
+                                                     original.process_id, original.name)
+
+    changes = diff(original, process)
+    assert not changes.added_steps and not changes.removed_steps and not changes.renamed
+    assert not changes.retyped and not changes.added_edges and not changes.removed_edges
+    # Mermaid does not carry the decision's test expression
+    assert changes.changed_operations == ["check_existing_user"]
+    assert process.start is process["start"]
+    assert kinds(problems) == [(INFERRED, "check_existing_user")] * 2
+
+
+def test_resource_edges_become_operations_and_tests():
+    """Test that edges to databases and documents map to operations and decision tests."""
+    original = Parser().parse_string(PROCESS_WITH_RESOURCES)
+    process, _ = MermaidParser().parse_string(MermaidVisitor().visit_process(original), "orders", "Orders")
+
+    assert validate(process) == []
+    assert isinstance(process["orders_db"], Database)
+    assert isinstance(process["audit_log"], Document)
+    assert [operation.target.step_id for operation in process["save_order"].operations] == [
+        "orders_db", "audit_log"]
+    assert isinstance(process["check_inventory"].test, Query)
+    assert process["check_inventory"].test.target is process["inventory_db"]
+
+
+def test_guessed_operations_are_reported_on_round_trip():
+    """Test that every operation read back from unlabelled or unclear edges is reported as inferred."""
+    original = Parser().parse_string(PROCESS_WITH_RESOURCES)
+    process, problems = MermaidParser().parse_string(MermaidVisitor().visit_process(original), "orders", "Orders")
+
+    changed = diff(original, process).changed_operations
+    reported = {problem.step_id for problem in problems if problem.kind == INFERRED}
+    assert len(changed) == 4
+    assert set(changed) <= reported
+    operation_edges = [edge for edge in original.edges() if edge.kind in ("query", "update")]
+    guessed = [problem for problem in problems
+               if "unlabelled edge" in problem.message or "unlabelled test" in problem.message]
+    assert len(guessed) == len(operation_edges)
+
+    _, problems = MermaidParser().parse_string(
+        "flowchart TD\n  a[Start] --> b[Work] --> c[Done]\n  b -->|Insert order| db[(Orders)]\n"
+        "  b -->|Notify customer| doc[/Letter/]\n", "p", "P")
+    assert [str(problem) for problem in problems if problem.kind == INFERRED] == [
+        "b: line 4: edge to doc labelled 'Notify customer' taken as an Update"]
+
+
+def test_legacy_chart_infers_what_it_can_and_reports_the_rest():
+    """Test labels, shapes, front matter and chained edges, and the problems reported."""
+    process, problems = MermaidParser().parse_string(LEGACY, "refunds", "Refunds")
+
+    assert isinstance(process["A"], Start) and process.start is process["A"]
+    decision = process["B"]
+    assert isinstance(decision, Decision) and decision.name == "Approved?"
+    assert decision.yes is process["D"] and decision.no is process["C"]
+    assert decision.test.target is process["L"]
+    assert process["C"].successor is decision
+    pay_out = process["D"]
+    assert isinstance(pay_out, Task) and pay_out.successor is process["E"]
+    assert [(type(operation), operation.target.step_id, operation.description)
+            for operation in pay_out.operations] == [(Update, "L", "update ledger"), (Query, "P", "read policy")]
+    assert isinstance(process["E"], End)
+
+    assert kinds(problems) == [
+        (UNSUPPORTED_SYNTAX, "X"),
+        (UNMAPPED_EDGE, "L"),
+        (INFERRED, "E"),
+        (INFERRED, "B"),
+    ]
+    assert "unlabelled test on L has no description" in str(problems[-1])
+    assert "line 15" in str(problems[0])
+
+
+def test_extra_branches_and_successors_are_reported():
+    """Test that edges the DSL cannot express are dropped and reported."""
+    process, problems = MermaidParser().parse_string("""flowchart TD
+    start[Start] --> a[Work]
+    a --> b[Done]
+    a --> c[Also done]
+    start --> d{Choose}
+    d --> b
+    d --> c
+    d --> a
+""", "p", "P")
+
+    assert process["a"].successor is process["b"]
+    assert process["start"].successor is process["a"]
+    assert (UNMAPPED_EDGE, "a") in kinds(problems)
+    assert (UNMAPPED_EDGE, "start") in kinds(problems)
+    assert (UNMAPPED_EDGE, "d") in kinds(problems)
+
+
+def test_input_without_header_is_rejected():
+    """Test that text that is not a flowchart raises ValueError."""
+    with pytest.raises(ValueError, match="Not a Mermaid flowchart"):
+        MermaidParser().parse_string("sequenceDiagram\n  A->>B: hi\n", "p", "P")
+
+
+def test_parse_file_streams_lines(tmp_path):
+    """Test that files are read line by line and named after the file."""
+    chart = tmp_path / "order_refunds.mmd"
+    chart.write_text(LEGACY)
+
+    process, _ = MermaidParser().parse_file(str(chart))
+
+    assert (process.process_id, process.name) == ("order_refunds", "Order Refunds")
+    assert len(process) == 8
@@ -1,5 +1,6 @@
 """Tests for MermaidVisitor - generating Mermaid diagrams from Process objects."""
 
+import io
 import pytest
 from mermaid_mint.visitors import MermaidVisitor
 from mermaid_mint.parser import Parser
@@ -55,4 +56,25 @@ def test_mermaid_visitor_generates_diagram_with_resources():
     
     # Check regular step connections still work
     assert "start --> save_order" in mermaid_output
-    assert "save_order --> check_inventory" in mermaid_output
\ No newline at end of file
+    assert "save_order --> check_inventory" in mermaid_output
+
+
+def test_mermaid_visitor_streams_to_file_like_object():
+    """Test that visit_process_to writes the same diagram as visit_process."""
+    process = Parser().parse_string(PROCESS_WITH_RESOURCES)
+    visitor = MermaidVisitor()
+    stream = io.StringIO()
+
+    visitor.visit_process_to(process, stream)
+
+    assert stream.getvalue() == visitor.visit_process(process)
+
+
+def test_mermaid_visitor_generates_lines_lazily():
+    """Test that iter_lines yields the header first, then nodes, then edges."""
+    process = Parser().parse_string(PROCESS)
+    lines = MermaidVisitor().iter_lines(process)
+
+    assert next(lines).startswith("%%{init:")
+    assert next(lines) == "flowchart TD"
+    assert next(lines) == "    start[Begin Registration]"
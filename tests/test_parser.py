@@ -1,7 +1,9 @@
 """Tests for Parser class - YAML to Process object conversion."""
 
+import json
 import pytest
-from mermaid_mint.parser import Parser
+import yaml
+from mermaid_mint.parser import JSON, MSGPACK, YAML, Parser, input_format_for, sniff_input_format
 from mermaid_mint.steps import Process, Start, Task, Decision, End, Database, Document, Query, Update
 from tests.helpers.sample_data import PROCESS, PROCESS_WITH_RESOURCES
 
@@ -91,4 +93,87 @@ def test_parser_creates_process_with_resources_and_operations():
     assert isinstance(check_inventory, Decision)
     assert isinstance(check_inventory.test, Query)
     assert check_inventory.test.target == process["inventory_db"]
-    assert check_inventory.test.description == "Check if product is in stock"
\ No newline at end of file
+    assert check_inventory.test.description == "Check if product is in stock"
+
+
+def test_parser_accepts_json():
+    """Test that the same schema is accepted as JSON, sniffed from the content."""
+    data = yaml.safe_load(PROCESS_WITH_RESOURCES)
+    process = Parser().parse_string(json.dumps(data))
+
+    assert process.start.step_id == "start"
+    assert isinstance(process["check_inventory"].test, Query)
+
+
+def test_parser_accepts_flow_style_yaml():
+    """Test that YAML starting with '{' is not mistaken for JSON."""
+    process = Parser().parse_string(
+        "{process: {process_id: p1, name: Flow}, steps: [{step_id: s, type: Start, name: Begin}]}")
+
+    assert process.start.name == "Begin"
+
+
+def test_parser_chooses_format_by_extension(tmp_path):
+    """Test that parse_file loads .json files as JSON."""
+    path = tmp_path / "registration.json"
+    path.write_text(json.dumps(yaml.safe_load(PROCESS)))
+
+    process = Parser().parse_file(str(path))
+
+    assert process.process_id == "user_registration"
+
+
+def test_sniff_input_format():
+    """Test that the input format is guessed from the first bytes."""
+    assert sniff_input_format(PROCESS) == YAML
+    assert sniff_input_format(' {"process": {}}') == JSON
+    assert sniff_input_format(b'\n{"process": {}}') == JSON
+    assert input_format_for("a/b.yml") == YAML
+    assert input_format_for("a/b.txt") is None
+
+
+def test_parser_accepts_msgpack():
+    """Test that msgpack input is sniffed and loaded when msgpack is installed."""
+    msgpack = pytest.importorskip("msgpack")
+    packed = msgpack.packb(yaml.safe_load(PROCESS))
+
+    assert sniff_input_format(packed) == MSGPACK
+    assert Parser().parse_string(packed).process_id == "user_registration"
+
+
+def test_parser_resolves_forward_references():
+    """Test that steps may refer to steps defined later in the file."""
+    process = Parser().parse_string("""
+process: {process_id: p1, name: Forward}
+steps:
+  - {step_id: start, type: Start, name: Begin, successor: save}
+  - {step_id: save, type: Task, name: Save, successor: done,
+     operations: [{type: Query, target: db, description: Read}]}
+  - {step_id: done, type: End, name: Done}
+  - {step_id: db, type: Database, name: Store}
+""")
+
+    save = process.start.successor
+    assert save is process["save"]
+    assert save.successor is process["done"]
+    assert save.operations[0].target is process["db"]
+
+
+def test_parser_rejects_unknown_step_type():
+    """Test that an unknown step type is reported."""
+    with pytest.raises(ValueError, match="Unknown step type: Loop"):
+        Parser().parse_string("""
+process: {process_id: p1, name: Bad}
+steps:
+  - {step_id: start, type: Loop, name: Begin}
+""")
+
+
+def test_parser_requires_start_step():
+    """Test that a process without a Start step is reported."""
+    with pytest.raises(ValueError, match="no Start step"):
+        Parser().parse_string("""
+process: {process_id: p1, name: Bad}
+steps:
+  - {step_id: done, type: End, name: Done}
+""")
@@ -1,7 +1,9 @@
 """Tests for Process class - complete process workflow."""
 
 import pytest
-from mermaid_mint.steps import Process, Start, Task, End
+from mermaid_mint.parser import Parser
+from mermaid_mint.steps import Process, Start, Task, End, Edge, FLOW, YES, NO, QUERY, UPDATE
+from tests.helpers.sample_data import PROCESS_WITH_RESOURCES
 
 
 def test_process_creation():
@@ -56,4 +58,76 @@ def test_process_get_step_keyerror():
     process = Process("p1", "Test Process")
     
     with pytest.raises(KeyError):
-        _ = process["nonexistent"]
\ No newline at end of file
+        _ = process["nonexistent"]
+
+
+def test_process_edges_have_kinds():
+    """Test that edges of every kind are indexed with their source and target."""
+    process = Parser().parse_string(PROCESS_WITH_RESOURCES)
+
+    edges = set(process.edges())
+
+    assert Edge("start", "save_order", FLOW) in edges
+    assert Edge("check_inventory", "process_payment", YES) in edges
+    assert Edge("check_inventory", "backorder", NO) in edges
+    assert Edge("check_inventory", "inventory_db", QUERY) in edges
+    assert Edge("save_order", "audit_log", UPDATE) in edges
+    assert len(edges) == 12
+
+
+def test_process_successors_and_predecessors():
+    """Test adjacency queries in both directions, optionally filtered by kind."""
+    process = Parser().parse_string(PROCESS_WITH_RESOURCES)
+
+    assert [step.step_id for step in process.successors("check_inventory")] == [
+        "process_payment", "backorder", "inventory_db"]
+    assert [step.step_id for step in process.successors("check_inventory", QUERY)] == ["inventory_db"]
+    assert {step.step_id for step in process.predecessors("orders_db")} == {"save_order", "backorder"}
+    assert list(process.predecessors("orders_db", QUERY)) == []
+    assert list(process.predecessors("start")) == []
+
+
+def test_process_edge_index_follows_edits():
+    """Test that the index is maintained as steps are added, replaced and relinked."""
+    process = Process("p1", "Test Process")
+    start = Start("s1", "Begin")
+    task = Task("t1", "Task")
+    end = End("e1", "End")
+    start.successor = task
+    for step in (start, task, end):
+        process.add_step(step)
+    assert process.in_edges("t1") == [Edge("s1", "t1", FLOW)]
+
+    task.successor = end
+    process.relink("t1")
+    assert process.out_edges("t1") == [Edge("t1", "e1", FLOW)]
+
+    process["s1"] = Start("s1", "Begin again")
+    assert process.in_edges("t1") == []
+    assert list(process.edges()) == [Edge("t1", "e1", FLOW)]
+
+
+def test_process_take_changes_reports_edits_in_order():
+    """Test that tracked changes say what happened to each step, added steps in append order."""
+    process = Parser().parse_string(PROCESS_WITH_RESOURCES)
+    process["save_order"] = Task("save_order", "Renamed")
+    assert process.take_changes() == {}
+
+    process.track_changes()
+    process["late"] = End("late", "Late")
+    process["save_order"] = Task("save_order", "Renamed again")
+    process.relink("start")
+    del process["check_inventory"]
+    process["check_inventory"] = End("check_inventory", "Back")
+    process["later"] = End("later", "Later")
+
+    changes = process.take_changes()
+    assert changes == {"late": "added", "save_order": "changed", "start": "changed",
+                       "check_inventory": "added", "later": "added"}
+    assert [step_id for step_id, kind in changes.items() if kind == "added"] == \
+        [step_id for step_id in process.step_ids() if step_id in changes and changes[step_id] == "added"]
+    assert process.take_changes() == {}
+
+    del process["late"]
+    assert process.take_changes() == {"late": "removed"}
+    assert "late" not in process
@@ -0,0 +1,103 @@
+"""Tests for the phase timers and counters."""
+
+import json
+from mermaid_mint import profiling
+from mermaid_mint.batch import convert_file
+from mermaid_mint.cli import main
+from mermaid_mint.parser import Parser
+from mermaid_mint.profiling import CREATE, LINK, LOAD, RENDER, Profile
+from mermaid_mint.visitors import MermaidVisitor
+from tests.helpers.sample_data import PROCESS, PROCESS_WITH_RESOURCES
+
+
+def test_hooks_do_nothing_when_no_profile_is_active():
+    """Test that phase() hands back one shared no-op context manager and count() records nothing."""
+    assert profiling.active() is None
+    assert profiling.phase(LOAD) is profiling.phase(RENDER)
+    with profiling.phase(LOAD):
+        profiling.count('steps', 3)
+    assert profiling.active() is None
+
+
+def test_conversion_records_every_phase_and_counter(tmp_path):
+    """Test that converting a file times each phase and counts its sizes."""
+    source = tmp_path / "orders.yaml"
+    source.write_text(PROCESS_WITH_RESOURCES)
+
+    with profiling.profiling() as profile:
+        result = convert_file(str(source), str(tmp_path / "orders.mmd"))
+
+    assert result.ok
+    assert set(profile.phases) == {LOAD, CREATE, LINK, RENDER}
+    assert all(calls == 1 for calls, _ in profile.phases.values())
+    process = Parser().parse_string(PROCESS_WITH_RESOURCES)
+    diagram = (tmp_path / "orders.mmd").read_text()
+    assert profile.counters == {
+        'bytes_in': len(PROCESS_WITH_RESOURCES.encode()),
+        'steps': len(process),
+        'operations': 6,
+        'references': 12,
+        'edges': len(list(process.edges())),
+        'chars_out': len(diagram),
+    }
+    assert profiling.active() is None
+
+
+def test_hooks_are_called_as_phases_end():
+    """Test that each hook receives the phase name and its duration."""
+    calls = []
+    profile = Profile(hooks=[lambda name, seconds: calls.append((name, seconds))])
+
+    with profiling.profiling(profile):
+        MermaidVisitor().visit_process(Parser().parse_string(PROCESS))
+
+    assert [name for name, _ in calls] == [LOAD, CREATE, LINK, RENDER]
+    assert all(seconds >= 0 for _, seconds in calls)
+
+
+def test_profiles_nest():
+    """Test that an inner profile records only its own work and the outer one resumes."""
+    with profiling.profiling() as outer:
+        with profiling.profiling() as inner:
+            Parser().parse_string(PROCESS)
+        assert profiling.active() is outer
+        profiling.count('steps')
+
+    assert inner.counters['steps'] == 8
+    assert outer.counters == {'steps': 1}
+
+
+def test_profile_flag_prints_breakdown_and_writes_json(tmp_path, capsys):
+    """Test that --profile prints the phase table and writes JSON stats."""
+    (tmp_path / "registration.yaml").write_text(PROCESS)
+    stats = tmp_path / "stats.json"
+
+    assert main(["--profile-output", str(stats), "convert", str(tmp_path), "--no-cache"]) == 0
+
+    table = capsys.readouterr().err
+    assert table.splitlines()[0].split() == ["phase", "calls", "ms", "share"]
+    assert "render" in table and "bytes_in" in table
+    data = json.loads(stats.read_text())
+    assert set(data['phases']) == {LOAD, CREATE, LINK, RENDER}
+    assert data['counters']['steps'] == 8
+
+
+def test_bare_profile_flag_before_command(tmp_path, capsys):
+    """Test that --profile on its own leaves the command to the subcommand parser."""
+    (tmp_path / "registration.yaml").write_text(PROCESS)
+
+    assert main(["--profile", "convert", str(tmp_path), "--no-cache"]) == 0
+
+    assert "render" in capsys.readouterr().err
+    assert (tmp_path / "registration.mmd").exists()
+
+
+def test_profile_flag_writes_cprofile_stats(tmp_path, capsys):
+    """Test that a .prof destination gets cProfile stats that pstats can read."""
+    import pstats
+    (tmp_path / "registration.yaml").write_text(PROCESS)
+    stats = tmp_path / "convert.prof"
+
+    assert main(["--profile-output", str(stats), "convert", str(tmp_path), "--no-cache"]) == 0
+
+    assert pstats.Stats(str(stats)).total_calls > 0
@@ -0,0 +1,84 @@
+"""Tests for the resource usage index and CRUD report."""
+
+import csv
+import json
+from io import StringIO
+
+from mermaid_mint.cli import main
+from mermaid_mint.parser import Parser
+from mermaid_mint.resources import CSV_COLUMNS, ResourceIndex, collect, matrix
+from mermaid_mint.steps import Database, Query, Task, Update
+from tests.helpers.sample_data import PROCESS, PROCESS_WITH_RESOURCES
+
+
+def test_index_maps_resources_to_steps_and_back():
+    """Test readers, writers and the reverse lookup, with Decision tests as reads."""
+    index = ResourceIndex(Parser().parse_string(PROCESS_WITH_RESOURCES))
+
+    assert index.writers("orders_db") == ["save_order", "backorder"]
+    assert index.readers("orders_db") == []
+    assert index.readers("inventory_db") == ["check_inventory"]
+    assert index.resources_used_by("backorder") == ["orders_db", "notification_doc"]
+    assert index.resources_used_by("start") == []
+    assert index.access("inventory_db", "check_inventory") == "R"
+    assert index.access("orders_db", "process_payment") == ""
+    assert set(index.resource_ids()) == {"orders_db", "inventory_db", "payment_db", "audit_log",
+                                         "notification_doc"}
+
+
+def test_rows_merge_reads_and_writes_of_one_step():
+    """Test that a step that queries and updates a resource gets one RW row."""
+    process = Parser().parse_string(PROCESS_WITH_RESOURCES)
+    orders = process["orders_db"]
+    process["save_order"].operations.append(Query(orders, "Check for duplicates"))
+    process["archive"] = Task("archive", "Archive", operations=[Update(Database("cold", "Cold Store"), "")])
+
+    rows = {(row[0], row[4]): row for row in ResourceIndex(process).rows()}
+
+    assert rows[("orders_db", "save_order")][6:] == ("RW", "Insert new order record; Check for duplicates")
+    assert rows[("orders_db", "backorder")][6] == "W"
+    # Resources missing from the process are still reported, without a type
+    assert rows[("cold", "archive")][1:3] == ("", "")
+    assert all(len(row) == len(CSV_COLUMNS) for row in rows.values())
+
+
+def test_matrix_merges_resources_shared_by_processes():
+    """Test that the JSON matrix keys steps by process and merges resources by ID."""
+    rows = [("db", "Database", "Main", "a", "s1", "Task", "R", ""),
+            ("db", "", "", "b", "s1", "Task", "W", ""),
+            ("doc", "Document", "Log", "b", "s2", "Task", "RW", "")]
+
+    assert matrix(rows) == {
+        "db": {"type": "Database", "name": "Main", "steps": {"a/s1": "R", "b/s1": "W"}},
+        "doc": {"type": "Document", "name": "Log", "steps": {"b/s2": "RW"}},
+    }
+
+
+def test_collect_orders_rows_by_file_and_reports_failures(tmp_path):
+    """Test that rows come out in source order whatever order workers finish in."""
+    (tmp_path / "b.yaml").write_text(PROCESS_WITH_RESOURCES.replace("order_processing", "second"))
+    (tmp_path / "a.yaml").write_text(PROCESS_WITH_RESOURCES)
+    (tmp_path / "plain.yaml").write_text(PROCESS)
+    (tmp_path / "broken.yaml").write_text("process: {}\n")
+    sources = sorted(str(path) for path in tmp_path.iterdir())
+
+    rows, failures = collect(sources, workers=2)
+
+    assert [row[3] for row in rows] == ["order_processing"] * 6 + ["second"] * 6
+    assert [(source.endswith("broken.yaml"), "KeyError" in error) for source, error in failures] == [(True, True)]
+
+
+def test_resources_command_writes_csv_and_json(tmp_path, capsys):
+    """Test the CLI report in both formats."""
+    (tmp_path / "orders.yaml").write_text(PROCESS_WITH_RESOURCES)
+
+    assert main(["resources", str(tmp_path), "-j", "1"]) == 0
+    table = list(csv.reader(StringIO(capsys.readouterr().out)))
+    assert tuple(table[0]) == CSV_COLUMNS
+    assert ["inventory_db", "Database", "Inventory Database", "order_processing", "check_inventory",
+            "Decision", "R", "Check if product is in stock"] in table
+
+    output = tmp_path / "crud.json"
+    assert main(["resources", str(tmp_path), "--format", "json", "-o", str(output)]) == 0
+    assert json.loads(output.read_text())["orders_db"]["steps"] == {
+        "order_processing/save_order": "W", "order_processing/backorder": "W"}
@@ -0,0 +1,109 @@
+"""Tests for writing processes back to the DSL and to binary snapshots."""
+
+import json
+
+import pytest
+import yaml
+from mermaid_mint.diff import diff
+from mermaid_mint.parser import Parser
+from mermaid_mint.serializer import (dump_snapshot, dumps_json, dumps_snapshot, dumps_yaml, load_snapshot,
+                                     loads_snapshot, to_data)
+from mermaid_mint.steps import Collapsed, Process
+from tests.helpers.sample_data import PROCESS, PROCESS_WITH_RESOURCES
+
+SAMPLES = [PROCESS, PROCESS_WITH_RESOURCES]
+
+
+def assert_same_process(original, copy):
+    """Assert that two processes have the same steps, edges, start and annotations."""
+    assert not diff(original, copy)
+    assert copy.step_ids() == original.step_ids()
+    assert copy.start.step_id == original.start.step_id
+    assert copy.annotations == original.annotations
+
+
+@pytest.mark.parametrize("source", SAMPLES)
+def test_to_data_matches_the_source(source):
+    """Test that serialized data is exactly what was parsed."""
+    assert to_data(Parser().parse_string(source)) == yaml.safe_load(source)
+
+
+@pytest.mark.parametrize("source", SAMPLES)
+def test_yaml_and_json_round_trip(source):
+    """Test that YAML and JSON output parse back to the same process."""
+    process = Parser().parse_string(source)
+
+    assert_same_process(process, Parser().parse_string(dumps_yaml(process)))
+    assert_same_process(process, Parser().parse_string(dumps_json(process)))
+    assert json.loads(dumps_json(process)) == to_data(process)
+
+
+@pytest.mark.parametrize("source", SAMPLES)
+def test_snapshot_round_trip(source, tmp_path):
+    """Test that snapshots load back to the same process, from bytes or an mmap."""
+    process = Parser().parse_string(source)
+    path = tmp_path / "process.mmsnap"
+
+    dump_snapshot(process, path)
+
+    assert_same_process(process, loads_snapshot(dumps_snapshot(process)))
+    assert_same_process(process, load_snapshot(path))
+
+
+def test_annotations_round_trip(tmp_path):
+    """Test that simulation annotations survive every format."""
+    process = Parser().parse_string(PROCESS)
+    process.annotations["check_existing_user"] = {"simulation": {"yes_probability": 0.1}}
+
+    assert_same_process(process, Parser().parse_string(dumps_yaml(process)))
+    assert_same_process(process, loads_snapshot(dumps_snapshot(process)))
+
+
+def test_decision_without_test_round_trips_in_snapshots():
+    """Test that a Decision with no test loads back with None rather than another string."""
+    process = Parser().parse_string(PROCESS)
+    process["check_existing_user"].test = None
+
+    loaded = loads_snapshot(dumps_snapshot(process))
+
+    assert loaded["check_existing_user"].test is None
+    assert_same_process(process, loaded)
+
+
+def test_non_string_decision_tests_are_refused_by_snapshots():
+    """Test that a test that is neither a string nor a Query raises a clear ValueError."""
+    process = Parser().parse_string(PROCESS)
+    process["check_existing_user"].test = True
+
+    with pytest.raises(ValueError, match="check_existing_user: a Decision test must be a string or Query"):
+        dumps_snapshot(process)
+
+
+def test_strings_are_shared_in_snapshots():
+    """Test that each distinct string is stored once."""
+    process = Parser().parse_string(PROCESS_WITH_RESOURCES)
+    snapshot = dumps_snapshot(process)
+
+    assert snapshot.count(b"orders_db") == 1
+    assert len(snapshot) < len(dumps_json(process).encode())
+
+
+def test_invalid_snapshots_are_rejected():
+    """Test that other files and truncated snapshots raise ValueError."""
+    snapshot = dumps_snapshot(Parser().parse_string(PROCESS))
+
+    with pytest.raises(ValueError, match="Not a mermaid-mint snapshot"):
+        loads_snapshot(b"process: {}\n" + bytes(64))
+    with pytest.raises(ValueError, match="Truncated"):
+        loads_snapshot(snapshot[:-4])
+
+
+def test_placeholders_cannot_be_serialized():
+    """Test that focused views with Collapsed placeholders are refused."""
+    process = Process("p1", "Focused")
+    process.add_step(Collapsed("elsewhere_collapsed", "Elsewhere"))
+
+    with pytest.raises(ValueError, match="Collapsed steps cannot be serialized"):
+        to_data(process)
+    with pytest.raises(ValueError, match="Collapsed steps cannot be serialized"):
+        dumps_snapshot(process)
@@ -0,0 +1,168 @@
+"""Tests for the local HTTP render service."""
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from mermaid_mint.parser import Parser
+from mermaid_mint.server import LRUCache, RenderServer, RenderService, render
+from mermaid_mint.visitors import DotVisitor, MermaidVisitor
+from tests.helpers.sample_data import PROCESS
+
+
+async def request(port, method, target, body=b'', headers=None):
+    """Send one request on a new connection and return (status, headers, body)."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    lines = [f"{method} {target} HTTP/1.1", "Host: localhost", "Connection: close",
+             f"Content-Length: {len(body)}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode().split("\r\n")
+    fields = dict(line.split(": ", 1) for line in header_lines)
+    return int(status_line.split()[1]), fields, payload
+
+
+def run_server(test, executor=None):
+    """Run test(server) against a server on a free port, with conversions in a thread pool."""
+    async def main():
+        service = RenderService(executor=executor or ThreadPoolExecutor(2))
+        server = RenderServer(service, port=0)
+        await server.start()
+        try:
+            return await test(server)
+        finally:
+            await server.close()
+            service.executor.shutdown()
+    return asyncio.run(main())
+
+
+def test_render_returns_the_output_or_the_error():
+    """Test the worker function on a good and a bad definition."""
+    expected = MermaidVisitor().visit_process(Parser().parse_string(PROCESS))
+
+    assert render(PROCESS.encode(), 'mermaid') == (expected, None)
+    output, error = render(b"process: {}\n", 'mermaid')
+    assert output is None and error.startswith("KeyError")
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test that the cache keeps within both bounds, dropping the oldest unused entries."""
+    cache = LRUCache(max_entries=2, max_bytes=10)
+    cache.put('a', b'1111')
+    cache.put('b', b'2222')
+    assert cache.get('a') == b'1111'
+    cache.put('c', b'3333')
+
+    assert cache.get('b') is None
+    assert (len(cache), cache.bytes, cache.evictions) == (2, 8, 1)
+    cache.put('d', b'44444')
+    assert cache.get('a') is None and cache.get('c') == b'3333'
+    cache.put('huge', b'x' * 11)
+    assert cache.get('huge') is None
+
+
+def test_server_renders_each_format_and_caches_repeats():
+    """Test that POST /render converts, and a repeat is served from the cache."""
+    async def test(server):
+        status, headers, body = await request(server.port, 'POST', '/render', PROCESS.encode())
+        assert status == 200 and headers['Content-Type'].startswith('text/plain')
+        assert body.decode() == MermaidVisitor().visit_process(Parser().parse_string(PROCESS))
+
+        status, _, body = await request(server.port, 'POST', '/render?format=dot', PROCESS.encode(),
+                                        {'Content-Type': 'application/yaml'})
+        assert status == 200
+        assert body.decode() == DotVisitor().visit_process(Parser().parse_string(PROCESS))
+
+        await request(server.port, 'POST', '/render', PROCESS.encode())
+        _, _, body = await request(server.port, 'GET', '/metrics')
+        return json.loads(body)
+
+    metrics = run_server(test)
+    assert metrics['requests'] == 3 and metrics['conversions'] == 2
+    assert metrics['cache']['hits'] == 1 and metrics['cache']['entries'] == 2
+    assert metrics['latency_ms']['max'] >= metrics['latency_ms']['p50'] > 0
+
+
+def test_concurrent_identical_requests_share_one_conversion():
+    """Test that requests for the same key while a conversion runs wait for it."""
+    async def test(server):
+        responses = await asyncio.gather(*[request(server.port, 'POST', '/render', PROCESS.encode())
+                                           for _ in range(5)])
+        assert {body for _, _, body in responses} == {responses[0][2]}
+        return server.service
+
+    service = run_server(test)
+    assert service.conversions == 1
+    assert service.deduplicated + service.cache.hits == 4
+
+
+@pytest.mark.parametrize("method, target, body, status, message", [
+    ('POST', '/render', b"process: {}\n", 400, b"KeyError"),
+    ('POST', '/render?format=svg', PROCESS.encode(), 400, b"Unknown output format: svg"),
+    ('GET', '/render', b'', 405, b"POST"),
+    ('GET', '/nowhere', b'', 404, b"/nowhere"),
+    ('GET', '/health', b'', 200, b"ok"),
+])
+def test_server_reports_errors_as_http_statuses(method, target, body, status, message):
+    """Test that bad requests get a 4xx status and a message, and the server keeps running."""
+    async def test(server):
+        return await request(server.port, method, target, body)
+
+    got_status, _, got_body = run_server(test)
+    assert got_status == status
+    assert message in got_body
+
+
+def test_keep_alive_connections_serve_several_requests():
+    """Test that one connection can carry several requests."""
+    async def test(server):
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        statuses = []
+        for _ in range(2):
+            writer.write(b"GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            await writer.drain()
+            statuses.append(await reader.readline())
+            while await reader.readline() != b"\r\n":
+                pass
+            await reader.readexactly(2)
+        writer.close()
+        return statuses
+
+    assert run_server(test) == [b"HTTP/1.1 200 OK\r\n"] * 2
+
+
+def test_server_converts_in_a_process_pool():
+    """Test the default executor: a pool of warm worker processes."""
+    async def test(server):
+        return await request(server.port, 'POST', '/render', PROCESS.encode())
+
+    async def main():
+        server = RenderServer(RenderService(workers=1), port=0)
+        await server.start()
+        try:
+            return await test(server)
+        finally:
+            await server.close()
+
+    status, _, body = asyncio.run(main())
+    assert status == 200 and body.startswith(b'%%{init')
+
+
+def test_close_cancels_conversions_that_have_not_started():
+    """Test that closing the service cancels queued work without shutdown's cancel_futures."""
+    release = threading.Event()
+    service = RenderService(executor=ThreadPoolExecutor(1))
+    running = service._submit(release.wait)
+    queued = service._submit(render, PROCESS.encode(), 'mermaid')
+
+    service.close()
+    release.set()
+
+    assert queued.cancelled() and not running.cancelled()
+    service.executor.shutdown()
@@ -0,0 +1,116 @@
+"""Tests for Monte Carlo simulation of processes."""
+
+import random
+
+import pytest
+from mermaid_mint.parser import Parser
+from mermaid_mint.simulation import SimulationModel, compile_duration, sample_duration, simulate
+from tests.helpers.sample_data import PROCESS_WITH_RESOURCES
+
+ANNOTATED = """
+process: {process_id: orders, name: Orders}
+steps:
+  - {step_id: start, type: Start, name: Begin, successor: save}
+  - step_id: save
+    type: Task
+    name: Save
+    successor: check
+    operations: [{type: Update, target: orders_db, description: Insert}]
+    simulation: {duration: 2}
+  - step_id: check
+    type: Decision
+    name: In stock?
+    test: {type: Query, target: stock_db, description: Check}
+    "yes": pay
+    "no": backorder
+    simulation: {yes_probability: 0.75}
+  - {step_id: pay, type: Task, name: Pay, successor: done,
+     simulation: {duration: {distribution: uniform, low: 1, high: 3}}}
+  - {step_id: backorder, type: Task, name: Backorder, successor: done, simulation: {duration: 30}}
+  - {step_id: orders_db, type: Database, name: Orders}
+  - {step_id: stock_db, type: Database, name: Stock}
+  - {step_id: done, type: End, name: Done}
+"""
+
+
+def test_parser_keeps_simulation_annotations():
+    """Test that simulation annotations are kept on the process, not the steps."""
+    process = Parser().parse_string(ANNOTATED)
+
+    assert process.annotations["check"] == {"simulation": {"yes_probability": 0.75}}
+    assert "start" not in process.annotations
+
+
+def test_simulation_reports_paths_cycle_times_and_load():
+    """Test that branch probabilities, durations and operations show up in the report."""
+    report = simulate(Parser().parse_string(ANNOTATED), 20000, seed=7)
+
+    assert report.instances == 20000
+    assert report.unfinished == 0
+    frequencies = dict(report.path_frequencies())
+    assert frequencies[(("check", "yes"),)] == pytest.approx(0.75, abs=0.02)
+    assert 3 <= report.percentile(50) <= 5
+    assert report.percentile(99) == 32
+    assert report.bottlenecks(1)[0][0] == "backorder"
+    assert report.busiest_resources() == [("orders_db", 0, 20000), ("stock_db", 20000, 0)]
+
+
+def test_seed_gives_same_report_for_any_number_of_workers():
+    """Test that results depend only on the seed, not on how batches are spread."""
+    process = Parser().parse_string(ANNOTATED)
+
+    in_process = simulate(process, 25000, seed=3, workers=1)
+    pooled = simulate(process, 25000, seed=3, workers=2)
+
+    assert in_process.cycle_times == pooled.cycle_times
+    assert in_process.paths == pooled.paths
+
+
+def test_unannotated_process_splits_decisions_evenly():
+    """Test the defaults: no time taken and even branch probabilities."""
+    report = simulate(Parser().parse_string(PROCESS_WITH_RESOURCES), 4000, seed=1)
+
+    assert report.percentile(100) == 0
+    assert report.ends["end_success"] / 4000 == pytest.approx(0.5, abs=0.05)
+
+
+def test_loops_are_abandoned_after_the_step_limit():
+    """Test that an instance that never reaches an End is counted as unfinished."""
+    process = Parser().parse_string("""
+process: {process_id: loop, name: Loop}
+steps:
+  - {step_id: start, type: Start, name: Begin, successor: work}
+  - {step_id: work, type: Task, name: Work, successor: again}
+  - {step_id: again, type: Decision, name: Again?, "yes": work, "no": done,
+     simulation: {yes_probability: 1}}
+  - {step_id: done, type: End, name: Done}
+""")
+
+    report = simulate(process, 10, seed=1, max_steps=50)
+
+    assert report.unfinished == 10
+    assert report.cycle_times == []
+
+
+def test_bad_annotations_are_reported():
+    """Test that unknown distributions and impossible probabilities raise ValueError."""
+    with pytest.raises(ValueError, match="unknown duration distribution"):
+        compile_duration("save", {"distribution": "poisson", "mean": 1})
+    with pytest.raises(ValueError, match="needs numeric low, high"):
+        compile_duration("save", {"distribution": "uniform", "low": 1})
+
+    process = Parser().parse_string(ANNOTATED)
+    process.annotations["check"]["simulation"]["yes_probability"] = 1.5
+    with pytest.raises(ValueError, match="check: yes_probability"):
+        SimulationModel.from_process(process)
+
+
+def test_distributions_stay_in_range():
+    """Test each distribution's samples against its parameters."""
+    rng = random.Random(0)
+    for spec, low, high in [({"distribution": "triangular", "low": 1, "mode": 2, "high": 4}, 1, 4),
+                            ({"distribution": "normal", "mean": 1, "stddev": 5}, 0, float("inf")),
+                            ({"distribution": "exponential", "mean": 3}, 0, float("inf")),
+                            ({"distribution": "constant", "value": 2}, 2, 2)]:
+        duration = compile_duration("step", spec)
+        assert all(low <= sample_duration(rng, duration) <= high for _ in range(200))
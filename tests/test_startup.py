@@ -0,0 +1,53 @@
+"""Tests that keep command line startup fast by deferring heavy imports."""
+
+import os
+import subprocess
+import sys
+import pytest
+
+# Cumulative import time allowed for the CLI module, in microseconds. About
+# 12ms is typical; the budget leaves room for slow CI machines while still
+# failing if yaml, the step model or the process pool creep back in.
+STARTUP_BUDGET_US = 50000
+
+DEFERRED_MODULES = ['yaml', 'mermaid_mint.parser', 'mermaid_mint.steps', 'concurrent.futures']
+
+
+def import_times(module):
+    """Import module in a fresh interpreter and return {module: cumulative microseconds}."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               env=env, capture_output=True, text=True, check=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ["mermaid_mint", "mermaid_mint.cli"])
+def test_import_defers_heavy_modules(module):
+    """Test that importing the package or the CLI does not load yaml or the step model."""
+    times = import_times(module)
+
+    assert module in times
+    assert [name for name in DEFERRED_MODULES if name in times] == []
+
+
+def test_cli_import_within_budget():
+    """Test that the CLI module imports within the startup budget."""
+    best = min(import_times("mermaid_mint.cli")["mermaid_mint.cli"] for _ in range(3))
+
+    assert best < STARTUP_BUDGET_US
+
+
+def test_package_exports_load_lazily():
+    """Test that the main classes are still importable from the package."""
+    import mermaid_mint
+    from mermaid_mint.parser import Parser
+
+    assert mermaid_mint.Parser is Parser
+    with pytest.raises(AttributeError):
+        mermaid_mint.NoSuchThing
@@ -0,0 +1,117 @@
+"""Tests for extracting focused views of processes."""
+
+import pytest
+from mermaid_mint.parser import Parser
+from mermaid_mint.steps import Collapsed, Decision, Task
+from mermaid_mint.subgraph import between, extract, neighbourhood, touching
+from mermaid_mint.visitors import MermaidVisitor
+from tests.helpers.sample_data import PROCESS, PROCESS_WITH_RESOURCES
+
+
+@pytest.fixture
+def registration():
+    return Parser().parse_string(PROCESS)
+
+
+@pytest.fixture
+def orders():
+    return Parser().parse_string(PROCESS_WITH_RESOURCES)
+
+
+def test_neighbourhood_follows_edges_both_ways(registration):
+    """Test that a neighbourhood includes predecessors and successors."""
+    assert neighbourhood(registration, "check_existing_user") == {
+        "check_existing_user", "validate_email", "reject_duplicate", "create_account"}
+    assert neighbourhood(registration, "start", hops=0) == {"start"}
+    assert "start" in neighbourhood(registration, "check_existing_user", hops=2)
+
+
+def test_neighbourhood_of_unknown_step(registration):
+    """Test that an unknown step raises KeyError."""
+    with pytest.raises(KeyError):
+        neighbourhood(registration, "missing")
+
+
+def test_between_selects_steps_on_paths(registration):
+    """Test that between keeps only the steps on a path from source to target."""
+    assert between(registration, "validate_email", "end_success") == {
+        "validate_email", "check_existing_user", "create_account", "send_confirmation", "end_success"}
+
+    with pytest.raises(ValueError):
+        between(registration, "end_success", "start")
+
+
+def test_touching_selects_resource_users(orders):
+    """Test that touching finds every step that queries or updates a resource."""
+    assert touching(orders, "orders_db") == {"orders_db", "save_order", "backorder"}
+    assert touching(orders, "inventory_db") == {"inventory_db", "check_inventory"}
+
+    with pytest.raises(ValueError):
+        touching(orders, "save_order")
+
+
+def test_extract_collapses_cut_edges(registration):
+    """Test that steps outside the selection become placeholders and the original is untouched."""
+    focused = extract(registration, {"check_existing_user", "create_account"})
+
+    decision = focused["check_existing_user"]
+    assert decision is not registration["check_existing_user"]
+    assert isinstance(decision.yes, Collapsed)
+    assert decision.yes.step_id == "reject_duplicate_collapsed"
+    assert decision.no is focused["create_account"]
+    assert isinstance(focused["create_account"].successor, Collapsed)
+    assert focused["validate_email_collapsed"].links == [decision]
+    assert focused.start is None
+
+    assert registration["check_existing_user"].yes is registration["reject_duplicate"]
+    assert isinstance(registration["create_account"].successor, Task)
+
+
+def test_extract_copies_operations(orders):
+    """Test that operations and query tests point into the focused process."""
+    focused = extract(orders, touching(orders, "orders_db") | {"start", "check_inventory"})
+
+    assert focused.start is focused["start"]
+    assert [operation.target.step_id for operation in focused["save_order"].operations] == [
+        "orders_db", "audit_log_collapsed"]
+    assert orders["save_order"].operations[1].target is orders["audit_log"]
+    decision = focused["check_inventory"]
+    assert isinstance(decision, Decision)
+    assert decision.test.target.step_id == "inventory_db_collapsed"
+    assert focused["check_inventory"].test is not orders["check_inventory"].test
+
+
+def test_focused_view_renders(registration):
+    """Test that placeholders appear in the Mermaid output with their edges."""
+    focused = extract(registration, between(registration, "create_account", "end_success"))
+    diagram = MermaidVisitor().visit_process(focused)
+
+    assert "    check_existing_user_collapsed([Check if User Exists ...])" in diagram
+    assert "    check_existing_user_collapsed --> create_account" in diagram
+    assert "    send_confirmation --> end_success" in diagram
+    assert "reject_duplicate" not in diagram
+
+
+def test_placeholder_ids_do_not_clash_with_steps(registration):
+    """Test that a placeholder is numbered when the process has a step with its name."""
+    registration.add_step(Task("reject_duplicate_collapsed", "Already Collapsed", None))
+
+    focused = extract(registration, {"check_existing_user"})
+
+    placeholder = focused["check_existing_user"].yes
+    assert placeholder.step_id == "reject_duplicate_collapsed_2"
+    assert placeholder.original_id == "reject_duplicate"
+    assert focused["validate_email_collapsed"].original_id == "validate_email"
+
+
+def test_placeholders_link_once_per_step(registration):
+    """Test that a step joined to the selection by several edges gets one placeholder link."""
+    decision = registration["check_existing_user"]
+    decision.yes = decision.no
+    registration.relink("check_existing_user")
+
+    focused = extract(registration, {"create_account"})
+    diagram = MermaidVisitor().visit_process(focused)
+
+    assert focused["check_existing_user_collapsed"].links == [focused["create_account"]]
+    assert diagram.count("check_existing_user_collapsed --> create_account") == 1
@@ -1,7 +1,8 @@
 """Tests for Task class - process task/activity."""
 
+import sys
 import pytest
-from mermaid_mint.steps import Task
+from mermaid_mint.steps import Task, Database, Update
 
 
 def test_task_creation():
@@ -10,4 +11,15 @@ def test_task_creation():
     
     assert task.step_id == "t1"
     assert task.name == "Process Data"
-    assert task.successor is None
\ No newline at end of file
+    assert task.successor is None
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="slotted dataclasses need Python 3.10")
+def test_task_has_no_instance_dict():
+    """Test that steps and operations are slotted to keep large processes compact."""
+    task = Task("t1", "Process Data")
+    task.operations.append(Update(target=Database("db", "Store"), description="Save"))
+
+    assert not hasattr(task, "__dict__")
+    assert not hasattr(task.operations[0], "__dict__")
+    assert not hasattr(task.operations[0].target, "__dict__")
@@ -0,0 +1,120 @@
+"""Tests for validation of Process graphs."""
+
+import pytest
+from mermaid_mint.parser import Parser
+from mermaid_mint.steps import Process, Start, Task, Decision, End, Update
+from mermaid_mint.validation import (CYCLE, DUPLICATE_STEP, INVALID_TARGET, MISSING_END, MISSING_START,
+                                     NO_PATH_TO_END, UNREACHABLE, UNRESOLVED_REFERENCE,
+                                     ValidationError, validate)
+from tests.helpers.sample_data import PROCESS, PROCESS_WITH_RESOURCES
+
+
+def problems_of(process, **options):
+    """Return the validation problems as (kind, step_id) pairs."""
+    return {(problem.kind, problem.step_id) for problem in validate(process, **options)}
+
+
+def test_sample_processes_are_valid():
+    """Test that the sample processes have no problems."""
+    parser = Parser()
+
+    assert validate(parser.parse_string(PROCESS), check_cycles=True) == []
+    assert validate(parser.parse_string(PROCESS_WITH_RESOURCES), check_cycles=True) == []
+
+
+def test_parser_reports_every_bad_reference():
+    """Test that the parser reports all unresolved references and duplicates at once."""
+    with pytest.raises(ValidationError) as error:
+        Parser().parse_string("""
+process: {process_id: p1, name: Broken}
+steps:
+  - {step_id: start, type: Start, name: Begin, successor: missing}
+  - {step_id: save, type: Task, name: Save, successor: done,
+     operations: [{type: Update, target: nowhere, description: Write}]}
+  - {step_id: save, type: Task, name: Save again}
+  - {step_id: done, type: End, name: Done}
+""")
+
+    problems = {(problem.kind, problem.step_id) for problem in error.value.problems}
+    assert problems == {
+        (UNRESOLVED_REFERENCE, "start"),
+        (UNRESOLVED_REFERENCE, "save"),
+        (DUPLICATE_STEP, "save"),
+    }
+    assert "start: successor refers to unknown step missing" in str(error.value)
+
+
+def test_parser_reports_missing_start():
+    """Test that a missing Start step is a validation problem rather than StopIteration."""
+    with pytest.raises(ValidationError) as error:
+        Parser().parse_string("""
+process: {process_id: p1, name: Broken}
+steps:
+  - {step_id: done, type: End, name: Done}
+""")
+
+    assert [problem.kind for problem in error.value.problems] == [MISSING_START]
+
+
+def test_validate_reports_graph_problems():
+    """Test unreachable steps, dead ends, bad targets and dangling references."""
+    process = Process("p1", "Broken")
+    start = Start("start", "Begin")
+    task = Task("task", "Work")
+    stuck = Task("stuck", "Stuck")
+    orphan = Task("orphan", "Orphan")
+    end = End("end", "Done")
+    start.successor = task
+    task.successor = end
+    task.operations.append(Update(target=stuck, description="Not a resource"))
+    orphan.successor = End("elsewhere", "Not in process")
+    for step in (start, task, stuck, orphan, end):
+        process.add_step(step)
+    process.start = start
+
+    assert problems_of(process) == {
+        (INVALID_TARGET, "task"),
+        (NO_PATH_TO_END, "stuck"),
+        (UNREACHABLE, "orphan"),
+        (UNRESOLVED_REFERENCE, "orphan"),
+    }
+
+
+def test_validate_reports_missing_start_and_end():
+    """Test that empty processes are reported."""
+    assert problems_of(Process("p1", "Empty")) == {(MISSING_START, None), (MISSING_END, None)}
+
+
+def test_validate_reports_cycles_on_request():
+    """Test that loops are only reported when cycle detection is enabled."""
+    process = Process("p1", "Loop")
+    start = Start("start", "Begin")
+    retry = Task("retry", "Try")
+    decision = Decision("ok", "Worked?")
+    end = End("end", "Done")
+    start.successor = retry
+    retry.successor = decision
+    decision.yes = end
+    decision.no = retry
+    for step in (start, retry, decision, end):
+        process.add_step(step)
+    process.start = start
+
+    assert problems_of(process) == set()
+    assert problems_of(process, check_cycles=True) == {(CYCLE, "ok")}
+
+
+def test_validate_handles_long_chains():
+    """Test that validation is iterative and does not hit the recursion limit."""
+    process = Process("p1", "Long")
+    previous = process.start = Start("start", "Begin")
+    process.add_step(previous)
+    for index in range(5000):
+        task = Task(f"t{index}", "Step")
+        previous.successor = task
+        process.add_step(task)
+        previous = task
+    previous.successor = End("end", "Done")
+    process.add_step(previous.successor)
+
+    assert validate(process, check_cycles=True) == []
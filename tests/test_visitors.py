@@ -0,0 +1,132 @@
+"""Tests for the visitor registry and the DOT, JSON and GraphML visitors."""
+
+import io
+import json
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+from mermaid_mint.parser import Parser
+from mermaid_mint.visitors import (VISITORS, DotVisitor, GraphMLVisitor, JsonGraphVisitor, MermaidVisitor,
+                                   Visitor, get_visitor, register_visitor, visit_many)
+from mermaid_mint.steps import Process, Start, Task
+from tests.helpers.sample_data import PROCESS, PROCESS_WITH_RESOURCES
+
+GRAPHML = '{http://graphml.graphdrawing.org/xmlns}'
+
+
+@pytest.fixture
+def process():
+    return Parser().parse_string(PROCESS_WITH_RESOURCES)
+
+
+def test_registry_holds_every_format():
+    """Test that each built-in format is registered under its name."""
+    assert VISITORS == {'mermaid': MermaidVisitor, 'dot': DotVisitor,
+                        'json': JsonGraphVisitor, 'graphml': GraphMLVisitor}
+    assert isinstance(get_visitor('dot'), DotVisitor)
+    with pytest.raises(ValueError, match="Unknown output format: svg"):
+        get_visitor('svg')
+
+
+def test_custom_visitor_can_be_registered():
+    """Test that a registered subclass only needs to format the parts it draws."""
+    @register_visitor
+    class StepListVisitor(Visitor):
+        format_name = 'steps'
+        suffix = '.txt'
+
+        def visit_step(self, step, index):
+            return (f"{index} {step.step_id}",)
+
+    try:
+        lines = get_visitor('steps').visit_process(Parser().parse_string(PROCESS)).splitlines()
+        assert lines[:2] == ["0 start", "1 validate_email"]
+    finally:
+        del VISITORS['steps']
+
+
+def test_visit_many_matches_each_visitor(process):
+    """Test that one walk writes exactly what each visitor writes alone."""
+    outputs = [(get_visitor(format_name), io.StringIO()) for format_name in VISITORS]
+
+    visit_many(process, outputs)
+
+    for visitor, stream in outputs:
+        assert stream.getvalue() == visitor.visit_process(process)
+
+
+def test_dot_output(process):
+    """Test the DOT digraph's nodes, shapes and edge labels."""
+    lines = DotVisitor().visit_process(process).splitlines()
+
+    assert lines[0] == 'digraph "order_processing" {'
+    assert '    "check_inventory" [label="Check Product Availability", shape=diamond];' in lines
+    assert '    "orders_db" [label="Orders Database", shape=cylinder];' in lines
+    assert '    "check_inventory" -> "process_payment" [label="yes"];' in lines
+    assert '    "save_order" -> "orders_db" [label="update", style=dashed];' in lines
+    assert lines[-1] == "}"
+
+
+def test_dot_output_keeps_non_ascii_names():
+    """Test that accented names reach Graphviz as text and quotes and backslashes are escaped."""
+    process = Process("inscription", 'Inscription "rapide"')
+    process.add_step(Start("debut", "Démarrer", None))
+    process.add_step(Task("etape", "Vérifier C:\\dossier", None))
+    process["debut"].successor = process["etape"]
+
+    lines = DotVisitor().visit_process(process).splitlines()
+
+    assert lines[1] == '    label="Inscription \\"rapide\\"";'
+    assert '    "debut" [label="Démarrer", shape=oval];' in lines
+    assert '    "etape" [label="Vérifier C:\\\\dossier", shape=box];' in lines
+
+
+def test_json_node_link_output(process):
+    """Test that the JSON graph parses and lists every step and edge."""
+    graph = json.loads(JsonGraphVisitor().visit_process(process))
+
+    assert graph['graph'] == {'id': 'order_processing', 'name': 'Order Processing Workflow'}
+    assert [node['id'] for node in graph['nodes']] == process.step_ids()
+    assert graph['nodes'][2] == {'id': 'check_inventory', 'type': 'Decision',
+                                 'name': 'Check Product Availability'}
+    assert len(graph['links']) == len(list(process.edges()))
+    assert {'source': 'check_inventory', 'target': 'inventory_db', 'kind': 'query'} in graph['links']
+
+
+def test_json_output_without_edges():
+    """Test that a process with no edges still gives valid JSON."""
+    process = Process("p1", "Lonely")
+    process.add_step(Start("start", "Begin"))
+
+    assert json.loads(JsonGraphVisitor().visit_process(process))['links'] == []
+
+
+def test_graphml_output(process):
+    """Test that the GraphML parses and escapes names."""
+    process["audit_log"].name = "Audit <Log> & Trail"
+
+    root = ElementTree.fromstring(GraphMLVisitor().visit_process(process))
+
+    nodes = root.findall(f'{GRAPHML}graph/{GRAPHML}node')
+    edges = root.findall(f'{GRAPHML}graph/{GRAPHML}edge')
+    assert len(nodes) == len(process)
+    assert len(edges) == len(list(process.edges()))
+    audit = next(node for node in nodes if node.get('id') == 'audit_log')
+    assert [data.text for data in audit] == ['Document', 'Audit <Log> & Trail']
+
+
+def test_numeric_ids_and_names_in_every_format():
+    """Test that YAML numbers used as step IDs and names are drawn rather than crashing."""
+    process = Parser().parse_string(
+        "process: {process_id: 7, name: 2024}\n"
+        "steps:\n"
+        "  - {step_id: 1, type: Start, name: 100, successor: 2}\n"
+        "  - {step_id: 2, type: End, name: 3.5}\n")
+
+    root = ElementTree.fromstring(GraphMLVisitor().visit_process(process))
+
+    nodes = root.findall(f'{GRAPHML}graph/{GRAPHML}node')
+    assert [(node.get('id'), node[1].text) for node in nodes] == [('1', '100'), ('2', '3.5')]
+    assert root.find(f'{GRAPHML}graph/{GRAPHML}edge').get('target') == '2'
+    for format_name in VISITORS:
+        assert get_visitor(format_name).visit_process(process)
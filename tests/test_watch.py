@@ -0,0 +1,72 @@
+"""Tests for watching process files for changes."""
+
+import os
+import pytest
+from mermaid_mint.watch import Watcher
+from tests.helpers.sample_data import PROCESS, PROCESS_WITH_RESOURCES
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def touch(path, content, mtime_ns):
+    """Write content and give the file a distinct modification time."""
+    path.write_text(content)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_start_converts_out_of_date_files(tmp_path):
+    """Test that files without an up to date output are converted on start."""
+    touch(tmp_path / "registration.yaml", PROCESS, 10 ** 18)
+
+    results = Watcher([str(tmp_path)]).start()
+
+    assert [result.ok for result in results] == [True]
+    assert (tmp_path / "registration.mmd").exists()
+    assert Watcher([str(tmp_path)]).start() == []
+
+
+def test_poll_debounces_changes(tmp_path):
+    """Test that a burst of saves leads to a single conversion once the file settles."""
+    source = tmp_path / "registration.yaml"
+    touch(source, PROCESS, 10 ** 18)
+    clock = FakeClock()
+    watcher = Watcher([str(tmp_path)], debounce=1.0, clock=clock)
+    watcher.start()
+
+    touch(source, PROCESS_WITH_RESOURCES, 10 ** 18 + 1)
+    assert watcher.poll() == []
+    clock.now = 0.5
+    touch(source, PROCESS_WITH_RESOURCES + "\n", 10 ** 18 + 2)
+    assert watcher.poll() == []
+    clock.now = 1.0
+    assert watcher.poll() == []
+    clock.now = 1.5
+    results = watcher.poll()
+
+    assert [result.source for result in results] == [str(source)]
+    assert "orders_db" in (tmp_path / "registration.mmd").read_text()
+    assert watcher.poll() == []
+
+
+def test_poll_keeps_previous_output_on_failure(tmp_path):
+    """Test that a broken save is reported and the last good diagram is kept."""
+    source = tmp_path / "registration.yaml"
+    touch(source, PROCESS, 10 ** 18)
+    watcher = Watcher([str(tmp_path)], debounce=0)
+    watcher.start()
+    good = (tmp_path / "registration.mmd").read_text()
+
+    touch(source, "steps: [", 10 ** 18 + 1)
+    results = watcher.poll()
+
+    assert not results[0].ok
+    assert (tmp_path / "registration.mmd").read_text() == good
+    assert [path.name for path in tmp_path.iterdir() if path.name.endswith(".tmp")] == []